@@ -10,9 +10,28 @@ from typing import Annotated
 from fastapi import Depends
 
 from analysis_engine.engine.pipeline import AnalysisPipeline, PipelineConfig
+from analysis_engine.engine.scheduler import RecommendationScheduler, UniverseConfig, parse_cadences
 from analysis_engine.engine.scoring import RecommendationScorer
-from data_integration.providers.base import MarketDataProvider
+from analysis_engine.engine.updates import UpdateHub
+from data_integration.providers.base import Fundamental, MarketDataProvider, Quote
+from data_integration.providers.cached import CachedMarketDataProvider, CandleStore
+from data_integration.providers.http_pool import (
+    DEFAULT_KEEPALIVE_EXPIRY,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MAX_KEEPALIVE,
+    DEFAULT_TIMEOUT,
+    HttpClientPool,
+    HttpPoolConfig,
+)
 from data_integration.providers.local_sample import LocalSampleProvider
+from data_integration.providers.rate_limit import DEFAULT_RATE, RateLimitConfig, RateLimiter, parse_rate_limits
+from data_integration.providers.response_cache import (
+    DEFAULT_FUNDAMENTAL_TTL,
+    DEFAULT_QUOTE_TTL,
+    ResponseCache,
+    ResponseCacheProvider,
+)
+from data_integration.providers.synthetic import SyntheticConfig, SyntheticMarketDataProvider
 
 try:
     from data_integration.providers.massive_api import MassiveAPIProvider  # type: ignore[attr-defined]
@@ -21,15 +40,99 @@ except ModuleNotFoundError:  # pragma: no cover - optional dependency
 
 DEFAULT_TICKERS = ["AAPL", "TSLA", "ERIC"]
 DEFAULT_LOOKBACK_DAYS = 120
+DEFAULT_SCHEDULE = "1d:300,1h:60"
+DEFAULT_QUOTE_REFRESH = 15.0
 
 
+@lru_cache(maxsize=1)
+def get_candle_store() -> CandleStore | None:
+    """Delad SQLite-cache för historik, aktiveras med ``MARKET_DATA_CACHE_PATH``."""
+
+    path = os.environ.get("MARKET_DATA_CACHE_PATH")
+    if not path:
+        return None
+    return CandleStore(path)
+
+
+@lru_cache(maxsize=1)
+def get_quote_cache() -> ResponseCache[Quote]:
+    return ResponseCache(ttl=float(os.environ.get("QUOTE_CACHE_TTL", DEFAULT_QUOTE_TTL)))
+
+
+@lru_cache(maxsize=1)
+def get_fundamental_cache() -> ResponseCache[Fundamental]:
+    return ResponseCache(ttl=float(os.environ.get("FUNDAMENTAL_CACHE_TTL", DEFAULT_FUNDAMENTAL_TTL)))
+
+
+@lru_cache(maxsize=1)
+def get_http_pool() -> HttpClientPool:
+    """Applikationens delade HTTP-pool; stängs i lifespan via :func:`close_http_pool`."""
+
+    http2 = os.environ.get("HTTP2", "auto").lower()
+    config = HttpPoolConfig(
+        timeout=float(os.environ.get("HTTP_TIMEOUT", DEFAULT_TIMEOUT)),
+        max_connections=int(os.environ.get("HTTP_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+        max_keepalive_connections=int(os.environ.get("HTTP_MAX_KEEPALIVE", DEFAULT_MAX_KEEPALIVE)),
+        keepalive_expiry=float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", DEFAULT_KEEPALIVE_EXPIRY)),
+        http2=None if http2 == "auto" else http2 in {"1", "true", "yes"},
+    )
+    return HttpClientPool(config)
+
+
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> RateLimiter:
+    """Delad rate limiter för Massive API.
+
+    ``MASSIVE_RATE_LIMIT`` anger anrop per sekund (standard 10), ``MASSIVE_RATE_BURST``
+    hinkens storlek och ``MASSIVE_ENDPOINT_RATE_LIMITS`` egna gränser per endpoint,
+    t.ex. ``history:5,search:1``.
+    """
+
+    burst = os.environ.get("MASSIVE_RATE_BURST")
+    burst_value = float(burst) if burst else None
+    return RateLimiter(
+        default=RateLimitConfig(rate=float(os.environ.get("MASSIVE_RATE_LIMIT", DEFAULT_RATE)), burst=burst_value),
+        endpoints=parse_rate_limits(os.environ.get("MASSIVE_ENDPOINT_RATE_LIMITS", ""), burst=burst_value),
+    )
+
+
+async def close_http_pool() -> None:
+    if get_http_pool.cache_info().currsize:
+        await get_http_pool().aclose()
+    get_http_pool.cache_clear()
+    get_market_data_provider.cache_clear()
+
+
+@lru_cache(maxsize=1)
 def get_market_data_provider() -> MarketDataProvider:
+    """Leverantörskedjan skapas en gång per process och delar HTTP-poolen."""
+
     api_key = os.environ.get("MASSIVE_API_KEY")
+    provider: MarketDataProvider
     if api_key:
         if MassiveAPIProvider is None:
             raise RuntimeError("MassiveAPIProvider kräver httpx-biblioteket installerat")
-        return MassiveAPIProvider(api_key=api_key)  # type: ignore[call-arg]
-    return LocalSampleProvider()
+        provider = MassiveAPIProvider(  # type: ignore[call-arg]
+            api_key=api_key,
+            pool=get_http_pool(),
+            rate_limiter=get_rate_limiter(),
+            bulk_history=os.environ.get("MASSIVE_BULK_HISTORY", "0") == "1",
+        )
+    elif os.environ.get("SYNTHETIC_UNIVERSE_SIZE"):
+        provider = SyntheticMarketDataProvider(
+            SyntheticConfig(seed=int(os.environ.get("SYNTHETIC_SEED", "42"))),
+            universe_size=int(os.environ["SYNTHETIC_UNIVERSE_SIZE"]),
+        )
+    else:
+        provider = LocalSampleProvider()
+    store = get_candle_store()
+    if store is not None:
+        provider = CachedMarketDataProvider(upstream=provider, store=store)
+    return ResponseCacheProvider(
+        upstream=provider,
+        quotes=get_quote_cache(),
+        fundamentals=get_fundamental_cache(),
+    )
 
 
 @lru_cache(maxsize=1)
@@ -45,3 +148,38 @@ def get_pipeline(
     start = end - timedelta(days=DEFAULT_LOOKBACK_DAYS)
     config = PipelineConfig(tickers=DEFAULT_TICKERS, start=start, end=end, interval="1d")
     return AnalysisPipeline(provider=provider, scorer=scorer, config=config)
+
+
+def create_pipeline(config: PipelineConfig) -> AnalysisPipeline:
+    return AnalysisPipeline(provider=get_market_data_provider(), scorer=get_scorer(), config=config)
+
+
+@lru_cache(maxsize=1)
+def get_update_hub() -> UpdateHub:
+    return UpdateHub()
+
+
+@lru_cache(maxsize=1)
+def get_scheduler() -> RecommendationScheduler:
+    """Schemaläggare för standarduniversumet; kadens per intervall via ``RECOMMENDATION_SCHEDULE``.
+
+    Quotes hämtas mellan omräkningarna var ``QUOTE_REFRESH_INTERVAL`` sekund (0 stänger av)
+    och varje nytt snapshot skickas till :func:`get_update_hub`.
+    """
+
+    cadences = parse_cadences(os.environ.get("RECOMMENDATION_SCHEDULE", DEFAULT_SCHEDULE))
+    quote_cadence = float(os.environ.get("QUOTE_REFRESH_INTERVAL", DEFAULT_QUOTE_REFRESH)) or None
+    universes = [
+        UniverseConfig(
+            name="default",
+            tickers=tuple(DEFAULT_TICKERS),
+            interval=interval,
+            lookback_days=DEFAULT_LOOKBACK_DAYS,
+            cadence=cadence,
+            quote_cadence=quote_cadence,
+        )
+        for interval, cadence in cadences.items()
+    ]
+    scheduler = RecommendationScheduler(universes=universes, pipeline_factory=create_pipeline)
+    scheduler.add_listener(get_update_hub().publish)
+    return scheduler
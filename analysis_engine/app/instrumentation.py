@@ -0,0 +1,62 @@
+"""Mätvärden per HTTP-förfrågan och opt-in-profilering för analysmotorns API."""
+
+from __future__ import annotations
+
+import time
+from contextlib import nullcontext
+from typing import Any, Awaitable, Callable, MutableMapping
+
+from prometheus_client import Histogram
+from starlette.datastructures import Headers, MutableHeaders
+
+from data_integration.metrics import REGISTRY, profiling, server_timing
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+PROFILE_HEADER = "x-profile"
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Svarstid per route", ("method", "route", "status"), registry=REGISTRY
+)
+
+
+class MetricsMiddleware:
+    """Mäter svarstid per route och, med ``X-Profile: 1``, tid per pipelinesteg.
+
+    Stegtiderna skickas tillbaka i ``Server-Timing`` (millisekunder) tillsammans med
+    den totala tiden fram till att svarshuvudena skickas.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        requested = Headers(scope=scope).get(PROFILE_HEADER, "").lower() in {"1", "true", "yes"}
+        start = time.perf_counter()
+        status = 500
+
+        with profiling() if requested else nullcontext() as profile:
+
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    if profile is not None:
+                        timings = {**profile, "total": time.perf_counter() - start}
+                        MutableHeaders(scope=message).append("Server-Timing", server_timing(timings))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                route = scope.get("route")
+                REQUEST_SECONDS.labels(
+                    method=scope["method"], route=getattr(route, "path", "unmatched"), status=str(status)
+                ).observe(time.perf_counter() - start)
@@ -1,14 +1,49 @@
 from __future__ import annotations
 
+import hashlib
+from contextlib import asynccontextmanager
 from datetime import UTC, datetime, timedelta
-from typing import Annotated
+from typing import Annotated, AsyncIterator
 
-from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from prometheus_client import Gauge
 
 from analysis_engine.engine.pipeline import AnalysisPipeline, PipelineConfig
+from analysis_engine.engine.ranking import InvalidCursorError, rank_recommendations
+from analysis_engine.engine.scheduler import RecommendationScheduler, RecommendationSnapshot
 from analysis_engine.engine.scoring import Recommendation
+from analysis_engine.engine.updates import UpdateBatch, UpdateHub
+from data_integration.metrics import CONTENT_TYPE, REGISTRY, render, stage
+
+from .dependencies import (
+    DEFAULT_TICKERS,
+    close_http_pool,
+    get_fundamental_cache,
+    get_http_pool,
+    get_pipeline,
+    get_quote_cache,
+    get_rate_limiter,
+    get_scheduler,
+    get_update_hub,
+)
+from .instrumentation import MetricsMiddleware
+from .serialization import GZIP_MINIMUM_SIZE, FastJSONResponse, PayloadFormat, dumps, recommendations_payload
+
+STREAM_HEARTBEAT = 15.0
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    scheduler = get_scheduler()
+    scheduler.start()
+    try:
+        yield
+    finally:
+        scheduler.stop()
+        await close_http_pool()
 
-from .dependencies import DEFAULT_TICKERS, get_pipeline
 
 app = FastAPI(
     title="AktieTipset Analysis Engine",
@@ -17,7 +52,11 @@ app = FastAPI(
         "Analysmotor som kombinerar tekniska indikatorer och fundamentala datapunkter "
         "för att generera rankningar och rekommendationer."
     ),
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+app.add_middleware(MetricsMiddleware)
 
 DISCLAIMER = (
     "Rekommendationerna är endast för informations- och utbildningssyfte och ska inte uppfattas "
@@ -30,6 +69,61 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/cache/stats", tags=["system"])
+def cache_stats() -> dict[str, dict[str, int]]:
+    """Träffar, missar och evictions för quote- och fundamentacachen samt aktiva strömmar."""
+
+    return {
+        "quotes": get_quote_cache().stats().to_dict(),
+        "fundamentals": get_fundamental_cache().stats().to_dict(),
+        "stream": get_update_hub().stats(),
+    }
+
+
+@app.get("/http/stats", tags=["system"])
+def http_stats() -> dict[str, object]:
+    """Anrop, nya anslutningar och återanvändning i den delade HTTP-poolen samt throttling per endpoint."""
+
+    return {**get_http_pool().stats().to_dict(), "rateLimit": get_rate_limiter().stats()}
+
+
+CACHE_REQUESTS = Gauge(
+    "cache_requests", "Uppslag i quote- och fundamentacachen", ("cache", "result"), registry=REGISTRY
+)
+CACHE_HIT_RATIO = Gauge(
+    "cache_hit_ratio", "Andel träffar i quote- och fundamentacachen", ("cache",), registry=REGISTRY
+)
+HTTP_POOL = Gauge("http_pool", "Anrop och anslutningar i den delade HTTP-poolen", ("kind",), registry=REGISTRY)
+THROTTLE = Gauge(
+    "provider_throttle", "Throttling per endpoint i rate limitern", ("endpoint", "kind"), registry=REGISTRY
+)
+STREAM_SUBSCRIPTIONS = Gauge("stream_subscriptions", "Aktiva SSE-prenumerationer", registry=REGISTRY)
+
+
+def _collect_runtime_metrics() -> None:
+    for name, cache in (("quotes", get_quote_cache()), ("fundamentals", get_fundamental_cache())):
+        stats = cache.stats()
+        for result in ("hits", "misses", "coalesced", "evictions"):
+            CACHE_REQUESTS.labels(cache=name, result=result).set(getattr(stats, result))
+        lookups = stats.hits + stats.misses
+        CACHE_HIT_RATIO.labels(cache=name).set(stats.hits / lookups if lookups else 0.0)
+    pool = get_http_pool().stats()
+    for kind in ("requests", "errors", "connections_opened", "tls_handshakes"):
+        HTTP_POOL.labels(kind=kind).set(getattr(pool, kind))
+    for endpoint, stats in get_rate_limiter().stats().items():
+        for kind in ("requests", "throttled", "waited_seconds", "rate_limited", "rate"):
+            THROTTLE.labels(endpoint=endpoint, kind=kind).set(stats[kind])
+    STREAM_SUBSCRIPTIONS.set(get_update_hub().stats()["subscriptions"])
+
+
+@app.get("/metrics", tags=["system"], response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Mätvärden i Prometheus textformat: steg- och svarstider, leverantörsanrop, cacheträffar."""
+
+    _collect_runtime_metrics()
+    return PlainTextResponse(render(), media_type=CONTENT_TYPE)
+
+
 def _parse_tickers(tickers: str | None) -> list[str]:
     if not tickers:
         return DEFAULT_TICKERS
@@ -39,30 +133,169 @@ def _parse_tickers(tickers: str | None) -> list[str]:
     return parsed
 
 
-@app.get("/recommendations", tags=["recommendations"])
-def get_recommendations(
+def _parse_signals(signal: str | None) -> list[str] | None:
+    if not signal:
+        return None
+    return [item.strip().upper() for item in signal.split(",") if item.strip()] or None
+
+
+def _etag(*parts: object) -> str:
+    digest = hashlib.sha1(dumps(parts)).hexdigest()[:24]
+    return f'"{digest}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {item.strip().removeprefix("W/") for item in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _cache_control(snapshot: RecommendationSnapshot | None) -> str:
+    """Snapshots får cachas tills nästa schemalagda omräkning; direkta körningar revalideras alltid."""
+
+    if snapshot is None or snapshot.is_stale():
+        return "no-cache"
+    remaining = snapshot.cadence - snapshot.age().total_seconds()
+    return f"public, max-age={max(int(remaining), 0)}"
+
+
+@app.get("/recommendations", tags=["recommendations"], response_model=None)
+async def get_recommendations(
+    pipeline: Annotated[AnalysisPipeline, Depends(get_pipeline)],
+    scheduler: Annotated[RecommendationScheduler, Depends(get_scheduler)],
     tickers: Annotated[str | None, Query(description="Kommaseparerad lista av tickers")] = None,
     lookback_days: Annotated[int, Query(ge=5, le=365, description="Antal dagar att analysera")] = 120,
-    interval: Annotated[str, Query(pattern="^(1d|1h)$", description="Aggregeringsintervall")] = "1d",
-    pipeline: Annotated[AnalysisPipeline, Depends(get_pipeline)],
-) -> dict[str, object]:
+    interval: Annotated[str, Query(pattern="^(1d|1h|1w)$", description="Aggregeringsintervall")] = "1d",
+    limit: Annotated[int | None, Query(ge=1, le=1000, description="Max antal resultat")] = None,
+    offset: Annotated[int, Query(ge=0, description="Antal resultat att hoppa över")] = 0,
+    min_score: Annotated[float | None, Query(ge=0, le=100, description="Lägsta score")] = None,
+    signal: Annotated[str | None, Query(description="Kommaseparerade signaler, t.ex. BUY,ACCUMULATE")] = None,
+    cursor: Annotated[str | None, Query(description="Cursor från föregående sida (nextCursor)")] = None,
+    payload_format: Annotated[
+        PayloadFormat, Query(alias="format", description="objects eller columnar (en array per fält)")
+    ] = "objects",
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    """Rankade rekommendationer med ETag och Cache-Control.
+
+    Svar från ett snapshot får en ETag av snapshotversionen och frågan, så en
+    villkorad förfrågan (``If-None-Match``) besvaras med 304 utan att rankas om.
+    """
+
     requested_tickers = _parse_tickers(tickers)
-    end = datetime.now(UTC)
-    start = end - timedelta(days=lookback_days)
-    pipeline.config = PipelineConfig(tickers=requested_tickers, start=start, end=end, interval=interval)
-
-    recommendations: list[Recommendation] = pipeline.run()
-    payload = [
-        {
-            "ticker": recommendation.ticker,
-            "score": recommendation.score,
-            "signal": recommendation.signal,
-            "reasoning": recommendation.reasoning,
-        }
-        for recommendation in recommendations
-    ]
-    return {
-        "generatedAt": datetime.now(UTC).isoformat(),
+    universe = scheduler.find(requested_tickers, interval, lookback_days)
+    snapshot = scheduler.latest(universe) if universe is not None else None
+    query = (limit, offset, min_score, _parse_signals(signal), cursor, payload_format)
+    etag: str | None = None
+    if snapshot is not None:
+        etag = _etag(snapshot.universe, snapshot.interval, snapshot.version, snapshot.is_stale(), *query)
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": _cache_control(snapshot)})
+        scored = snapshot.recommendations
+        explainer, inputs = snapshot.pipeline, snapshot.inputs
+        generated_at = snapshot.generated_at
+    else:
+        end = datetime.now(UTC)
+        start = end - timedelta(days=lookback_days)
+        pipeline.config = PipelineConfig(
+            tickers=requested_tickers, start=start, end=end, interval=interval, explain_top=0
+        )
+        scored = await pipeline.arun()
+        explainer, inputs = pipeline, pipeline.inputs()
+        generated_at = datetime.now(UTC)
+
+    try:
+        with stage("rank"):
+            page = rank_recommendations(
+                scored,
+                limit=limit,
+                offset=offset,
+                min_score=min_score,
+                signals=_parse_signals(signal),
+                cursor=cursor,
+            )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail="Ogiltig cursor") from exc
+    with stage("explain"):
+        # Kopior: snapshotets rekommendationer delas mellan förfrågningar och får inte ändras.
+        recommendations: list[Recommendation] = explainer.explain(page.results, inputs)
+    payload = recommendations_payload(recommendations, payload_format)
+    body: dict[str, object] = {
+        "generatedAt": generated_at.isoformat(),
+        "snapshotVersion": snapshot.version if snapshot is not None else None,
+        "stale": snapshot.is_stale() if snapshot is not None else False,
         "disclaimer": DISCLAIMER,
+        "total": page.total,
+        "nextCursor": page.next_cursor,
         "results": payload,
     }
+    if etag is None:
+        # Direktkörning: innehållet avgör ETag eftersom det saknas en snapshotversion.
+        fingerprint = [(item.ticker, item.score, item.signal, item.reasoning) for item in recommendations]
+        etag = _etag(body["total"], body["nextCursor"], payload_format, fingerprint)
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    with stage("serialize"):
+        return FastJSONResponse(body, headers={"ETag": etag, "Cache-Control": _cache_control(snapshot)})
+
+
+def _sse(event: str, batch: UpdateBatch) -> str:
+    return f"id: {batch.version}\nevent: {event}\ndata: {dumps(batch.to_dict()).decode()}\n\n"
+
+
+@app.get("/recommendations/stream", tags=["recommendations"])
+async def stream_recommendations(
+    request: Request,
+    hub: Annotated[UpdateHub, Depends(get_update_hub)],
+    tickers: Annotated[str | None, Query(description="Kommaseparerade tickers (alla om tomt)")] = None,
+    interval: Annotated[str, Query(pattern="^(1d|1h|1w)$", description="Aggregeringsintervall")] = "1d",
+    universe: Annotated[str, Query(description="Schemalagt universum")] = "default",
+) -> StreamingResponse:
+    """Server-Sent Events med ändrade scores och signaler.
+
+    Först skickas ett ``snapshot``-event med nuvarande läge, därefter ``delta``-event när
+    schemaläggaren publicerar nya staplar eller quotes. Väntande deltan slås ihop per
+    ticker, så en långsam klient får det senaste läget i stället för en växande kö.
+    """
+
+    subscribed = [ticker.strip().upper() for ticker in tickers.split(",") if ticker.strip()] if tickers else None
+    subscription = hub.subscribe(universe, interval, subscribed)
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            yield _sse("snapshot", hub.current(subscription))
+            while not await request.is_disconnected():
+                batch = await subscription.next(timeout=STREAM_HEARTBEAT)
+                yield ": keepalive\n\n" if batch is None else _sse("delta", batch)
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/recommendations/refresh", tags=["recommendations"])
+def refresh_recommendations(
+    scheduler: Annotated[RecommendationScheduler, Depends(get_scheduler)],
+    universe: Annotated[str | None, Query(description="Universum att räkna om (alla om tomt)")] = None,
+) -> dict[str, list[dict[str, object]]]:
+    """Räkna om schemalagda snapshots direkt."""
+
+    snapshots = scheduler.refresh(universe)
+    if not snapshots:
+        raise HTTPException(status_code=404, detail="Okänt universum")
+    return {
+        "snapshots": [
+            {
+                "universe": snapshot.universe,
+                "interval": snapshot.interval,
+                "version": snapshot.version,
+                "generatedAt": snapshot.generated_at.isoformat(),
+            }
+            for snapshot in snapshots
+        ]
+    }
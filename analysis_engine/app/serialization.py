@@ -0,0 +1,72 @@
+"""Snabb JSON-serialisering av rekommendationssvar."""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, Literal
+
+import numpy as np
+from fastapi.responses import Response
+
+from analysis_engine.engine.scoring import Recommendation
+
+try:
+    import orjson
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+PayloadFormat = Literal["objects", "columnar"]
+# Svar mindre än så här komprimeras inte; gzip kostar mer än det sparar på små kroppar.
+GZIP_MINIMUM_SIZE = 1024
+
+
+def _default(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """JSON som bytes; orjson serialiserar dataklasser (``Quote``, ``Fundamental`` ...) direkt."""
+
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    """JSON-svar som hoppar över ``jsonable_encoder`` och serialiserar med :func:`dumps`."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def recommendations_payload(
+    recommendations: Iterable[Recommendation],
+    payload_format: PayloadFormat = "objects",
+) -> list[Recommendation] | dict[str, list[Any]]:
+    """Rekommendationer som objekt per ticker eller, kompakt, som en array per fält.
+
+    Objektformatet lämnar dataklasserna orörda så att orjson kan serialisera dem utan
+    mellanliggande dictar.
+    """
+
+    recommendations = list(recommendations)
+    if payload_format == "columnar":
+        return {
+            "ticker": [recommendation.ticker for recommendation in recommendations],
+            "score": [recommendation.score for recommendation in recommendations],
+            "signal": [recommendation.signal for recommendation in recommendations],
+            "reasoning": [recommendation.reasoning for recommendation in recommendations],
+        }
+    return recommendations
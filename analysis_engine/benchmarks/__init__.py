@@ -0,0 +1 @@
+"""Benchmarksvit för analysmotorn (kör med ``python -m analysis_engine.benchmarks``)."""
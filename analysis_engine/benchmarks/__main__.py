@@ -0,0 +1,59 @@
+"""Kör benchmarksviten, spara en baseline eller jämför mot en tidigare.
+
+    python -m analysis_engine.benchmarks --profile quick --save .benchmarks/baseline.json
+    python -m analysis_engine.benchmarks --profile quick --baseline .benchmarks/baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from .runner import (
+    DEFAULT_MEMORY_TOLERANCE,
+    DEFAULT_TIME_TOLERANCE,
+    compare,
+    format_table,
+    load_results,
+    run_benchmarks,
+    save_results,
+)
+from .suite import PROFILES, benchmarks_for, sizes_for
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m analysis_engine.benchmarks")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--tickers", type=int, nargs="*", help="Egna universumstorlekar i stället för profilen")
+    parser.add_argument("--bars", type=int, nargs="*", help="Egna historiklängder i stället för profilen")
+    parser.add_argument("--filter", default="", help="Kör bara benchmarks vars namn innehåller texten")
+    parser.add_argument("--repeats", type=int, default=None)
+    parser.add_argument("--no-http", action="store_true", help="Hoppa över HTTP-benchmarks")
+    parser.add_argument("--save", help="Spara resultaten som JSON (baseline)")
+    parser.add_argument("--baseline", help="Jämför mot sparade resultat och avsluta med 1 vid regression")
+    parser.add_argument("--time-tolerance", type=float, default=DEFAULT_TIME_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=DEFAULT_MEMORY_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    sizes = sizes_for(args.profile, args.tickers, args.bars)
+    benchmarks = [case for case in benchmarks_for(sizes, http=not args.no_http) if args.filter in case.name]
+    baseline = load_results(args.baseline) if args.baseline else None
+    results = run_benchmarks(
+        benchmarks, repeats=args.repeats, progress=lambda result: print(f"  {result.key}", file=sys.stderr)
+    )
+    print(format_table(results, baseline))
+    if args.save:
+        save_results(args.save, results)
+    if baseline is None:
+        return 0
+    regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.key} {regression.metric}: {regression.ratio:.2f}x baseline",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""Benchmark runner: timings, memory peaks, baselines and regression checks."""
+
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Callable, Iterable, Mapping, Sequence
+
+import numpy as np
+
+DEFAULT_REPEATS = 5
+DEFAULT_TIME_TOLERANCE = 0.25
+DEFAULT_MEMORY_TOLERANCE = 0.25
+# Timings below this are dominated by timer noise and never flagged.
+MIN_COMPARABLE_SECONDS = 1e-4
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """A timed callable; ``setup`` builds its input outside the timed region."""
+
+    name: str
+    run: Callable[[Any], object]
+    setup: Callable[[], Any] = lambda: None
+    teardown: Callable[[Any], object] | None = None
+    params: Mapping[str, int] = field(default_factory=dict)
+    repeats: int | None = None
+
+    @property
+    def key(self) -> str:
+        return benchmark_key(self.name, self.params)
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    params: dict[str, int]
+    repeats: int
+    best: float
+    median: float
+    mean: float
+    peak_bytes: int
+
+    @property
+    def key(self) -> str:
+        return benchmark_key(self.name, self.params)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class Regression:
+    key: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+
+def benchmark_key(name: str, params: Mapping[str, int]) -> str:
+    if not params:
+        return name
+    return f"{name}[{','.join(f'{key}={value}' for key, value in params.items())}]"
+
+
+def measure(benchmark: Benchmark, repeats: int | None = None, warmup: int = 1) -> BenchmarkResult:
+    """Time ``benchmark.run`` and record its allocation peak in a separate traced run.
+
+    Tracing slows allocation-heavy code down, so the timed runs are not traced. The
+    peak covers memory allocated by the run itself, not its prepared input.
+    """
+
+    count = repeats or benchmark.repeats or DEFAULT_REPEATS
+    state = benchmark.setup()
+    try:
+        for _ in range(warmup):
+            benchmark.run(state)
+        timings: list[float] = []
+        gc.collect()
+        for _ in range(count):
+            start = time.perf_counter()
+            benchmark.run(state)
+            timings.append(time.perf_counter() - start)
+        tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            benchmark.run(state)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    finally:
+        if benchmark.teardown is not None:
+            benchmark.teardown(state)
+    return BenchmarkResult(
+        name=benchmark.name,
+        params=dict(benchmark.params),
+        repeats=count,
+        best=min(timings),
+        median=statistics.median(timings),
+        mean=statistics.fmean(timings),
+        peak_bytes=peak,
+    )
+
+
+def run_benchmarks(
+    benchmarks: Iterable[Benchmark],
+    repeats: int | None = None,
+    progress: Callable[[BenchmarkResult], None] | None = None,
+) -> list[BenchmarkResult]:
+    results: list[BenchmarkResult] = []
+    for benchmark in benchmarks:
+        result = measure(benchmark, repeats=repeats)
+        results.append(result)
+        if progress is not None:
+            progress(result)
+    return results
+
+
+def compare(
+    results: Iterable[BenchmarkResult],
+    baseline: Mapping[str, BenchmarkResult],
+    time_tolerance: float = DEFAULT_TIME_TOLERANCE,
+    memory_tolerance: float = DEFAULT_MEMORY_TOLERANCE,
+) -> list[Regression]:
+    """Benchmarks whose median time or memory peak grew beyond the tolerance."""
+
+    regressions: list[Regression] = []
+    for result in results:
+        previous = baseline.get(result.key)
+        if previous is None:
+            continue
+        if previous.median >= MIN_COMPARABLE_SECONDS and result.median > previous.median * (1 + time_tolerance):
+            regressions.append(Regression(result.key, "time", previous.median, result.median))
+        if previous.peak_bytes and result.peak_bytes > previous.peak_bytes * (1 + memory_tolerance):
+            regressions.append(Regression(result.key, "memory", previous.peak_bytes, result.peak_bytes))
+    return regressions
+
+
+def save_results(path: str | Path, results: Sequence[BenchmarkResult]) -> None:
+    payload = {
+        "created": datetime.now(UTC).isoformat(),
+        "machine": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+        },
+        "results": {result.key: result.to_dict() for result in results},
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2))
+
+
+def load_results(path: str | Path) -> dict[str, BenchmarkResult]:
+    payload = json.loads(Path(path).read_text())
+    return {key: BenchmarkResult(**values) for key, values in payload["results"].items()}
+
+
+def format_table(
+    results: Sequence[BenchmarkResult],
+    baseline: Mapping[str, BenchmarkResult] | None = None,
+) -> str:
+    rows = [("benchmark", "median", "best", "peak", "vs baseline")]
+    for result in results:
+        previous = (baseline or {}).get(result.key)
+        change = f"{result.median / previous.median:.2f}x" if previous and previous.median else "-"
+        rows.append(
+            (
+                result.key,
+                _seconds(result.median),
+                _seconds(result.best),
+                _bytes(result.peak_bytes),
+                change,
+            )
+        )
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    lines = []
+    for row in rows:
+        cells = [row[0].ljust(widths[0]), *(cell.rjust(width) for cell, width in zip(row[1:], widths[1:]))]
+        lines.append("  ".join(cells))
+    return "\n".join(lines)
+
+
+def _seconds(value: float) -> str:
+    if value < 1e-3:
+        return f"{value * 1e6:.1f} µs"
+    if value < 1:
+        return f"{value * 1e3:.2f} ms"
+    return f"{value:.3f} s"
+
+
+def _bytes(value: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024  # type: ignore[assignment]
+    return f"{value:.1f} GiB"
@@ -0,0 +1,206 @@
+"""Benchmark cases over universes built with ``SyntheticMarketDataProvider``."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any, Callable, Iterable, Sequence
+
+from analysis_engine.engine.batch import PriceMatrix, compute_indicators, required_window
+from analysis_engine.engine.indicators import calculate_atr, calculate_return, calculate_rsi, calculate_sma
+from analysis_engine.engine.pipeline import AnalysisPipeline, PipelineConfig
+from analysis_engine.engine.scoring import RecommendationScorer
+from data_integration.providers.base import Fundamental, Quote
+from data_integration.providers.candles import CandleSeries
+from data_integration.providers.synthetic import SyntheticMarketDataProvider
+
+from .runner import Benchmark
+
+END = datetime(2024, 6, 3, tzinfo=UTC)
+
+# (tickers, bars) per profile; ``full`` spans 10 to 10 000 tickers and 30 to 5 000 bars.
+PROFILES: dict[str, list[tuple[int, int]]] = {
+    "quick": [(10, 30), (100, 250)],
+    "standard": [(10, 30), (100, 250), (1_000, 250), (100, 1_000)],
+    "full": [(10, 30), (100, 250), (1_000, 250), (10_000, 250), (100, 5_000), (1_000, 1_000)],
+}
+# The HTTP benchmark puts every ticker in the query string; larger universes are skipped.
+MAX_HTTP_TICKERS = 1_000
+
+
+@dataclass
+class Universe:
+    tickers: list[str]
+    history: dict[str, CandleSeries]
+    fundamentals: list[Fundamental]
+    quotes: list[Quote]
+
+    @property
+    def bars(self) -> int:
+        return max((len(series) for series in self.history.values()), default=0)
+
+
+class SyntheticUniverseProvider(SyntheticMarketDataProvider):
+    """Serves a pre-generated universe so provider generation is not part of the timings."""
+
+    def __init__(self, universe: Universe) -> None:
+        super().__init__(universe_size=0)
+        self.prepared = universe
+
+    def get_history(  # type: ignore[override]
+        self,
+        ticker: str,
+        start: datetime,
+        end: datetime,
+        interval: str = "1d",
+    ) -> CandleSeries:
+        series = self.prepared.history.get(ticker.upper())
+        return series if series is not None else super().get_history(ticker, start, end, interval)
+
+    def get_history_batch(  # type: ignore[override]
+        self,
+        tickers: Iterable[str],
+        start: datetime,
+        end: datetime,
+        interval: str = "1d",
+    ) -> dict[str, CandleSeries]:
+        return {ticker: self.get_history(ticker, start, end, interval) for ticker in dict.fromkeys(tickers)}
+
+
+def synthetic_universe(tickers: int, bars: int, interval: str = "1d") -> Universe:
+    """Deterministic universe: series are seeded per ticker, so the same sizes give the same data."""
+
+    provider = SyntheticMarketDataProvider(universe_size=tickers)
+    names = provider.universe
+    step = timedelta(days=1) if interval == "1d" else timedelta(hours=1)
+    history = provider.get_history_batch(names, start=END - step * bars, end=END, interval=interval)
+    return Universe(
+        tickers=names,
+        history=history,
+        fundamentals=provider.get_fundamentals(names),
+        quotes=provider.get_quotes(names),
+    )
+
+
+def sizes_for(
+    profile: str,
+    tickers: Sequence[int] | None = None,
+    bars: Sequence[int] | None = None,
+) -> list[tuple[int, int]]:
+    """Sizes from a named profile, or the cross product of explicit ticker and bar counts."""
+
+    if tickers or bars:
+        return [(count, length) for count in (tickers or [100]) for length in (bars or [250])]
+    return PROFILES[profile]
+
+
+def benchmarks_for(sizes: Iterable[tuple[int, int]], http: bool = True) -> list[Benchmark]:
+    cases: list[Benchmark] = []
+    for tickers, bars in sizes:
+        params = {"tickers": tickers, "bars": bars}
+        universe = _cached_universe(tickers, bars)
+        for name, function in (
+            ("indicators.calculate_sma", lambda series: calculate_sma(series, 20)),
+            ("indicators.calculate_rsi", calculate_rsi),
+            ("indicators.calculate_atr", calculate_atr),
+            ("indicators.calculate_return", calculate_return),
+        ):
+            cases.append(Benchmark(name, _per_ticker(function), setup=universe, params=params))
+        cases.append(Benchmark("batch.compute_indicators", _batch_indicators, setup=universe, params=params))
+        cases.append(Benchmark("scoring.score", _score, setup=_scoring_input(universe), params=params))
+        cases.append(Benchmark("pipeline.run", _run_pipeline, setup=_pipeline(universe), params=params))
+        if http and tickers <= MAX_HTTP_TICKERS:
+            cases.append(
+                Benchmark(
+                    "http.recommendations",
+                    _get_recommendations,
+                    setup=_http_client(universe),
+                    teardown=_clear_overrides,
+                    params=params,
+                    repeats=3,
+                )
+            )
+    return cases
+
+
+def _cached_universe(tickers: int, bars: int) -> Callable[[], Universe]:
+    cache: list[Universe] = []
+
+    def setup() -> Universe:
+        if not cache:
+            cache.append(synthetic_universe(tickers, bars))
+        return cache[0]
+
+    return setup
+
+
+def _per_ticker(function: Callable[[CandleSeries], object]) -> Callable[[Universe], None]:
+    def run(universe: Universe) -> None:
+        for series in universe.history.values():
+            function(series)
+
+    return run
+
+
+def _batch_indicators(universe: Universe) -> None:
+    compute_indicators(PriceMatrix.from_series(universe.history, window=required_window()))
+
+
+def _scoring_input(universe: Callable[[], Universe]) -> Callable[[], tuple[Universe, dict[str, Any]]]:
+    def setup() -> tuple[Universe, dict[str, Any]]:
+        data = universe()
+        matrix = PriceMatrix.from_series(data.history, window=required_window())
+        return data, compute_indicators(matrix).to_snapshots()
+
+    return setup
+
+
+def _score(state: tuple[Universe, dict[str, Any]]) -> None:
+    universe, indicators = state
+    RecommendationScorer().score(
+        history=universe.history,
+        fundamentals=universe.fundamentals,
+        quotes=universe.quotes,
+        indicators=indicators,
+    )
+
+
+def _pipeline(universe: Callable[[], Universe]) -> Callable[[], AnalysisPipeline]:
+    def setup() -> AnalysisPipeline:
+        data = universe()
+        config = PipelineConfig(tickers=data.tickers, start=END - timedelta(days=data.bars), end=END)
+        return AnalysisPipeline(SyntheticUniverseProvider(data), RecommendationScorer(), config)
+
+    return setup
+
+
+def _run_pipeline(pipeline: AnalysisPipeline) -> None:
+    pipeline.run()
+
+
+def _http_client(universe: Callable[[], Universe]) -> Callable[[], tuple[Any, dict[str, Any]]]:
+    def setup() -> tuple[Any, dict[str, Any]]:
+        from fastapi.testclient import TestClient
+
+        from analysis_engine.app.dependencies import get_market_data_provider
+        from analysis_engine.app.main import app
+
+        data = universe()
+        provider = SyntheticUniverseProvider(data)
+        app.dependency_overrides[get_market_data_provider] = lambda: provider
+        params = {"tickers": ",".join(data.tickers), "lookback_days": min(max(data.bars, 5), 365)}
+        return TestClient(app), params
+
+    return setup
+
+
+def _get_recommendations(state: tuple[Any, dict[str, Any]]) -> None:
+    client, params = state
+    response = client.get("/recommendations", params=params)
+    response.raise_for_status()
+
+
+def _clear_overrides(_: object) -> None:
+    from analysis_engine.app.main import app
+
+    app.dependency_overrides.clear()
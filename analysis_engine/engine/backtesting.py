@@ -0,0 +1,319 @@
+"""Vectorized walk-forward backtesting of the recommendation scorer."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Mapping, Sequence
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from data_integration.providers.base import Fundamental
+from data_integration.providers.candles import CandleSeries
+
+from .batch import ATR_PERIOD, RETURN_LOOKBACK, RSI_PERIOD, SMA_LONG_PERIOD, SMA_SHORT_PERIOD
+from .scoring import DEFAULT_SCORING_CONFIG, RecommendationScorer, _fundamental_columns
+
+PERIODS_PER_YEAR = {"1h": 252 * 7, "1d": 252, "1w": 52}
+DEFAULT_ENTRY_SCORE = DEFAULT_SCORING_CONFIG.accumulate_cutoff
+
+
+@dataclass(frozen=True, eq=False)
+class IndicatorPanel:
+    """Indicator values at every bar for every ticker on a shared timeline.
+
+    All value arrays have shape (tickers, bars); NaN marks bars where a ticker has no
+    candle or the indicator is not yet defined. The value at bar ``t`` equals what the
+    scalar ``calculate_*`` functions return for the ticker's candles up to and including ``t``.
+    """
+
+    tickers: list[str]
+    timestamps: np.ndarray
+    close: np.ndarray
+    sma_short: np.ndarray
+    sma_long: np.ndarray
+    rsi: np.ndarray
+    atr: np.ndarray
+    price_return: np.ndarray
+
+    @property
+    def has_bar(self) -> np.ndarray:
+        return ~np.isnan(self.close)
+
+    @classmethod
+    def from_history(cls, history: Mapping[str, CandleSeries]) -> IndicatorPanel:
+        tickers = list(history)
+        timestamps = np.unique(np.concatenate([history[t].timestamp for t in tickers] or [np.empty(0)]))
+        lengths = np.array([len(history[t]) for t in tickers], dtype=np.int64)
+        bars = int(lengths.max()) if lengths.size else 0
+
+        # Indicators are computed on each ticker's own bar sequence, left-aligned.
+        close = np.full((len(tickers), bars), np.nan)
+        high = np.full((len(tickers), bars), np.nan)
+        low = np.full((len(tickers), bars), np.nan)
+        positions = np.zeros((len(tickers), bars), dtype=np.int64)
+        for row, ticker in enumerate(tickers):
+            series = history[ticker]
+            length = len(series)
+            close[row, :length] = series.close
+            high[row, :length] = series.high
+            low[row, :length] = series.low
+            positions[row, :length] = np.searchsorted(timestamps, series.timestamp)
+
+        valid = np.arange(bars) < lengths[:, None]
+        rows = np.broadcast_to(np.arange(len(tickers))[:, None], valid.shape)[valid]
+        columns = positions[valid]
+
+        def scatter(values: np.ndarray) -> np.ndarray:
+            panel = np.full((len(tickers), timestamps.shape[0]), np.nan)
+            panel[rows, columns] = values[valid]
+            return panel
+
+        return cls(
+            tickers=tickers,
+            timestamps=timestamps,
+            close=scatter(close),
+            sma_short=scatter(rolling_sma(close, SMA_SHORT_PERIOD)),
+            sma_long=scatter(rolling_sma(close, SMA_LONG_PERIOD)),
+            rsi=scatter(rolling_rsi(close, RSI_PERIOD)),
+            atr=scatter(rolling_atr(close, high, low, ATR_PERIOD)),
+            price_return=scatter(rolling_return(close, RETURN_LOOKBACK)),
+        )
+
+
+@dataclass
+class BacktestMetrics:
+    total_return: float
+    cagr: float
+    sharpe: float
+    max_drawdown: float
+    win_rate: float
+    trades: int
+
+
+@dataclass(eq=False)
+class BacktestResult:
+    timestamps: np.ndarray
+    scores: np.ndarray
+    positions: np.ndarray
+    returns: np.ndarray
+    equity: np.ndarray
+    trade_entries: np.ndarray
+    trade_returns: np.ndarray
+    periods_per_year: int
+    metrics: BacktestMetrics
+
+
+def run_backtest(
+    history: Mapping[str, CandleSeries] | IndicatorPanel,
+    fundamentals: Sequence[Fundamental] = (),
+    scorer: RecommendationScorer | None = None,
+    entry_score: float | None = None,
+    interval: str = "1d",
+    cost_bps: float = 0.0,
+) -> BacktestResult:
+    """Score every ticker at every bar and simulate an equal-weight long-only portfolio.
+
+    A ticker is held from bar ``t`` to ``t + 1`` when its score at the close of ``t`` is
+    at least ``entry_score`` (the scorer's ACCUMULATE cutoff by default, i.e. BUY or
+    ACCUMULATE), so there is no look-ahead.
+    The latest close stands in for the live quote when scoring ATR relative to price.
+    """
+
+    panel = history if isinstance(history, IndicatorPanel) else IndicatorPanel.from_history(history)
+    scorer = scorer or RecommendationScorer()
+    scores = score_panel(panel, fundamentals, scorer)
+    if entry_score is None:
+        entry_score = scorer.config.accumulate_cutoff
+    return simulate(panel, scores, entry_score=entry_score, interval=interval, cost_bps=cost_bps)
+
+
+def score_panel(
+    panel: IndicatorPanel,
+    fundamentals: Sequence[Fundamental],
+    scorer: RecommendationScorer,
+) -> np.ndarray:
+    """Scores for every (ticker, bar); NaN where the ticker has no candle."""
+
+    fundamentals_map = {f.ticker: f for f in fundamentals}
+    pe_ratio, roe, debt_to_equity, zeroed = _fundamental_columns(fundamentals_map, panel.tickers)
+    scores = scorer.score_values(
+        sma_short=panel.sma_short,
+        sma_long=panel.sma_long,
+        rsi=panel.rsi,
+        atr=panel.atr,
+        price_return=panel.price_return,
+        price=panel.close,
+        pe_ratio=pe_ratio[:, None],
+        roe=roe[:, None],
+        debt_to_equity=debt_to_equity[:, None],
+    )
+    scores = np.where(zeroed[:, None], 0.0, scores)
+    return np.where(panel.has_bar, np.broadcast_to(scores, panel.close.shape), np.nan)
+
+
+def simulate(
+    panel: IndicatorPanel,
+    scores: np.ndarray,
+    entry_score: float = DEFAULT_ENTRY_SCORE,
+    interval: str = "1d",
+    cost_bps: float = 0.0,
+) -> BacktestResult:
+    """Turn a (tickers × bars) score matrix into portfolio returns and metrics."""
+
+    periods_per_year = _periods_per_year(interval)
+    tickers, bars = panel.close.shape
+    has_bar = panel.has_bar
+    # Bars without a candle keep the previous decision; after a ticker's last bar it is sold
+    # so it no longer takes a share of the equal weights.
+    last_seen = np.maximum.accumulate(np.where(has_bar, np.arange(bars), -1), axis=1)
+    last_bar = bars - 1 - np.argmax(has_bar[:, ::-1], axis=1) if bars else np.zeros(tickers, dtype=np.intp)
+    rows = np.arange(tickers)[:, None]
+    decision = np.where(has_bar, scores >= entry_score, False)
+    listed = (last_seen >= 0) & (np.arange(bars) <= last_bar[:, None])
+    positions = np.where(listed, decision[rows, np.maximum(last_seen, 0)], False)
+
+    filled_close = np.where(last_seen >= 0, panel.close[rows, np.maximum(last_seen, 0)], np.nan)
+    asset_returns = np.zeros((tickers, bars))
+    if bars > 1:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            step = filled_close[:, 1:] / filled_close[:, :-1] - 1
+        asset_returns[:, 1:] = np.nan_to_num(step, nan=0.0, posinf=0.0, neginf=0.0)
+
+    held = positions.sum(axis=0)
+    weights = np.where(held > 0, positions / np.maximum(held, 1), 0.0)
+    returns = np.zeros(bars)
+    if bars > 1:
+        returns[1:] = (weights[:, :-1] * asset_returns[:, 1:]).sum(axis=0)
+        turnover = np.abs(np.diff(weights, axis=1, prepend=0.0)).sum(axis=0)
+        returns[1:] -= cost_bps / 10_000 * turnover[:-1]
+    equity = np.cumprod(1 + returns)
+
+    trade_entries, trade_returns = _trades(positions, asset_returns)
+    return BacktestResult(
+        timestamps=panel.timestamps,
+        scores=scores,
+        positions=positions,
+        returns=returns,
+        equity=equity,
+        trade_entries=trade_entries,
+        trade_returns=trade_returns,
+        periods_per_year=periods_per_year,
+        metrics=compute_metrics(returns, trade_returns, periods_per_year),
+    )
+
+
+def walk_forward(result: BacktestResult, window: int, step: int | None = None) -> list[BacktestMetrics]:
+    """Metrics for consecutive out-of-sample windows of ``window`` bars."""
+
+    if window <= 1:
+        raise ValueError("window must be greater than one bar")
+    step = step or window
+    metrics: list[BacktestMetrics] = []
+    for start in range(0, result.returns.shape[0] - window + 1, step):
+        stop = start + window
+        in_window = (result.trade_entries >= start) & (result.trade_entries < stop)
+        window_returns = np.concatenate([[0.0], result.returns[start + 1:stop]])
+        metrics.append(compute_metrics(window_returns, result.trade_returns[in_window], result.periods_per_year))
+    return metrics
+
+
+def compute_metrics(returns: np.ndarray, trade_returns: np.ndarray, periods_per_year: int) -> BacktestMetrics:
+    """CAGR, Sharpe, max drawdown and win rate for a return series whose first entry is the start."""
+
+    equity = np.cumprod(1 + returns)
+    final = float(equity[-1]) if equity.size else 1.0
+    years = (returns.shape[0] - 1) / periods_per_year
+    cagr = final ** (1 / years) - 1 if years > 0 and final > 0 else 0.0
+    period_returns = returns[1:]
+    deviation = float(period_returns.std(ddof=1)) if period_returns.size > 1 else 0.0
+    sharpe = float(period_returns.mean()) / deviation * math.sqrt(periods_per_year) if deviation > 0 else 0.0
+    drawdown = float((1 - equity / np.maximum.accumulate(equity)).max()) if equity.size else 0.0
+    win_rate = float((trade_returns > 0).mean()) if trade_returns.size else 0.0
+    return BacktestMetrics(
+        total_return=final - 1,
+        cagr=float(cagr),
+        sharpe=sharpe,
+        max_drawdown=drawdown,
+        win_rate=win_rate,
+        trades=int(trade_returns.size),
+    )
+
+
+def rolling_sma(close: np.ndarray, period: int) -> np.ndarray:
+    """SMA at every bar of left-aligned rows, matching :func:`calculate_sma` on each prefix."""
+
+    tickers, bars = close.shape
+    padded = np.concatenate([np.zeros((tickers, period - 1)), close], axis=1)
+    sums = sliding_window_view(padded, period, axis=1).sum(axis=-1)
+    counts = np.minimum(np.arange(1, bars + 1), period)
+    return sums / counts
+
+
+def rolling_rsi(close: np.ndarray, period: int) -> np.ndarray:
+    """RSI at every bar, matching :func:`calculate_rsi` on each prefix."""
+
+    result = np.full(close.shape, np.nan)
+    if close.shape[1] <= period:
+        return result
+    changes = np.diff(close, axis=1)
+    gains = sliding_window_view(np.where(changes > 0, changes, 0.0), period, axis=1).sum(axis=-1) / period
+    losses = sliding_window_view(np.where(changes > 0, 0.0, -changes), period, axis=1).sum(axis=-1) / period
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result[:, period:] = np.where(losses == 0, 100.0, 100 - (100 / (1 + gains / losses)))
+    return np.where(np.isnan(close), np.nan, result)
+
+
+def rolling_atr(close: np.ndarray, high: np.ndarray, low: np.ndarray, period: int) -> np.ndarray:
+    """ATR at every bar, matching :func:`calculate_atr` on each prefix."""
+
+    result = np.full(close.shape, np.nan)
+    if close.shape[1] <= period:
+        return result
+    prev_close = close[:, :-1]
+    true_ranges = np.maximum(
+        high[:, 1:] - low[:, 1:],
+        np.maximum(np.abs(high[:, 1:] - prev_close), np.abs(low[:, 1:] - prev_close)),
+    )
+    result[:, period:] = sliding_window_view(true_ranges, period, axis=1).mean(axis=-1)
+    return result
+
+
+def rolling_return(close: np.ndarray, lookback: int) -> np.ndarray:
+    """N-bar return at every bar, matching :func:`calculate_return` on each prefix."""
+
+    result = np.full(close.shape, np.nan)
+    if close.shape[1] <= lookback:
+        return result
+    previous = close[:, :-lookback]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result[:, lookback:] = np.where(previous != 0, (close[:, lookback:] - previous) / previous, np.nan)
+    return result
+
+
+def _periods_per_year(interval: str) -> int:
+    try:
+        return PERIODS_PER_YEAR[interval]
+    except KeyError:
+        raise ValueError(f"unknown interval: {interval}") from None
+
+
+def _trades(positions: np.ndarray, asset_returns: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Entry bar and compounded return of every contiguous holding period."""
+
+    tickers, bars = positions.shape
+    if not bars:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    before = np.concatenate([np.zeros((tickers, 1), dtype=bool), positions[:, :-1]], axis=1)
+    after = np.concatenate([positions[:, 1:], np.zeros((tickers, 1), dtype=bool)], axis=1)
+    entry_rows, entry_bars = np.nonzero(positions & ~before)
+    exit_rows, exit_bars = np.nonzero(positions & ~after)
+    # Held at the close of ``bar`` means exposure to the return realised at ``bar + 1``.
+    growth = np.concatenate(
+        [np.zeros((tickers, 1)), np.cumsum(np.log1p(np.maximum(asset_returns, -0.999999)), axis=1)],
+        axis=1,
+    )
+    realised_until = np.minimum(exit_bars + 1, bars - 1)
+    trade_returns = np.expm1(growth[exit_rows, realised_until + 1] - growth[entry_rows, entry_bars + 1])
+    return entry_bars, trade_returns
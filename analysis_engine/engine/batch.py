@@ -0,0 +1,175 @@
+"""Vectorized indicator engine operating on a whole ticker universe at once."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Mapping
+
+import numpy as np
+
+from data_integration.providers.candles import CandleSeries
+
+from .scoring import IndicatorSnapshot
+
+SMA_SHORT_PERIOD = 20
+SMA_LONG_PERIOD = 50
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+RETURN_LOOKBACK = 5
+
+
+@dataclass(frozen=True, eq=False)
+class PriceMatrix:
+    """Tickers × bars price matrix with histories aligned on their latest bar.
+
+    Shorter histories are padded with NaN on the left; ``lengths`` holds the number of
+    real bars per row so ragged universes can be masked without Python loops.
+    """
+
+    tickers: list[str]
+    close: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    lengths: np.ndarray
+
+    @classmethod
+    def from_series(cls, history: Mapping[str, CandleSeries], window: int | None = None) -> PriceMatrix:
+        """Stack candle series into a matrix, keeping at most ``window`` trailing bars."""
+
+        tickers = list(history)
+        lengths = np.array([len(history[ticker]) for ticker in tickers], dtype=np.int64)
+        if window is not None:
+            lengths = np.minimum(lengths, window)
+        bars = int(lengths.max()) if lengths.size else 0
+        close = np.full((len(tickers), bars), np.nan)
+        high = np.full((len(tickers), bars), np.nan)
+        low = np.full((len(tickers), bars), np.nan)
+        for row, ticker in enumerate(tickers):
+            length = int(lengths[row])
+            if not length:
+                continue
+            series = history[ticker]
+            close[row, bars - length:] = series.close[-length:]
+            high[row, bars - length:] = series.high[-length:]
+            low[row, bars - length:] = series.low[-length:]
+        return cls(tickers=tickers, close=close, high=high, low=low, lengths=lengths)
+
+    @property
+    def mask(self) -> np.ndarray:
+        """Boolean matrix marking which cells hold real bars."""
+
+        bars = self.close.shape[1]
+        return np.arange(bars) >= (bars - self.lengths)[:, None]
+
+
+@dataclass(frozen=True, eq=False)
+class BatchIndicators:
+    """Indicator values per ticker row; NaN means the indicator is undefined."""
+
+    tickers: list[str]
+    sma_short: np.ndarray
+    sma_long: np.ndarray
+    rsi: np.ndarray
+    atr: np.ndarray
+    price_return: np.ndarray
+
+    def snapshot(self, row: int) -> IndicatorSnapshot:
+        columns = (self.sma_short, self.sma_long, self.rsi, self.atr, self.price_return)
+        return IndicatorSnapshot(self.tickers[row], *(_optional(column[row]) for column in columns))
+
+    def to_snapshots(self) -> dict[str, IndicatorSnapshot]:
+        return {ticker: self.snapshot(row) for row, ticker in enumerate(self.tickers)}
+
+
+def required_window() -> int:
+    """Number of trailing bars needed for the default indicator set."""
+
+    return max(SMA_SHORT_PERIOD, SMA_LONG_PERIOD, RSI_PERIOD + 1, ATR_PERIOD + 1, RETURN_LOOKBACK + 1)
+
+
+def compute_indicators(
+    matrix: PriceMatrix,
+    sma_short: int = SMA_SHORT_PERIOD,
+    sma_long: int = SMA_LONG_PERIOD,
+    rsi_period: int = RSI_PERIOD,
+    atr_period: int = ATR_PERIOD,
+    return_lookback: int = RETURN_LOOKBACK,
+) -> BatchIndicators:
+    """Compute the pipeline's indicator set for every ticker in one pass."""
+
+    return BatchIndicators(
+        tickers=matrix.tickers,
+        sma_short=batch_sma(matrix.close, matrix.lengths, sma_short),
+        sma_long=batch_sma(matrix.close, matrix.lengths, sma_long),
+        rsi=batch_rsi(matrix.close, matrix.lengths, rsi_period),
+        atr=batch_atr(matrix.close, matrix.high, matrix.low, matrix.lengths, atr_period),
+        price_return=batch_return(matrix.close, matrix.lengths, return_lookback),
+    )
+
+
+def batch_sma(close: np.ndarray, lengths: np.ndarray, period: int) -> np.ndarray:
+    """Row-wise equivalent of :func:`calculate_sma`."""
+
+    if period <= 0:
+        raise ValueError("period must be positive")
+    counts = np.minimum(lengths, period)
+    sums = np.nansum(close[:, -period:], axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def batch_rsi(close: np.ndarray, lengths: np.ndarray, period: int = RSI_PERIOD) -> np.ndarray:
+    """Row-wise equivalent of :func:`calculate_rsi`."""
+
+    if period <= 0:
+        raise ValueError("period must be positive")
+    if close.shape[1] <= period:
+        return np.full(close.shape[0], np.nan)
+    changes = np.diff(close[:, -(period + 1):], axis=1)
+    avg_gain = np.where(changes > 0, changes, 0.0).sum(axis=1) / period
+    avg_loss = np.where(changes > 0, 0.0, -changes).sum(axis=1) / period
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rsi = np.where(avg_loss == 0, 100.0, 100 - (100 / (1 + avg_gain / avg_loss)))
+    return np.where(lengths > period, rsi, np.nan)
+
+
+def batch_atr(
+    close: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    lengths: np.ndarray,
+    period: int = ATR_PERIOD,
+) -> np.ndarray:
+    """Row-wise equivalent of :func:`calculate_atr`."""
+
+    if period <= 0:
+        raise ValueError("period must be positive")
+    if close.shape[1] <= period:
+        return np.full(close.shape[0], np.nan)
+    window = slice(-period, None)
+    prev_close = close[:, -(period + 1):-1]
+    bar_high = high[:, window]
+    bar_low = low[:, window]
+    true_ranges = np.maximum(
+        bar_high - bar_low,
+        np.maximum(np.abs(bar_high - prev_close), np.abs(bar_low - prev_close)),
+    )
+    return np.where(lengths > period, true_ranges.mean(axis=1), np.nan)
+
+
+def batch_return(close: np.ndarray, lengths: np.ndarray, lookback: int = RETURN_LOOKBACK) -> np.ndarray:
+    """Row-wise equivalent of :func:`calculate_return`."""
+
+    if lookback <= 0:
+        raise ValueError("lookback must be positive")
+    if close.shape[1] <= lookback:
+        return np.full(close.shape[0], np.nan)
+    recent = close[:, -1]
+    previous = close[:, -(lookback + 1)]
+    valid = (lengths > lookback) & (previous != 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(valid, (recent - previous) / previous, np.nan)
+
+
+def _optional(value: float) -> float | None:
+    return None if np.isnan(value) else float(value)
@@ -2,13 +2,34 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+from dataclasses import dataclass, replace
 from datetime import datetime
+from typing import Any, Awaitable, Iterable, Mapping, Sequence, TypeVar
 
-from data_integration.providers.base import MarketDataProvider
+from prometheus_client import Counter, Gauge
 
-from .indicators import calculate_atr, calculate_return, calculate_rsi, calculate_sma
+from data_integration.providers.base import (
+    Fundamental,
+    MarketDataProvider,
+    Quote,
+    fetch_history_concurrently,
+)
+from data_integration.metrics import REGISTRY, stage
+from data_integration.providers.candles import CandleSeries, as_candle_series
+
+from .batch import PriceMatrix, compute_indicators, required_window
+from .resampling import Session, fetch_timeframes, resample_history, source_interval
 from .scoring import IndicatorSnapshot, Recommendation, RecommendationScorer
+from .sharding import score_sharded
+from .streaming import IndicatorState
+
+T = TypeVar("T")
+
+UNIVERSE_SIZE = Gauge(
+    "pipeline_universe_size", "Antal tickers i senaste körningen", ("interval",), registry=REGISTRY
+)
+TICKERS_SCORED = Counter("pipeline_tickers_scored_total", "Scorade tickers", ("interval",), registry=REGISTRY)
 
 
 @dataclass
@@ -17,6 +38,20 @@ class PipelineConfig:
     start: datetime
     end: datetime
     interval: str = "1d"
+    workers: int = 1
+    explain_top: int | None = None
+    session: Session | None = None
+    # Leverantörsintervall som historiken hämtas i; standard är närmaste för ``interval``.
+    source: str | None = None
+
+
+@dataclass(frozen=True)
+class ScoringInputs:
+    """Quotes, fundamenta och indikatorer som en omgång rekommendationer scorades mot."""
+
+    quotes: Mapping[str, Quote]
+    fundamentals: Mapping[str, Fundamental]
+    indicators: Mapping[str, IndicatorSnapshot]
 
 
 class AnalysisPipeline:
@@ -31,37 +66,209 @@ class AnalysisPipeline:
         self.provider = provider
         self.scorer = scorer
         self.config = config
+        self.states: dict[str, IndicatorState] = {}
+        self._history: dict[str, CandleSeries] = {}
+        self._indicators: dict[str, IndicatorSnapshot] = {}
+        self._fundamentals: list[Fundamental] = []
+        self._quotes: dict[str, Quote] = {}
+
+    def run(self, history: Mapping[str, CandleSeries] | None = None) -> list[Recommendation]:
+        """Kör pipeline och returnera rekommendationer.
+
+        Intervall som leverantören inte har (t.ex. ``1w``), eller alla intervall grövre än
+        ``config.source``, härleds från källintervallet.
+        ``history`` är redan hämtad historik för ``config.interval``, t.ex. delad mellan
+        flera tidsramar via :func:`~.resampling.fetch_timeframes`.
+        """
 
-    def run(self) -> list[Recommendation]:
-        """Kör pipeline och returnera rekommendationer."""
+        if history is None:
+            with stage("fetch_history"):
+                history = fetch_timeframes(
+                    self.provider,
+                    self.config.tickers,
+                    start=self.config.start,
+                    end=self.config.end,
+                    intervals=[self.config.interval],
+                    session=self.config.session,
+                    source=self.config.source,
+                )[self.config.interval]
+        with stage("fundamentals"):
+            fundamentals = self.provider.get_fundamentals(self.config.tickers)
+        with stage("quotes"):
+            quotes = self.provider.get_quotes(self.config.tickers)
+        return self._score(history, fundamentals, quotes)
 
-        history = {
-            ticker: self.provider.get_history(
-                ticker,
+    async def arun(self) -> list[Recommendation]:
+        """Asynkron variant av :meth:`run` som hämtar historik för alla tickers samtidigt."""
+
+        interval = self.config.source or source_interval([self.config.interval])
+        get_history_many = getattr(self.provider, "get_history_many", None)
+        if get_history_many is not None:
+            fetched = get_history_many(
+                self.config.tickers,
                 start=self.config.start,
                 end=self.config.end,
-                interval=self.config.interval,
+                interval=interval,
             )
-            for ticker in self.config.tickers
-        }
-        fundamentals = self.provider.get_fundamentals(self.config.tickers)
-        quotes = self.provider.get_quotes(self.config.tickers)
-
-        indicators = {
-            ticker: IndicatorSnapshot(
-                ticker=ticker,
-                sma_short=calculate_sma(candles, 20),
-                sma_long=calculate_sma(candles, 50),
-                rsi=calculate_rsi(candles, 14),
-                atr=calculate_atr(candles, 14),
-                price_return=calculate_return(candles, 5),
+        else:
+            fetched = fetch_history_concurrently(
+                self.provider,
+                self.config.tickers,
+                start=self.config.start,
+                end=self.config.end,
+                interval=interval,
             )
-            for ticker, candles in history.items()
-        }
+        raw_history, fundamentals, quotes = await asyncio.gather(
+            _staged("fetch_history", fetched),
+            _staged("fundamentals", asyncio.to_thread(self.provider.get_fundamentals, self.config.tickers)),
+            _staged("quotes", asyncio.to_thread(self.provider.get_quotes, self.config.tickers)),
+        )
+        if interval != self.config.interval:
+            with stage("resample"):
+                raw_history = resample_history(
+                    {ticker: as_candle_series(candles) for ticker, candles in raw_history.items()},
+                    self.config.interval,
+                    self.config.session,
+                    interval,
+                )
+        return self._score(raw_history, fundamentals, quotes)
+
+    def _score(
+        self,
+        raw_history: Mapping[str, CandleSeries | Sequence[dict[str, Any]]],
+        fundamentals: list[Fundamental],
+        quotes: list[Quote],
+    ) -> list[Recommendation]:
+        with stage("prepare"):
+            history = {ticker: as_candle_series(raw_history[ticker]) for ticker in self.config.tickers}
+            matrix = PriceMatrix.from_series(history, window=required_window())
+        UNIVERSE_SIZE.labels(interval=self.config.interval).set(len(history))
+        if self.config.workers > 1:
+            with stage("scoring"):
+                recommendations, indicators = score_sharded(
+                    matrix, self.scorer, fundamentals, quotes, workers=self.config.workers
+                )
+        elif self.config.explain_top is not None:
+            with stage("indicators"):
+                batch = compute_indicators(matrix)
+                indicators = batch.to_snapshots()
+            with stage("scoring"):
+                recommendations = self.scorer.score_batch(
+                    batch,
+                    fundamentals,
+                    quotes,
+                    active=matrix.lengths > 0,
+                    explain_top=self.config.explain_top,
+                )
+        else:
+            with stage("indicators"):
+                indicators = compute_indicators(matrix).to_snapshots()
+            with stage("scoring"):
+                recommendations = self.scorer.score(
+                    history=history,
+                    fundamentals=fundamentals,
+                    quotes=quotes,
+                    indicators=indicators,
+                )
+        TICKERS_SCORED.labels(interval=self.config.interval).inc(len(recommendations))
+
+        self.states = {}
+        self._history = dict(history)
+        self._indicators = indicators
+        self._fundamentals = fundamentals
+        self._quotes = {quote.ticker: quote for quote in quotes}
+        return recommendations
 
+    def inputs(self) -> ScoringInputs:
+        """Kopia av indata från senaste körningen; påverkas inte av senare :meth:`reprice`."""
+
+        return ScoringInputs(
+            quotes=dict(self._quotes),
+            fundamentals={fundamental.ticker: fundamental for fundamental in self._fundamentals},
+            indicators=dict(self._indicators),
+        )
+
+    def explain(
+        self, recommendations: Iterable[Recommendation], inputs: ScoringInputs | None = None
+    ) -> list[Recommendation]:
+        """Kopior med motiveringar för rekommendationer som scorats utan dem (se ``explain_top``).
+
+        Motiveringarna beräknas mot ``inputs``, t.ex. de som sparades med ett snapshot, så
+        att de stämmer med scoren; standard är pipelinens nuvarande indata. Originalen ändras inte.
+        """
+
+        inputs = inputs or self.inputs()
+        explained: list[Recommendation] = []
+        for recommendation in recommendations:
+            if not recommendation.reasoning:
+                ticker = recommendation.ticker
+                reasoning = self.scorer.score_one(
+                    ticker,
+                    inputs.quotes.get(ticker),
+                    inputs.fundamentals.get(ticker),
+                    inputs.indicators.get(ticker),
+                ).reasoning
+                recommendation = replace(recommendation, reasoning=reasoning)
+            explained.append(recommendation)
+        return explained
+
+    def reprice(self, quotes: Iterable[Quote]) -> list[Recommendation]:
+        """Scora om med nya quotes mot oförändrade indikatorer.
+
+        Till skillnad från :meth:`refresh` läggs ingen ny stapel till, så täta
+        quote-uppdateringar under en pågående stapel förskjuter inte indikatorerna.
+        """
+
+        for quote in quotes:
+            if quote.ticker in self._history:
+                self._quotes[quote.ticker] = quote
         return self.scorer.score(
-            history=history,
-            fundamentals=fundamentals,
-            quotes=quotes,
-            indicators=indicators,
+            history=self._history,
+            fundamentals=self._fundamentals,
+            quotes=list(self._quotes.values()),
+            indicators=self._indicators,
         )
+
+    def refresh(self, quotes: Iterable[Quote]) -> list[Recommendation]:
+        """Uppdatera indikatorer från nya quotes utan att hämta om historiken.
+
+        Varje quote läggs till som en ny, stängd stapel och flyttar SMA-, RSI-, ATR- och
+        avkastningsfönstren ett steg, så anropa bara med stängningskursen när en stapel
+        har stängt. Quotes under en pågående stapel hör hemma i :meth:`reprice` (som
+        schemaläggaren använder); här skulle varje quote förskjuta indikatorerna.
+        Indikatortillståndet seedas från den historik som hämtades i senaste :meth:`run`,
+        eller tas från :attr:`states` om det återställts från en checkpoint, och uppdateras
+        därefter i konstant tid per quote. Resultatet omfattar tickers med historik och
+        tickers med återställt tillstånd, så en pipeline som bara har checkpointade
+        ``states`` behöver aldrig köra :meth:`run`.
+        """
+
+        for quote in quotes:
+            state = self.states.get(quote.ticker)
+            if state is None:
+                series = self._history.get(quote.ticker)
+                if series is None:
+                    continue
+                state = self.states[quote.ticker] = IndicatorState.from_series(series)
+            state.update(quote.price)
+            self._indicators[quote.ticker] = state.snapshot(quote.ticker)
+            self._quotes[quote.ticker] = quote
+
+        tickers = [ticker for ticker, series in self._history.items() if len(series)]
+        tickers += [ticker for ticker in self.states if ticker not in self._history]
+        fundamentals_map = {fundamental.ticker: fundamental for fundamental in self._fundamentals}
+        recommendations: list[Recommendation] = []
+        for ticker in tickers:
+            if ticker not in self._indicators and ticker in self.states:
+                self._indicators[ticker] = self.states[ticker].snapshot(ticker)
+            recommendations.append(
+                self.scorer.score_one(
+                    ticker, self._quotes.get(ticker), fundamentals_map.get(ticker), self._indicators.get(ticker)
+                )
+            )
+        return recommendations
+
+
+async def _staged(name: str, awaitable: Awaitable[T]) -> T:
+    with stage(name):
+        return await awaitable
@@ -0,0 +1,83 @@
+"""Top-K ranking and cursor pagination of recommendations."""
+
+from __future__ import annotations
+
+import base64
+import heapq
+import json
+from dataclasses import dataclass
+from typing import Iterable
+
+from .scoring import Recommendation
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+@dataclass
+class RankedPage:
+    results: list[Recommendation]
+    total: int
+    next_cursor: str | None = None
+
+
+def rank_recommendations(
+    recommendations: Iterable[Recommendation],
+    limit: int | None = None,
+    offset: int = 0,
+    min_score: float | None = None,
+    signals: Iterable[str] | None = None,
+    cursor: str | None = None,
+) -> RankedPage:
+    """Return one page of recommendations ordered by score (descending) and ticker.
+
+    Only ``offset + limit`` items are selected, with a bounded heap, so the full result
+    set is never sorted. ``total`` counts every recommendation matching the filters.
+    ``next_cursor`` points just past the last returned item; the (score, ticker) order is
+    total, so a cursor stays valid when other tickers are added or removed.
+    """
+
+    if limit is not None and limit <= 0:
+        raise ValueError("limit must be positive")
+    if offset < 0:
+        raise ValueError("offset must not be negative")
+    allowed = {signal.upper() for signal in signals} if signals else None
+    after = None
+    if cursor:
+        cursor_score, cursor_ticker = decode_cursor(cursor)
+        after = (-cursor_score, cursor_ticker)
+
+    matching = [
+        recommendation
+        for recommendation in recommendations
+        if (min_score is None or recommendation.score >= min_score)
+        and (allowed is None or recommendation.signal in allowed)
+    ]
+    remaining = [item for item in matching if _key(item) > after] if after is not None else matching
+
+    if limit is None:
+        selected = sorted(remaining, key=_key)[offset:]
+    else:
+        selected = heapq.nsmallest(offset + limit, remaining, key=_key)[offset:]
+    has_more = limit is not None and len(remaining) > offset + limit
+    next_cursor = encode_cursor(selected[-1]) if has_more and selected else None
+    return RankedPage(results=selected, total=len(matching), next_cursor=next_cursor)
+
+
+def encode_cursor(recommendation: Recommendation) -> str:
+    raw = json.dumps([recommendation.score, recommendation.ticker], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[float, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, ticker = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(score), str(ticker)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorError("invalid cursor") from exc
+
+
+def _key(recommendation: Recommendation) -> tuple[float, str]:
+    return -recommendation.score, recommendation.ticker
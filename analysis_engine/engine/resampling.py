@@ -0,0 +1,189 @@
+"""Vectorized resampling of candles into coarser timeframes (1h -> 1d -> 1w)."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import UTC, datetime, time
+from functools import lru_cache
+from typing import Iterable, Mapping, Sequence
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from data_integration.providers.base import MarketDataProvider, fetch_history_batch
+from data_integration.providers.candles import CandleSeries
+
+# Intervals providers serve directly, finest first; anything else is derived from one of them.
+NATIVE_INTERVALS = ("1h", "1d")
+INTERVAL_SECONDS = {"1h": 3_600, "1d": 86_400, "1w": 7 * 86_400}
+_DAY = 86_400
+# Day 0 of the epoch was a Thursday; shifting by three days makes weeks start on Monday.
+_MONDAY_SHIFT = 3
+
+
+@dataclass(frozen=True)
+class Session:
+    """Trading session in exchange-local time; bars outside ``[open, close)`` are dropped.
+
+    Days and weeks are bucketed by the exchange's local calendar, so a US session is
+    not split at UTC midnight. Offsets follow ``timezone`` including daylight saving.
+    """
+
+    timezone: str = "UTC"
+    open: time = time(0, 0)
+    close: time | None = None
+
+    def local_offsets(self, timestamps: np.ndarray) -> np.ndarray:
+        """UTC offset in seconds per timestamp.
+
+        Offsets are looked up once per UTC day; only days with a daylight saving
+        transition are resolved per timestamp.
+        """
+
+        if self.timezone == "UTC" or timestamps.size == 0:
+            return np.zeros(timestamps.shape[0])
+        days, inverse = np.unique(timestamps // _DAY, return_inverse=True)
+        first = np.array([_utc_offset(self.timezone, day * _DAY) for day in days])
+        last = np.array([_utc_offset(self.timezone, day * _DAY + _DAY - 1) for day in days])
+        offsets = first[inverse]
+        switching = (first != last)[inverse]
+        if switching.any():
+            offsets[switching] = [_utc_offset(self.timezone, value) for value in timestamps[switching]]
+        return offsets
+
+
+def source_interval(intervals: Iterable[str]) -> str:
+    """The native interval to fetch so that every requested interval can be derived from it."""
+
+    requested = list(intervals)
+    for interval in requested:
+        if interval not in INTERVAL_SECONDS:
+            raise ValueError(f"Unsupported interval: {interval}")
+    finest = min(INTERVAL_SECONDS[interval] for interval in requested)
+    native = [interval for interval in NATIVE_INTERVALS if INTERVAL_SECONDS[interval] <= finest]
+    return native[-1]
+
+
+def resample(
+    series: CandleSeries,
+    interval: str,
+    session: Session | None = None,
+    source: str | None = None,
+) -> CandleSeries:
+    """Aggregate ``series`` into ``interval`` bars with OHLCV semantics.
+
+    Each bar opens with its first candle, closes with its last, spans the extreme
+    high/low and sums volume. Bars are stamped with the UTC time of their local period
+    start (midnight, or Monday midnight for weeks). The last bar may be partial.
+
+    ``session`` only applies to intraday input (``source``, or inferred from the bar
+    spacing): daily bars are already one per exchange day and are stamped at UTC
+    midnight, so they are bucketed by that date and never filtered by trading hours.
+    """
+
+    if interval not in INTERVAL_SECONDS:
+        raise ValueError(f"Unsupported interval: {interval}")
+    if source is not None and source not in INTERVAL_SECONDS:
+        raise ValueError(f"Unsupported interval: {source}")
+    intraday = INTERVAL_SECONDS[source] < _DAY if source is not None else _is_intraday(series.timestamp)
+    if not intraday:
+        session = None
+    session_or_utc = session or Session()
+    timestamp = series.timestamp
+    offsets = session_or_utc.local_offsets(timestamp)
+    local = timestamp + offsets
+    keep = _in_session(local, session)
+    if keep is not None:
+        series = CandleSeries(*(column[keep] for column in _columns(series)))
+        local, offsets = local[keep], offsets[keep]
+    if len(series) == 0:
+        return CandleSeries.empty()
+
+    if interval == "1w":
+        buckets = (local // _DAY + _MONDAY_SHIFT) // 7
+        period_start = buckets * 7 * _DAY - _MONDAY_SHIFT * _DAY
+    else:
+        step = INTERVAL_SECONDS[interval]
+        buckets = local // step
+        period_start = buckets * step
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(series)] - 1
+    # Local midnight can have another offset than the bucket's first bar (e.g. on DST days).
+    labels = period_start[starts]
+    labels = labels - session_or_utc.local_offsets(labels - offsets[starts])
+    return CandleSeries(
+        labels,
+        series.open[starts],
+        np.maximum.reduceat(series.high, starts),
+        np.minimum.reduceat(series.low, starts),
+        series.close[ends],
+        np.add.reduceat(series.volume, starts),
+    )
+
+
+def resample_history(
+    history: Mapping[str, CandleSeries],
+    interval: str,
+    session: Session | None = None,
+    source: str | None = None,
+) -> dict[str, CandleSeries]:
+    return {ticker: resample(series, interval, session, source) for ticker, series in history.items()}
+
+
+def fetch_timeframes(
+    provider: MarketDataProvider,
+    tickers: Sequence[str],
+    start: datetime,
+    end: datetime,
+    intervals: Iterable[str],
+    session: Session | None = None,
+    source: str | None = None,
+) -> dict[str, dict[str, CandleSeries]]:
+    """History for several intervals from a single fetch.
+
+    ``source`` (default: the finest native interval among ``intervals``) is fetched
+    once and every other interval is resampled from it, e.g. ``1d`` and ``1w`` from
+    ``1h``. Callers that refresh intervals separately pass the same ``source`` every
+    time so an interval's data does not depend on what was requested alongside it.
+    """
+
+    requested = list(dict.fromkeys(intervals))
+    finest = source_interval(requested)
+    base = source or finest
+    if base not in NATIVE_INTERVALS or INTERVAL_SECONDS[base] > INTERVAL_SECONDS[finest]:
+        raise ValueError(f"Cannot derive {', '.join(requested)} from {base}")
+    fetched = fetch_history_batch(provider, tickers, start=start, end=end, interval=base)
+    return {
+        interval: fetched if interval == base else resample_history(fetched, interval, session, base)
+        for interval in requested
+    }
+
+
+@lru_cache(maxsize=65_536)
+def _utc_offset(timezone: str, timestamp: float) -> float:
+    offset = datetime.fromtimestamp(timestamp, UTC).astimezone(ZoneInfo(timezone)).utcoffset()
+    return offset.total_seconds() if offset is not None else 0.0
+
+
+def _is_intraday(timestamps: np.ndarray) -> bool:
+    steps = np.diff(timestamps)
+    steps = steps[steps > 0]
+    return bool(steps.size) and float(steps.min()) < _DAY
+
+
+def _in_session(local: np.ndarray, session: Session | None) -> np.ndarray | None:
+    if session is None or (session.open == time(0, 0) and session.close is None):
+        return None
+    seconds = local % _DAY
+    keep = seconds >= _seconds(session.open)
+    if session.close is not None:
+        keep &= seconds < _seconds(session.close)
+    return keep
+
+
+def _seconds(value: time) -> int:
+    return value.hour * 3_600 + value.minute * 60 + value.second
+
+
+def _columns(series: CandleSeries) -> tuple[np.ndarray, ...]:
+    return series.timestamp, series.open, series.high, series.low, series.close, series.volume
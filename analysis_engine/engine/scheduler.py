@@ -0,0 +1,328 @@
+"""Bakgrundsschemaläggare som förberäknar versionerade rekommendations-snapshots."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Callable, Iterable
+
+from data_integration.metrics import stage
+from data_integration.providers.base import Quote
+from data_integration.providers.candles import CandleSeries
+
+from .pipeline import AnalysisPipeline, PipelineConfig, ScoringInputs
+from .resampling import Session, fetch_timeframes, source_interval
+from .scoring import Recommendation
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class UniverseConfig:
+    """Ett tickeruniversum som räknas om med jämna mellanrum."""
+
+    name: str
+    tickers: tuple[str, ...]
+    interval: str = "1d"
+    lookback_days: int = 120
+    cadence: float = 300.0
+    quote_cadence: float | None = None
+    session: Session | None = None
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.name, self.interval
+
+    def matches(self, tickers: Iterable[str], interval: str, lookback_days: int) -> bool:
+        return (
+            interval == self.interval
+            and lookback_days == self.lookback_days
+            and set(tickers) == set(self.tickers)
+        )
+
+
+@dataclass
+class RecommendationSnapshot:
+    universe: str
+    interval: str
+    version: int
+    generated_at: datetime
+    cadence: float
+    recommendations: list[Recommendation]
+    pipeline: AnalysisPipeline = field(repr=False)
+    # Indata som ``recommendations`` scorades mot; pipelinen kan ha scorat om sedan dess.
+    inputs: ScoringInputs = field(repr=False)
+
+    def age(self, now: datetime | None = None) -> timedelta:
+        return (now or datetime.now(UTC)) - self.generated_at
+
+    def is_stale(self, now: datetime | None = None) -> bool:
+        """Sant om snapshotet missat mer än en schemalagd omräkning."""
+
+        return self.age(now).total_seconds() > 2 * self.cadence
+
+
+class SnapshotStore:
+    """Trådsäker lagring av de senaste snapshot-versionerna per (universum, intervall)."""
+
+    def __init__(self, keep: int = 3) -> None:
+        self._keep = keep
+        self._snapshots: dict[tuple[str, str], deque[RecommendationSnapshot]] = {}
+        self._versions: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def publish(
+        self,
+        universe: UniverseConfig,
+        recommendations: list[Recommendation],
+        pipeline: AnalysisPipeline,
+        generated_at: datetime,
+    ) -> RecommendationSnapshot:
+        with self._lock:
+            version = self._versions.get(universe.key, 0) + 1
+            self._versions[universe.key] = version
+            snapshot = RecommendationSnapshot(
+                universe=universe.name,
+                interval=universe.interval,
+                version=version,
+                generated_at=generated_at,
+                cadence=universe.cadence,
+                recommendations=recommendations,
+                pipeline=pipeline,
+                inputs=pipeline.inputs(),
+            )
+            self._snapshots.setdefault(universe.key, deque(maxlen=self._keep)).append(snapshot)
+            return snapshot
+
+    def latest(self, universe: str, interval: str) -> RecommendationSnapshot | None:
+        with self._lock:
+            versions = self._snapshots.get((universe, interval))
+            return versions[-1] if versions else None
+
+    def versions(self, universe: str, interval: str) -> list[RecommendationSnapshot]:
+        with self._lock:
+            return list(self._snapshots.get((universe, interval), ()))
+
+
+class RecommendationScheduler:
+    """Kör pipelinen för konfigurerade universum i en bakgrundstråd och publicerar snapshots."""
+
+    def __init__(
+        self,
+        universes: Iterable[UniverseConfig],
+        pipeline_factory: Callable[[PipelineConfig], AnalysisPipeline],
+        store: SnapshotStore | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.universes = {universe.key: universe for universe in universes}
+        # En fast källa per grupp: den finaste tidsramen bland gruppens alla intervall.
+        self._sources = {
+            universe.key: source_interval([member.interval for member in group])
+            for group in group_shared_history(self.universes.values())
+            for universe in group
+        }
+        self.store = store or SnapshotStore()
+        self._pipeline_factory = pipeline_factory
+        self._clock = clock
+        self._due: dict[tuple[str, str], float] = {key: 0.0 for key in self.universes}
+        self._quotes_due: dict[tuple[str, str], float] = {
+            key: 0.0 for key, universe in self.universes.items() if universe.quote_cadence
+        }
+        self._listeners: list[Callable[[RecommendationSnapshot], None]] = []
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._refresh_lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[[RecommendationSnapshot], None]) -> None:
+        """Anropas med varje nytt snapshot, från den tråd som publicerade det."""
+
+        self._listeners.append(listener)
+
+    def find(self, tickers: Iterable[str], interval: str, lookback_days: int) -> UniverseConfig | None:
+        tickers = list(tickers)
+        for universe in self.universes.values():
+            if universe.matches(tickers, interval, lookback_days):
+                return universe
+        return None
+
+    def latest(self, universe: UniverseConfig) -> RecommendationSnapshot | None:
+        return self.store.latest(universe.name, universe.interval)
+
+    def refresh(self, name: str | None = None) -> list[RecommendationSnapshot]:
+        """Räkna om (valda) universum direkt och returnera de nya snapshoten."""
+
+        targets = [universe for universe in self.universes.values() if name is None or universe.name == name]
+        snapshots: list[RecommendationSnapshot] = []
+        for group in group_shared_history(targets):
+            snapshots += self._refresh_group(group)
+        return snapshots
+
+    def apply_quotes(self, quotes: Iterable[Quote], name: str | None = None) -> list[RecommendationSnapshot]:
+        """Scora om senaste snapshot för (valda) universum med nya quotes och publicera resultatet."""
+
+        quotes = list(quotes)
+        snapshots = []
+        for universe in self.universes.values():
+            if name is not None and universe.name != name:
+                continue
+            relevant = [quote for quote in quotes if quote.ticker in universe.tickers]
+            if relevant:
+                snapshot = self._reprice(universe, relevant)
+                if snapshot is not None:
+                    snapshots.append(snapshot)
+        return snapshots
+
+    def trigger(self, name: str | None = None) -> None:
+        """Be bakgrundstråden räkna om (valda) universum så snart som möjligt."""
+
+        for key, universe in self.universes.items():
+            if name is None or universe.name == name:
+                self._due[key] = 0.0
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._loop, name="recommendation-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stopping.is_set():
+            now = self._clock()
+            due = [universe for key, universe in self.universes.items() if self._due[key] <= now]
+            for group in group_shared_history(due):
+                if self._stopping.is_set():
+                    return
+                try:
+                    self._refresh_group(group)
+                except Exception:  # noqa: BLE001 - keep serving the previous snapshot
+                    intervals = ",".join(universe.interval for universe in group)
+                    logger.exception("Omräkning av %s/%s misslyckades", group[0].name, intervals)
+                    for universe in group:
+                        self._due[universe.key] = self._clock() + universe.cadence
+            for key, universe in self.universes.items():
+                if self._stopping.is_set():
+                    return
+                if universe in due or key not in self._quotes_due or self._quotes_due[key] > now:
+                    continue
+                try:
+                    self._poll_quotes(universe)
+                except Exception:  # noqa: BLE001 - nästa omräkning hämtar quotes ändå
+                    logger.exception("Quote-uppdatering av %s/%s misslyckades", universe.name, universe.interval)
+                self._quotes_due[key] = self._clock() + (universe.quote_cadence or universe.cadence)
+            next_due = min([*self._due.values(), *self._quotes_due.values()], default=now + 60.0)
+            self._wake.wait(timeout=max(next_due - self._clock(), 0.0))
+            self._wake.clear()
+
+    def _refresh(self, universe: UniverseConfig) -> RecommendationSnapshot:
+        return self._refresh_group([universe])[0]
+
+    def _refresh_group(self, universes: list[UniverseConfig]) -> list[RecommendationSnapshot]:
+        """Räkna om universum med samma tickers och fönster från en gemensam hämtning.
+
+        Källintervallet är fast per grupp (se ``_sources``), så ``1d`` härleds från ``1h``
+        även när det räknas om ensamt och resultatet inte beror på vad som förföll samtidigt.
+        """
+
+        with self._refresh_lock:
+            end = datetime.now(UTC)
+            pipelines = [
+                self._pipeline_factory(
+                    PipelineConfig(
+                        tickers=list(universe.tickers),
+                        start=end - timedelta(days=universe.lookback_days),
+                        end=end,
+                        interval=universe.interval,
+                        explain_top=0,
+                        session=universe.session,
+                        source=self._sources[universe.key],
+                    )
+                )
+                for universe in universes
+            ]
+            history: dict[str, dict[str, CandleSeries]] = {}
+            if len(universes) > 1:
+                first = pipelines[0]
+                with stage("fetch_history"):
+                    history = fetch_timeframes(
+                        first.provider,
+                        first.config.tickers,
+                        start=first.config.start,
+                        end=end,
+                        intervals=[universe.interval for universe in universes],
+                        session=first.config.session,
+                        source=first.config.source,
+                    )
+            snapshots = []
+            for universe, pipeline in zip(universes, pipelines):
+                recommendations = pipeline.run(history.get(universe.interval))
+                self._due[universe.key] = self._clock() + universe.cadence
+                if universe.key in self._quotes_due:
+                    self._quotes_due[universe.key] = self._clock() + (universe.quote_cadence or universe.cadence)
+                snapshots.append(self._publish(universe, recommendations, pipeline))
+            return snapshots
+
+    def _poll_quotes(self, universe: UniverseConfig) -> None:
+        snapshot = self.latest(universe)
+        if snapshot is not None:
+            self._reprice(universe, snapshot.pipeline.provider.get_quotes(list(universe.tickers)))
+
+    def _reprice(self, universe: UniverseConfig, quotes: list[Quote]) -> RecommendationSnapshot | None:
+        with self._refresh_lock:
+            snapshot = self.latest(universe)
+            if snapshot is None:
+                return None
+            recommendations = snapshot.pipeline.reprice(quotes)
+            return self._publish(universe, recommendations, snapshot.pipeline)
+
+    def _publish(
+        self,
+        universe: UniverseConfig,
+        recommendations: list[Recommendation],
+        pipeline: AnalysisPipeline,
+    ) -> RecommendationSnapshot:
+        snapshot = self.store.publish(universe, recommendations, pipeline, generated_at=datetime.now(UTC))
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception:  # noqa: BLE001 - en trasig lyssnare får inte stoppa schemaläggaren
+                logger.exception("Lyssnare för %s/%s misslyckades", universe.name, universe.interval)
+        return snapshot
+
+
+def group_shared_history(universes: Iterable[UniverseConfig]) -> list[list[UniverseConfig]]:
+    """Gruppera universum vars historik kan hämtas en gång och härledas per intervall."""
+
+    groups: dict[tuple[str, frozenset[str], int, Session | None], list[UniverseConfig]] = {}
+    for universe in universes:
+        key = (universe.name, frozenset(universe.tickers), universe.lookback_days, universe.session)
+        groups.setdefault(key, []).append(universe)
+    return list(groups.values())
+
+
+def parse_cadences(value: str) -> dict[str, float]:
+    """Tolka t.ex. ``"1d:300,1h:60"`` till sekunder per intervall."""
+
+    cadences: dict[str, float] = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        interval, _, seconds = item.partition(":")
+        cadence = float(seconds)
+        if cadence <= 0:
+            raise ValueError("cadence must be positive")
+        cadences[interval.strip()] = cadence
+    return cadences
@@ -3,9 +3,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Mapping, Sequence
+from typing import TYPE_CHECKING, Iterable, Mapping, Sequence
+
+import numpy as np
 
 from data_integration.providers.base import Fundamental, Quote
+from data_integration.providers.candles import CandleSeries
+
+if TYPE_CHECKING:
+    from .batch import BatchIndicators
 
 
 @dataclass
@@ -26,12 +32,56 @@ class IndicatorSnapshot:
     price_return: float | None = None
 
 
+@dataclass(frozen=True)
+class ScoringConfig:
+    """Weights and thresholds used by :class:`RecommendationScorer`."""
+
+    baseline: float = 30.0
+    trend_scale: float = 25.0
+    trend_cap: float = 20.0
+    trend_floor: float = -15.0
+    rsi_oversold: float = 30.0
+    rsi_neutral: float = 45.0
+    rsi_overbought: float = 70.0
+    rsi_healthy_score: float = 12.0
+    rsi_recovering_score: float = 6.0
+    rsi_oversold_score: float = -10.0
+    rsi_overbought_score: float = -6.0
+    momentum_cap: float = 15.0
+    atr_threshold: float = 0.08
+    atr_reward: float = 10.0
+    atr_penalty: float = 12.0
+    pe_cheap: float = 18.0
+    pe_fair: float = 30.0
+    pe_cheap_score: float = 15.0
+    pe_fair_score: float = 8.0
+    pe_expensive_score: float = -10.0
+    roe_target: float = 25.0
+    roe_cap: float = 12.0
+    roe_floor: float = -6.0
+    debt_low: float = 0.5
+    debt_moderate: float = 1.0
+    debt_low_score: float = 8.0
+    debt_moderate_score: float = 4.0
+    debt_high_score: float = -6.0
+    buy_cutoff: float = 70.0
+    accumulate_cutoff: float = 50.0
+    hold_cutoff: float = 40.0
+    trim_cutoff: float = 30.0
+
+
+DEFAULT_SCORING_CONFIG = ScoringConfig()
+
+
 class RecommendationScorer:
     """Calculate scores, signals and reasoning based on technical/fundamental data."""
 
+    def __init__(self, config: ScoringConfig | None = None) -> None:
+        self.config = config or DEFAULT_SCORING_CONFIG
+
     def score(
         self,
-        history: Mapping[str, Sequence[dict]],
+        history: Mapping[str, CandleSeries | Sequence[dict]],
         fundamentals: Sequence[Fundamental],
         quotes: Sequence[Quote],
         indicators: Mapping[str, IndicatorSnapshot],
@@ -44,43 +94,209 @@ class RecommendationScorer:
             if not candles:
                 continue
 
-            latest_quote = price_map.get(ticker)
-            fundamenta = fundamentals_map.get(ticker)
-            indicator = indicators.get(ticker)
+            results.append(
+                self.score_one(ticker, price_map.get(ticker), fundamentals_map.get(ticker), indicators.get(ticker))
+            )
+        return results
+
+    def score_one(
+        self,
+        ticker: str,
+        quote: Quote | None,
+        fundamental: Fundamental | None,
+        indicator: IndicatorSnapshot | None,
+    ) -> Recommendation:
+        """Score, signal and reasoning for a single ticker; :meth:`score` applies this per ticker."""
+
+        score, reasoning = self._calculate_score(quote, fundamental, indicator)
+        return Recommendation(ticker=ticker, score=score, signal=self.signal_for(score), reasoning=reasoning)
+
+    def score_batch(
+        self,
+        indicators: BatchIndicators,
+        fundamentals: Sequence[Fundamental],
+        quotes: Sequence[Quote],
+        active: np.ndarray | None = None,
+        explain_top: int = 0,
+        explain: Iterable[str] = (),
+    ) -> list[Recommendation]:
+        """Vectorized equivalent of :meth:`score` over a whole universe.
+
+        Scores and signals are identical to the scalar path. Reasoning is only formatted
+        for the ``explain_top`` highest scores and the tickers listed in ``explain``;
+        every other recommendation gets an empty reasoning list.
+        """
 
-            score, reasoning = self._calculate_score(latest_quote, fundamenta, indicator)
-            signal = self._derive_signal(score)
+        tickers = indicators.tickers
+        scores = self.score_arrays(indicators, fundamentals, quotes)
+        signals = self.signal_arrays(scores)
+        rows = np.arange(len(tickers)) if active is None else np.flatnonzero(active)
 
-            results.append(Recommendation(ticker=ticker, score=score, signal=signal, reasoning=reasoning))
+        explained = set(explain)
+        if explain_top > 0 and rows.size:
+            top = rows[np.argsort(-scores[rows], kind="stable")[:explain_top]]
+            explained.update(tickers[row] for row in top.tolist())
+        fundamentals_map = {f.ticker: f for f in fundamentals}
+        price_map = {quote.ticker: quote for quote in quotes}
+
+        results: list[Recommendation] = []
+        for row in rows.tolist():
+            ticker = tickers[row]
+            reasoning: list[str] = []
+            if ticker in explained:
+                reasoning = self.score_one(
+                    ticker, price_map.get(ticker), fundamentals_map.get(ticker), indicators.snapshot(row)
+                ).reasoning
+            results.append(
+                Recommendation(ticker=ticker, score=float(scores[row]), signal=str(signals[row]), reasoning=reasoning)
+            )
         return results
 
+    def score_arrays(
+        self,
+        indicators: BatchIndicators,
+        fundamentals: Sequence[Fundamental],
+        quotes: Sequence[Quote],
+    ) -> np.ndarray:
+        """Compute the :meth:`score_one` score for every ticker row with array operations."""
+
+        tickers = indicators.tickers
+        fundamentals_map = {f.ticker: f for f in fundamentals}
+        price_map = {quote.ticker: quote for quote in quotes}
+        price = _column(price_map, tickers, "price")
+        pe_ratio, roe, debt_to_equity, zeroed = _fundamental_columns(fundamentals_map, tickers)
+        sma_short, sma_long, rsi, atr, price_return = _indicator_columns(indicators)
+        # A quote price given as NaN poisons the ATR term the same way.
+        zeroed |= _given_nan(price_map, tickers, "price") & ~np.isnan(atr)
+        scores = self.score_values(
+            sma_short=sma_short,
+            sma_long=sma_long,
+            rsi=rsi,
+            atr=atr,
+            price_return=price_return,
+            price=price,
+            pe_ratio=pe_ratio,
+            roe=roe,
+            debt_to_equity=debt_to_equity,
+        )
+        return np.where(zeroed, 0.0, scores)
+
+    def score_values(
+        self,
+        *,
+        sma_short: np.ndarray,
+        sma_long: np.ndarray,
+        rsi: np.ndarray,
+        atr: np.ndarray,
+        price_return: np.ndarray,
+        price: np.ndarray,
+        pe_ratio: np.ndarray,
+        roe: np.ndarray,
+        debt_to_equity: np.ndarray,
+    ) -> np.ndarray:
+        """Array core of :meth:`score_arrays`; NaN marks a missing input.
+
+        Inputs broadcast against each other, so e.g. a (tickers × bars) indicator panel
+        can be scored against per-ticker fundamentals of shape (tickers, 1).
+        """
+
+        cfg = self.config
+        with np.errstate(invalid="ignore", divide="ignore"):
+            has_trend = ~np.isnan(sma_short) & ~np.isnan(sma_long)
+            trend_raw = np.where(sma_long != 0, (sma_short - sma_long) / sma_long * cfg.trend_scale, 0.0)
+            trend_score = np.where(has_trend, np.maximum(np.minimum(trend_raw, cfg.trend_cap), cfg.trend_floor), 0.0)
+
+            rsi_score = np.select(
+                [
+                    np.isnan(rsi),
+                    (rsi >= cfg.rsi_neutral) & (rsi <= cfg.rsi_overbought),
+                    (rsi >= cfg.rsi_oversold) & (rsi < cfg.rsi_neutral),
+                    rsi < cfg.rsi_oversold,
+                ],
+                [0.0, cfg.rsi_healthy_score, cfg.rsi_recovering_score, cfg.rsi_oversold_score],
+                cfg.rsi_overbought_score,
+            )
+
+            momentum = np.maximum(np.minimum(price_return * 100, cfg.momentum_cap), -cfg.momentum_cap)
+            momentum_score = np.where(np.isnan(price_return), 0.0, momentum)
+
+            has_vol = ~np.isnan(atr) & ~np.isnan(price) & (price != 0)
+            atr_pct = atr / price
+            threshold = cfg.atr_threshold
+            vol = np.where(
+                atr_pct <= 0,
+                cfg.atr_reward,
+                np.where(
+                    atr_pct < threshold,
+                    (threshold - atr_pct) / threshold * cfg.atr_reward,
+                    -((atr_pct - threshold) / threshold * cfg.atr_penalty),
+                ),
+            )
+            vol_score = np.where(has_vol, vol, 0.0)
+
+            pe_score = np.select(
+                [np.isnan(pe_ratio), pe_ratio <= cfg.pe_cheap, pe_ratio <= cfg.pe_fair],
+                [0.0, cfg.pe_cheap_score, cfg.pe_fair_score],
+                cfg.pe_expensive_score,
+            )
+            roe_raw = np.maximum(np.minimum(roe / cfg.roe_target * cfg.roe_cap, cfg.roe_cap), cfg.roe_floor)
+            roe_score = np.where(np.isnan(roe), 0.0, roe_raw)
+            debt_score = np.select(
+                [np.isnan(debt_to_equity), debt_to_equity <= cfg.debt_low, debt_to_equity <= cfg.debt_moderate],
+                [0.0, cfg.debt_low_score, cfg.debt_moderate_score],
+                cfg.debt_high_score,
+            )
+
+        # Same summation order as _calculate_score so results match bit for bit.
+        score = np.float64(cfg.baseline)
+        for component in (trend_score, rsi_score, momentum_score, vol_score, pe_score, roe_score, debt_score):
+            score = score + component
+        return np.maximum(0.0, np.minimum(score, 100.0))
+
+    def signal_arrays(self, scores: np.ndarray) -> np.ndarray:
+        """Vectorized :meth:`signal_for`."""
+
+        cfg = self.config
+        return np.select(
+            [
+                scores >= cfg.buy_cutoff,
+                scores >= cfg.accumulate_cutoff,
+                scores >= cfg.hold_cutoff,
+                scores >= cfg.trim_cutoff,
+            ],
+            ["BUY", "ACCUMULATE", "HOLD", "TRIM"],
+            "SELL",
+        )
+
     def _calculate_score(
         self,
         quote: Quote | None,
         fundamenta: Fundamental | None,
         indicator: IndicatorSnapshot | None,
     ) -> tuple[float, list[str]]:
-        score = 30.0  # baseline neutral score
+        cfg = self.config
+        score = cfg.baseline  # baseline neutral score
         reasons: list[tuple[float, str]] = []
 
         if indicator:
             if indicator.sma_short is not None and indicator.sma_long is not None:
                 trend_diff = indicator.sma_short - indicator.sma_long
-                trend_score = max(min(trend_diff / indicator.sma_long * 25 if indicator.sma_long else 0, 20), -15)
+                trend_raw = trend_diff / indicator.sma_long * cfg.trend_scale if indicator.sma_long else 0
+                trend_score = max(min(trend_raw, cfg.trend_cap), cfg.trend_floor)
                 score += trend_score
                 direction = "över" if trend_diff > 0 else "under"
                 reasons.append((abs(trend_score), f"Kort trend {direction} lång trend"))
 
             if indicator.rsi is not None:
                 rsi = indicator.rsi
-                if 45 <= rsi <= 70:
-                    rsi_score = 12
-                elif 30 <= rsi < 45:
-                    rsi_score = 6
-                elif rsi < 30:
-                    rsi_score = -10
+                if cfg.rsi_neutral <= rsi <= cfg.rsi_overbought:
+                    rsi_score = cfg.rsi_healthy_score
+                elif cfg.rsi_oversold <= rsi < cfg.rsi_neutral:
+                    rsi_score = cfg.rsi_recovering_score
+                elif rsi < cfg.rsi_oversold:
+                    rsi_score = cfg.rsi_oversold_score
                 else:
-                    rsi_score = -6
+                    rsi_score = cfg.rsi_overbought_score
                 score += rsi_score
                 if rsi_score >= 0:
                     reasons.append((abs(rsi_score), f"RSI {rsi:.1f} (positivt momentum)"))
@@ -88,7 +304,7 @@ class RecommendationScorer:
                     reasons.append((abs(rsi_score), f"RSI {rsi:.1f} signalerar svaghet"))
 
             if indicator.price_return is not None:
-                momentum_score = max(min(indicator.price_return * 100, 15), -15)
+                momentum_score = max(min(indicator.price_return * 100, cfg.momentum_cap), -cfg.momentum_cap)
                 score += momentum_score
                 change_pct = indicator.price_return * 100
                 sentiment = "stigande" if momentum_score >= 0 else "fallande"
@@ -96,39 +312,40 @@ class RecommendationScorer:
 
             if indicator.atr is not None and quote and quote.price:
                 atr_pct = indicator.atr / quote.price
+                threshold = cfg.atr_threshold
                 if atr_pct <= 0:
-                    vol_score = 10
-                elif atr_pct < 0.08:
-                    vol_score = (0.08 - atr_pct) / 0.08 * 10
+                    vol_score = cfg.atr_reward
+                elif atr_pct < threshold:
+                    vol_score = (threshold - atr_pct) / threshold * cfg.atr_reward
                 else:
-                    vol_score = -((atr_pct - 0.08) / 0.08 * 12)
+                    vol_score = -((atr_pct - threshold) / threshold * cfg.atr_penalty)
                 score += vol_score
                 reasons.append((abs(vol_score), f"ATR {atr_pct * 100:.1f}% av priset"))
 
         if fundamenta:
             if fundamenta.pe_ratio is not None:
-                if fundamenta.pe_ratio <= 18:
-                    pe_score = 15
-                elif fundamenta.pe_ratio <= 30:
-                    pe_score = 8
+                if fundamenta.pe_ratio <= cfg.pe_cheap:
+                    pe_score = cfg.pe_cheap_score
+                elif fundamenta.pe_ratio <= cfg.pe_fair:
+                    pe_score = cfg.pe_fair_score
                 else:
-                    pe_score = -10
+                    pe_score = cfg.pe_expensive_score
                 score += pe_score
                 label = "attraktivt" if pe_score >= 0 else "högt"
                 reasons.append((abs(pe_score), f"P/E {fundamenta.pe_ratio:.1f} {label}"))
 
             if fundamenta.roe is not None:
-                roe_score = max(min(fundamenta.roe / 25 * 12, 12), -6)
+                roe_score = max(min(fundamenta.roe / cfg.roe_target * cfg.roe_cap, cfg.roe_cap), cfg.roe_floor)
                 score += roe_score
                 reasons.append((abs(roe_score), f"ROE {fundamenta.roe:.1f}%"))
 
             if fundamenta.debt_to_equity is not None:
-                if fundamenta.debt_to_equity <= 0.5:
-                    debt_score = 8
-                elif fundamenta.debt_to_equity <= 1.0:
-                    debt_score = 4
+                if fundamenta.debt_to_equity <= cfg.debt_low:
+                    debt_score = cfg.debt_low_score
+                elif fundamenta.debt_to_equity <= cfg.debt_moderate:
+                    debt_score = cfg.debt_moderate_score
                 else:
-                    debt_score = -6
+                    debt_score = cfg.debt_high_score
                 score += debt_score
                 reasons.append((abs(debt_score), f"Skuldgrad {fundamenta.debt_to_equity:.2f}"))
 
@@ -136,13 +353,57 @@ class RecommendationScorer:
         reasoning = [text for _, text in sorted(reasons, key=lambda item: item[0], reverse=True)[:3]]
         return score, reasoning
 
-    def _derive_signal(self, score: float) -> str:
-        if score >= 70:
+    def signal_for(self, score: float) -> str:
+        cfg = self.config
+        if score >= cfg.buy_cutoff:
             return "BUY"
-        if score >= 50:
+        if score >= cfg.accumulate_cutoff:
             return "ACCUMULATE"
-        if score >= 40:
+        if score >= cfg.hold_cutoff:
             return "HOLD"
-        if score >= 30:
+        if score >= cfg.trim_cutoff:
             return "TRIM"
         return "SELL"
+
+
+def _indicator_columns(indicators: BatchIndicators) -> tuple[np.ndarray, ...]:
+    return (
+        indicators.sma_short,
+        indicators.sma_long,
+        indicators.rsi,
+        indicators.atr,
+        indicators.price_return,
+    )
+
+
+def _fundamental_columns(
+    fundamentals_map: Mapping[str, Fundamental], tickers: Sequence[str]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """P/E, ROE and debt/equity columns for :meth:`RecommendationScorer.score_values`, plus
+    the rows the scalar path scores as 0.
+
+    None becomes NaN (missing). A NaN that was actually reported is compared like any float
+    in the scalar path: P/E and debt/equity fall through to the expensive and high-debt
+    branches (reproduced with +inf), while a NaN ROE turns the sum into NaN, which the final
+    clamp maps to 0.
+    """
+
+    pe_ratio = _column(fundamentals_map, tickers, "pe_ratio")
+    roe = _column(fundamentals_map, tickers, "roe")
+    debt_to_equity = _column(fundamentals_map, tickers, "debt_to_equity")
+    return (
+        np.where(_given_nan(fundamentals_map, tickers, "pe_ratio"), np.inf, pe_ratio),
+        roe,
+        np.where(_given_nan(fundamentals_map, tickers, "debt_to_equity"), np.inf, debt_to_equity),
+        _given_nan(fundamentals_map, tickers, "roe"),
+    )
+
+
+def _given_nan(items: Mapping[str, object], tickers: Sequence[str], field: str) -> np.ndarray:
+    values = [getattr(items[ticker], field) if ticker in items else None for ticker in tickers]
+    return np.array([value is not None and value != value for value in values], dtype=bool)
+
+
+def _column(items: Mapping[str, object], tickers: Sequence[str], field: str) -> np.ndarray:
+    values = [getattr(items[ticker], field) if ticker in items else None for ticker in tickers]
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
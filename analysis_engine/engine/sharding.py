@@ -0,0 +1,160 @@
+"""Sharded indicator computation and scoring across worker processes."""
+
+from __future__ import annotations
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Mapping, Sequence
+
+import numpy as np
+
+from data_integration.providers.base import Fundamental, Quote
+
+from .batch import PriceMatrix, compute_indicators
+from .scoring import IndicatorSnapshot, Recommendation, RecommendationScorer
+
+_MATRIX_FIELDS = ("close", "high", "low", "lengths")
+
+
+@dataclass(frozen=True)
+class SharedArraySpec:
+    """Picklable handle to a NumPy array living in a shared memory block."""
+
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+class SharedArrays:
+    """Copies NumPy arrays into shared memory once so workers can map them without pickling."""
+
+    def __init__(self, arrays: Mapping[str, np.ndarray]) -> None:
+        self._blocks: list[shared_memory.SharedMemory] = []
+        self.specs: dict[str, SharedArraySpec] = {}
+        try:
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self._blocks.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                self.specs[name] = SharedArraySpec(block.name, array.shape, array.dtype.str)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self) -> SharedArrays:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class SharedPriceMatrix(SharedArrays):
+    """Copies a :class:`PriceMatrix` into shared memory once so workers can map it without pickling."""
+
+    def __init__(self, matrix: PriceMatrix) -> None:
+        self.tickers = matrix.tickers
+        super().__init__({name: getattr(matrix, name) for name in _MATRIX_FIELDS})
+
+
+@dataclass(frozen=True)
+class _Shard:
+    specs: dict[str, SharedArraySpec]
+    rows: range
+    tickers: list[str]
+    quotes: dict[str, Quote]
+    fundamentals: dict[str, Fundamental]
+    scorer: RecommendationScorer
+
+
+def score_sharded(
+    matrix: PriceMatrix,
+    scorer: RecommendationScorer,
+    fundamentals: Sequence[Fundamental],
+    quotes: Sequence[Quote],
+    workers: int,
+    chunk_size: int | None = None,
+) -> tuple[list[Recommendation], dict[str, IndicatorSnapshot]]:
+    """Compute indicators and scores in ``workers`` processes.
+
+    Results are merged in matrix row order, so they are identical to scoring the same
+    universe serially with :meth:`RecommendationScorer.score`.
+    """
+
+    if workers <= 0:
+        raise ValueError("workers must be positive")
+    total = len(matrix.tickers)
+    if not total:
+        return [], {}
+    size = chunk_size or math.ceil(total / (workers * 4))
+    fundamentals_map = {fundamental.ticker: fundamental for fundamental in fundamentals}
+    quote_map = {quote.ticker: quote for quote in quotes}
+
+    with SharedPriceMatrix(matrix) as shared:
+        shards = []
+        for offset in range(0, total, size):
+            tickers = matrix.tickers[offset:offset + size]
+            shards.append(
+                _Shard(
+                    specs=shared.specs,
+                    rows=range(offset, offset + len(tickers)),
+                    tickers=tickers,
+                    quotes={ticker: quote_map[ticker] for ticker in tickers if ticker in quote_map},
+                    fundamentals={
+                        ticker: fundamentals_map[ticker] for ticker in tickers if ticker in fundamentals_map
+                    },
+                    scorer=scorer,
+                )
+            )
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outputs = list(executor.map(_score_shard, shards))
+
+    recommendations: list[Recommendation] = []
+    snapshots: dict[str, IndicatorSnapshot] = {}
+    for shard_recommendations, shard_snapshots in outputs:
+        recommendations.extend(shard_recommendations)
+        snapshots.update(shard_snapshots)
+    return recommendations, snapshots
+
+
+def _score_shard(shard: _Shard) -> tuple[list[Recommendation], dict[str, IndicatorSnapshot]]:
+    blocks = [_attach(shard.specs[name]) for name in _MATRIX_FIELDS]
+    try:
+        close, high, low, lengths = (
+            np.ndarray(spec.shape, dtype=spec.dtype, buffer=block.buf)[shard.rows.start:shard.rows.stop]
+            for spec, block in zip((shard.specs[name] for name in _MATRIX_FIELDS), blocks)
+        )
+        matrix = PriceMatrix(tickers=shard.tickers, close=close, high=high, low=low, lengths=lengths)
+        snapshots = compute_indicators(matrix).to_snapshots()
+        has_bars = dict(zip(shard.tickers, (lengths > 0).tolist()))
+        del close, high, low, lengths, matrix
+    finally:
+        for block in blocks:
+            block.close()
+
+    recommendations = []
+    for ticker in shard.tickers:
+        if not has_bars[ticker]:
+            continue
+        quote, fundamental = shard.quotes.get(ticker), shard.fundamentals.get(ticker)
+        recommendations.append(shard.scorer.score_one(ticker, quote, fundamental, snapshots.get(ticker)))
+    return recommendations, snapshots
+
+
+def _attach(spec: SharedArraySpec) -> shared_memory.SharedMemory:
+    return shared_memory.SharedMemory(name=spec.name)
+
+
+def attach_view(spec: SharedArraySpec) -> tuple[shared_memory.SharedMemory, np.ndarray]:
+    """Map a shared array in a worker; close the returned block once the view is released."""
+
+    block = _attach(spec)
+    return block, np.ndarray(spec.shape, dtype=spec.dtype, buffer=block.buf)
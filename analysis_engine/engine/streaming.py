@@ -0,0 +1,275 @@
+"""Incremental indicator state that updates in constant time per new bar."""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from data_integration.providers.candles import CandleSeries
+
+from .batch import ATR_PERIOD, RETURN_LOOKBACK, RSI_PERIOD, SMA_LONG_PERIOD, SMA_SHORT_PERIOD
+from .scoring import IndicatorSnapshot
+
+
+class RollingSMA:
+    """Simple moving average over the last ``period`` closes."""
+
+    def __init__(self, period: int) -> None:
+        if period <= 0:
+            raise ValueError("period must be positive")
+        self.period = period
+        self._window: deque[float] = deque(maxlen=period)
+        self._sum = 0.0
+
+    def update(self, close: float) -> None:
+        if len(self._window) == self.period:
+            self._sum -= self._window[0]
+        self._window.append(close)
+        self._sum += close
+
+    @property
+    def value(self) -> float | None:
+        if not self._window:
+            return None
+        return self._sum / len(self._window)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"period": self.period, "window": list(self._window), "sum": self._sum}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> RollingSMA:
+        indicator = cls(int(data["period"]))
+        indicator._window.extend(float(close) for close in data["window"])
+        indicator._sum = float(data["sum"])
+        return indicator
+
+
+class RollingRSI:
+    """RSI over the last ``period`` price changes, matching :func:`calculate_rsi`."""
+
+    def __init__(self, period: int = RSI_PERIOD) -> None:
+        if period <= 0:
+            raise ValueError("period must be positive")
+        self.period = period
+        self._changes: deque[float] = deque(maxlen=period)
+        self._gain_sum = 0.0
+        self._loss_sum = 0.0
+        self._gains = 0
+        self._losses = 0
+        self._last_close: float | None = None
+        self._count = 0
+
+    def update(self, close: float) -> None:
+        if self._last_close is not None:
+            if len(self._changes) == self.period:
+                self._remove(self._changes[0])
+            self._add(close - self._last_close)
+        self._last_close = close
+        self._count += 1
+
+    def _add(self, change: float) -> None:
+        self._changes.append(change)
+        if change > 0:
+            self._gain_sum += change
+            self._gains += 1
+        elif change < 0:
+            self._loss_sum -= change
+            self._losses += 1
+
+    def _remove(self, change: float) -> None:
+        if change > 0:
+            self._gains -= 1
+            # Reset instead of subtracting so rounding drift cannot leave a phantom sum.
+            self._gain_sum = self._gain_sum - change if self._gains else 0.0
+        elif change < 0:
+            self._losses -= 1
+            self._loss_sum = self._loss_sum + change if self._losses else 0.0
+
+    @property
+    def value(self) -> float | None:
+        if self._count <= self.period:
+            return None
+        avg_gain = self._gain_sum / self.period
+        avg_loss = self._loss_sum / self.period
+        if avg_loss == 0:
+            return 100.0
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "period": self.period,
+            "changes": list(self._changes),
+            "gain_sum": self._gain_sum,
+            "loss_sum": self._loss_sum,
+            "last_close": self._last_close,
+            "count": self._count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> RollingRSI:
+        indicator = cls(int(data["period"]))
+        for change in data["changes"]:
+            indicator._add(float(change))
+        # Carry the running sums over verbatim so a restored state continues bit-for-bit.
+        indicator._gain_sum = float(data["gain_sum"])
+        indicator._loss_sum = float(data["loss_sum"])
+        last_close = data["last_close"]
+        indicator._last_close = None if last_close is None else float(last_close)
+        indicator._count = int(data["count"])
+        return indicator
+
+
+class RollingATR:
+    """Average True Range over the last ``period`` bars, matching :func:`calculate_atr`."""
+
+    def __init__(self, period: int = ATR_PERIOD) -> None:
+        if period <= 0:
+            raise ValueError("period must be positive")
+        self.period = period
+        self._ranges: deque[float] = deque(maxlen=period)
+        self._sum = 0.0
+        self._prev_close: float | None = None
+        self._count = 0
+
+    def update(self, close: float, high: float | None = None, low: float | None = None) -> None:
+        high = close if high is None else high
+        low = close if low is None else low
+        if self._prev_close is not None:
+            prev_close = self._prev_close
+            true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+            if len(self._ranges) == self.period:
+                self._sum -= self._ranges[0]
+            self._ranges.append(true_range)
+            self._sum += true_range
+        self._prev_close = close
+        self._count += 1
+
+    @property
+    def value(self) -> float | None:
+        if self._count <= self.period:
+            return None
+        return self._sum / len(self._ranges)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "period": self.period,
+            "ranges": list(self._ranges),
+            "sum": self._sum,
+            "prev_close": self._prev_close,
+            "count": self._count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> RollingATR:
+        indicator = cls(int(data["period"]))
+        indicator._ranges.extend(float(true_range) for true_range in data["ranges"])
+        indicator._sum = float(data["sum"])
+        prev_close = data["prev_close"]
+        indicator._prev_close = None if prev_close is None else float(prev_close)
+        indicator._count = int(data["count"])
+        return indicator
+
+
+class RollingReturn:
+    """Price return over the last ``lookback`` bars."""
+
+    def __init__(self, lookback: int = RETURN_LOOKBACK) -> None:
+        if lookback <= 0:
+            raise ValueError("lookback must be positive")
+        self.lookback = lookback
+        self._closes: deque[float] = deque(maxlen=lookback + 1)
+
+    def update(self, close: float) -> None:
+        self._closes.append(close)
+
+    @property
+    def value(self) -> float | None:
+        if len(self._closes) <= self.lookback:
+            return None
+        previous = self._closes[0]
+        if previous == 0:
+            return None
+        return (self._closes[-1] - previous) / previous
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"lookback": self.lookback, "closes": list(self._closes)}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> RollingReturn:
+        indicator = cls(int(data["lookback"]))
+        for close in data["closes"]:
+            indicator.update(float(close))
+        return indicator
+
+
+@dataclass
+class IndicatorState:
+    """The pipeline's indicator set for one ticker, updatable bar by bar."""
+
+    sma_short: RollingSMA = field(default_factory=lambda: RollingSMA(SMA_SHORT_PERIOD))
+    sma_long: RollingSMA = field(default_factory=lambda: RollingSMA(SMA_LONG_PERIOD))
+    rsi: RollingRSI = field(default_factory=RollingRSI)
+    atr: RollingATR = field(default_factory=RollingATR)
+    price_return: RollingReturn = field(default_factory=RollingReturn)
+
+    @classmethod
+    def from_series(cls, series: CandleSeries) -> IndicatorState:
+        """Seed the state from history, replaying only the bars the indicators can see."""
+
+        state = cls()
+        window = max(
+            state.sma_short.period,
+            state.sma_long.period,
+            state.rsi.period + 1,
+            state.atr.period + 1,
+            state.price_return.lookback + 1,
+        )
+        skipped = max(len(series) - window, 0)
+        # Indicators whose validity depends on the total bar count must still see it.
+        state.rsi._count = skipped
+        state.atr._count = skipped
+        tail = series.tail(window)
+        for close, high, low in zip(tail.close.tolist(), tail.high.tolist(), tail.low.tolist()):
+            state.update(close, high, low)
+        return state
+
+    def update(self, close: float, high: float | None = None, low: float | None = None) -> None:
+        """Apply one new bar; missing high/low fall back to the close."""
+
+        self.sma_short.update(close)
+        self.sma_long.update(close)
+        self.rsi.update(close)
+        self.atr.update(close, high, low)
+        self.price_return.update(close)
+
+    def snapshot(self, ticker: str) -> IndicatorSnapshot:
+        return IndicatorSnapshot(
+            ticker=ticker,
+            sma_short=self.sma_short.value,
+            sma_long=self.sma_long.value,
+            rsi=self.rsi.value,
+            atr=self.atr.value,
+            price_return=self.price_return.value,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-serializable checkpoint of the state."""
+
+        return {
+            "sma_short": self.sma_short.to_dict(),
+            "sma_long": self.sma_long.to_dict(),
+            "rsi": self.rsi.to_dict(),
+            "atr": self.atr.to_dict(),
+            "price_return": self.price_return.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> IndicatorState:
+        return cls(
+            sma_short=RollingSMA.from_dict(data["sma_short"]),
+            sma_long=RollingSMA.from_dict(data["sma_long"]),
+            rsi=RollingRSI.from_dict(data["rsi"]),
+            atr=RollingATR.from_dict(data["atr"]),
+            price_return=RollingReturn.from_dict(data["price_return"]),
+        )
@@ -0,0 +1,164 @@
+"""Parallel parameter sweeps over scoring weights and thresholds."""
+
+from __future__ import annotations
+
+import itertools
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Any, Mapping, Sequence
+
+from data_integration.providers.base import Fundamental
+from data_integration.providers.candles import CandleSeries
+
+from .backtesting import PERIODS_PER_YEAR, BacktestMetrics, IndicatorPanel, run_backtest
+from .scoring import DEFAULT_SCORING_CONFIG, RecommendationScorer, ScoringConfig
+from .sharding import SharedArrays, SharedArraySpec, attach_view
+
+_PANEL_FIELDS = ("timestamps", "close", "sma_short", "sma_long", "rsi", "atr", "price_return")
+# Lower is better for drawdown; every other metric is maximised.
+_ASCENDING_METRICS = {"max_drawdown"}
+
+
+@dataclass
+class SweepResult:
+    params: dict[str, float]
+    config: ScoringConfig
+    metrics: BacktestMetrics
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"params": self.params, **asdict(self.metrics)}
+
+
+@dataclass(frozen=True)
+class _SweepTask:
+    specs: dict[str, SharedArraySpec]
+    tickers: list[str]
+    fundamentals: list[Fundamental]
+    configs: list[ScoringConfig]
+    interval: str
+    cost_bps: float
+
+
+def parameter_grid(
+    grid: Mapping[str, Sequence[float]],
+    base: ScoringConfig = DEFAULT_SCORING_CONFIG,
+) -> list[ScoringConfig]:
+    """Every combination of the values in ``grid`` applied on top of ``base``."""
+
+    _check_fields(grid)
+    names = list(grid)
+    return [replace(base, **dict(zip(names, values))) for values in itertools.product(*grid.values())]
+
+
+def random_configs(
+    space: Mapping[str, tuple[float, float]],
+    samples: int,
+    base: ScoringConfig = DEFAULT_SCORING_CONFIG,
+    seed: int | None = None,
+) -> list[ScoringConfig]:
+    """``samples`` configurations drawn uniformly from the ``(low, high)`` ranges in ``space``."""
+
+    _check_fields(space)
+    rng = random.Random(seed)
+    return [
+        replace(base, **{name: rng.uniform(low, high) for name, (low, high) in space.items()})
+        for _ in range(samples)
+    ]
+
+
+def run_sweep(
+    history: Mapping[str, CandleSeries] | IndicatorPanel,
+    configs: Sequence[ScoringConfig],
+    fundamentals: Sequence[Fundamental] = (),
+    workers: int = 1,
+    interval: str = "1d",
+    cost_bps: float = 0.0,
+    rank_by: str = "sharpe",
+    chunk_size: int | None = None,
+) -> list[SweepResult]:
+    """Backtest every configuration and return the results ranked best first by ``rank_by``.
+
+    Indicators do not depend on the scoring configuration, so the indicator panel is
+    built once and, with ``workers > 1``, copied into shared memory that every worker
+    process maps instead of recomputing or unpickling it per configuration.
+    """
+
+    if workers <= 0:
+        raise ValueError("workers must be positive")
+    if rank_by not in {field.name for field in fields(BacktestMetrics)}:
+        raise ValueError(f"unknown metric: {rank_by}")
+    if interval not in PERIODS_PER_YEAR:
+        raise ValueError(f"unknown interval: {interval}")
+    panel = history if isinstance(history, IndicatorPanel) else IndicatorPanel.from_history(history)
+    configs = list(configs)
+    fundamentals = list(fundamentals)
+
+    if workers == 1 or len(configs) <= 1:
+        metrics = _evaluate(panel, fundamentals, configs, interval, cost_bps)
+    else:
+        size = chunk_size or math.ceil(len(configs) / (workers * 4))
+        with SharedArrays({name: getattr(panel, name) for name in _PANEL_FIELDS}) as shared:
+            tasks = [
+                _SweepTask(shared.specs, panel.tickers, fundamentals, configs[offset:offset + size], interval, cost_bps)
+                for offset in range(0, len(configs), size)
+            ]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                metrics = [item for chunk in executor.map(_run_task, tasks) for item in chunk]
+
+    results = [
+        SweepResult(params=_changed_params(config), config=config, metrics=item)
+        for config, item in zip(configs, metrics)
+    ]
+    descending = rank_by not in _ASCENDING_METRICS
+    results.sort(key=lambda result: _rank_value(getattr(result.metrics, rank_by), descending))
+    return results
+
+
+def _evaluate(
+    panel: IndicatorPanel,
+    fundamentals: list[Fundamental],
+    configs: Sequence[ScoringConfig],
+    interval: str,
+    cost_bps: float,
+) -> list[BacktestMetrics]:
+    return [
+        run_backtest(panel, fundamentals, RecommendationScorer(config), interval=interval, cost_bps=cost_bps).metrics
+        for config in configs
+    ]
+
+
+def _run_task(task: _SweepTask) -> list[BacktestMetrics]:
+    blocks, views = {}, {}
+    for name in _PANEL_FIELDS:
+        blocks[name], views[name] = attach_view(task.specs[name])
+    try:
+        panel = IndicatorPanel(tickers=task.tickers, **views)
+        return _evaluate(panel, task.fundamentals, task.configs, task.interval, task.cost_bps)
+    finally:
+        # Views must be released before their shared memory blocks can be closed.
+        panel = None
+        views.clear()
+        for block in blocks.values():
+            block.close()
+
+
+def _changed_params(config: ScoringConfig) -> dict[str, float]:
+    return {
+        field.name: getattr(config, field.name)
+        for field in fields(ScoringConfig)
+        if getattr(config, field.name) != getattr(DEFAULT_SCORING_CONFIG, field.name)
+    }
+
+
+def _rank_value(value: float, descending: bool) -> float:
+    if math.isnan(value):
+        return math.inf
+    return -value if descending else value
+
+
+def _check_fields(params: Mapping[str, object]) -> None:
+    unknown = set(params) - {field.name for field in fields(ScoringConfig)}
+    if unknown:
+        raise ValueError(f"unknown scoring parameters: {', '.join(sorted(unknown))}")
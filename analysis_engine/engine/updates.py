@@ -0,0 +1,204 @@
+"""Push av ändrade rekommendationer till prenumeranter (score-/signaldeltan)."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import Iterable, Mapping
+
+from .scheduler import RecommendationSnapshot
+from .scoring import Recommendation
+
+StreamKey = tuple[str, str]
+
+
+@dataclass(frozen=True)
+class RecommendationDelta:
+    ticker: str
+    score: float | None
+    signal: str | None
+    previous_score: float | None = None
+    previous_signal: str | None = None
+
+    @property
+    def removed(self) -> bool:
+        return self.score is None
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "ticker": self.ticker,
+            "score": self.score,
+            "signal": self.signal,
+            "previousScore": self.previous_score,
+            "previousSignal": self.previous_signal,
+        }
+
+
+@dataclass
+class UpdateBatch:
+    version: int
+    changes: list[RecommendationDelta] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, object]:
+        return {"version": self.version, "changes": [change.to_dict() for change in self.changes]}
+
+
+def diff_recommendations(
+    previous: Mapping[str, tuple[float, str]],
+    current: Iterable[Recommendation],
+) -> list[RecommendationDelta]:
+    """Tickers vars score eller signal ändrats, tillkommit eller försvunnit."""
+
+    deltas: list[RecommendationDelta] = []
+    seen: set[str] = set()
+    for recommendation in current:
+        seen.add(recommendation.ticker)
+        before = previous.get(recommendation.ticker)
+        if before == (recommendation.score, recommendation.signal):
+            continue
+        deltas.append(
+            RecommendationDelta(
+                ticker=recommendation.ticker,
+                score=recommendation.score,
+                signal=recommendation.signal,
+                previous_score=before[0] if before else None,
+                previous_signal=before[1] if before else None,
+            )
+        )
+    for ticker, (score, signal) in previous.items():
+        if ticker not in seen:
+            deltas.append(RecommendationDelta(ticker, None, None, previous_score=score, previous_signal=signal))
+    return deltas
+
+
+class Subscription:
+    """En anslutnings prenumeration på ett (universum, intervall), valfritt filtrerad på tickers.
+
+    Mottrycket hanteras genom sammanslagning: väntande deltan hålls per ticker och ett nytt
+    delta ersätter ett äldre som ännu inte lästs. En långsam klient får därför alltid det
+    senaste läget och kön kan aldrig bli större än antalet prenumererade tickers.
+    """
+
+    def __init__(
+        self,
+        hub: UpdateHub,
+        key: StreamKey,
+        tickers: frozenset[str] | None,
+        loop: asyncio.AbstractEventLoop,
+    ) -> None:
+        self.key = key
+        self.tickers = tickers
+        self.coalesced = 0
+        self._hub = hub
+        self._loop = loop
+        self._ready = asyncio.Event()
+        self._lock = threading.Lock()
+        self._pending: dict[str, RecommendationDelta] = {}
+        self._version = 0
+
+    def wants(self, ticker: str) -> bool:
+        return self.tickers is None or ticker in self.tickers
+
+    async def next(self, timeout: float | None = None) -> UpdateBatch | None:
+        """Vänta på nästa sammanslagna batch; ``None`` om ``timeout`` löper ut först."""
+
+        while True:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+            self._ready.clear()
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                version = self._version
+            changes = [delta for delta in pending.values() if not _is_noop(delta)]
+            if changes:
+                return UpdateBatch(version=version, changes=changes)
+
+    def close(self) -> None:
+        self._hub.unsubscribe(self)
+
+    def _offer(self, deltas: Iterable[RecommendationDelta], version: int) -> None:
+        offered = False
+        with self._lock:
+            self._version = version
+            for delta in deltas:
+                if not self.wants(delta.ticker):
+                    continue
+                earlier = self._pending.get(delta.ticker)
+                if earlier is not None:
+                    self.coalesced += 1
+                    delta = RecommendationDelta(
+                        delta.ticker, delta.score, delta.signal, earlier.previous_score, earlier.previous_signal
+                    )
+                self._pending[delta.ticker] = delta
+                offered = True
+        if offered and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._ready.set)
+
+
+class UpdateHub:
+    """Jämför varje publicerat snapshot med föregående och sprider deltan till prenumeranter.
+
+    :meth:`publish` är trådsäker och anropas från schemaläggarens tråd; prenumeranter
+    väcks i sina egna event loopar.
+    """
+
+    def __init__(self) -> None:
+        self._state: dict[StreamKey, dict[str, tuple[float, str]]] = {}
+        self._versions: dict[StreamKey, int] = {}
+        self._subscriptions: dict[StreamKey, set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, snapshot: RecommendationSnapshot) -> list[RecommendationDelta]:
+        key = (snapshot.universe, snapshot.interval)
+        with self._lock:
+            deltas = diff_recommendations(self._state.get(key, {}), snapshot.recommendations)
+            self._state[key] = {item.ticker: (item.score, item.signal) for item in snapshot.recommendations}
+            self._versions[key] = snapshot.version
+            subscriptions = list(self._subscriptions.get(key, ()))
+        if deltas:
+            for subscription in subscriptions:
+                subscription._offer(deltas, snapshot.version)
+        return deltas
+
+    def subscribe(self, universe: str, interval: str, tickers: Iterable[str] | None = None) -> Subscription:
+        """Ny prenumeration i den aktuella event loopen."""
+
+        key = (universe, interval)
+        subscription = Subscription(
+            self, key, frozenset(tickers) if tickers else None, asyncio.get_running_loop()
+        )
+        with self._lock:
+            self._subscriptions.setdefault(key, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.get(subscription.key, set()).discard(subscription)
+
+    def current(self, subscription: Subscription) -> UpdateBatch:
+        """Hela det senast publicerade läget för prenumerationens tickers."""
+
+        with self._lock:
+            state = self._state.get(subscription.key, {})
+            version = self._versions.get(subscription.key, 0)
+            changes = [
+                RecommendationDelta(ticker, score, signal)
+                for ticker, (score, signal) in state.items()
+                if subscription.wants(ticker)
+            ]
+        return UpdateBatch(version=version, changes=changes)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            subscriptions = [item for items in self._subscriptions.values() for item in items]
+        return {
+            "subscriptions": len(subscriptions),
+            "coalesced": sum(subscription.coalesced for subscription in subscriptions),
+        }
+
+
+def _is_noop(delta: RecommendationDelta) -> bool:
+    return (delta.score, delta.signal) == (delta.previous_score, delta.previous_signal)
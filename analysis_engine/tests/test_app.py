@@ -24,3 +24,118 @@ def test_recommendations_endpoint_returns_data() -> None:
     first = body["results"][0]
     assert {"ticker", "score", "signal", "reasoning"}.issubset(first.keys())
     assert body["disclaimer"]
+
+
+def test_cache_stats_endpoint_reports_counters() -> None:
+    client.get("/recommendations", params={"tickers": "AAPL"})
+    response = client.get("/cache/stats")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["quotes"]["hits"] + body["quotes"]["misses"] >= 1
+    assert "evictions" in body["fundamentals"]
+
+
+def test_recommendations_endpoint_ranks_and_pages() -> None:
+    params = {"tickers": "AAPL,TSLA,ERIC,NVDA", "lookback_days": 60, "limit": 2}
+    first = client.get("/recommendations", params=params).json()
+
+    assert first["total"] == 4
+    assert len(first["results"]) == 2
+    assert first["results"][0]["score"] >= first["results"][1]["score"]
+    assert all(result["reasoning"] for result in first["results"])
+    assert first["nextCursor"]
+
+    bad = client.get("/recommendations", params={**params, "cursor": "###"})
+    assert bad.status_code == 400
+
+
+def test_default_universe_is_served_from_refreshed_snapshot() -> None:
+    refreshed = client.post("/recommendations/refresh", params={"universe": "default"})
+    assert refreshed.status_code == 200
+    version = next(item["version"] for item in refreshed.json()["snapshots"] if item["interval"] == "1d")
+
+    body = client.get("/recommendations").json()
+
+    assert body["snapshotVersion"] == version
+    assert body["stale"] is False
+    assert all(result["reasoning"] for result in body["results"])
+    assert client.post("/recommendations/refresh", params={"universe": "missing"}).status_code == 404
+
+
+def test_snapshot_responses_carry_etag_and_answer_conditional_requests() -> None:
+    client.post("/recommendations/refresh", params={"universe": "default"})
+
+    first = client.get("/recommendations", params={"limit": 2})
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"].startswith("public, max-age=")
+
+    unchanged = client.get("/recommendations", params={"limit": 2}, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert client.get("/recommendations", params={"limit": 3}).headers["etag"] != etag
+
+    client.post("/recommendations/refresh", params={"universe": "default"})
+    changed = client.get("/recommendations", params={"limit": 2}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_live_responses_are_revalidated() -> None:
+    from analysis_engine.app.main import _etag_matches
+
+    first = client.get("/recommendations", params={"tickers": "AAPL,TSLA", "lookback_days": 45})
+
+    assert first.headers["cache-control"] == "no-cache"
+    etag = first.headers["etag"]
+    assert _etag_matches(f'W/{etag}, "other"', etag)
+    assert _etag_matches("*", etag)
+    assert not _etag_matches('"other"', etag)
+
+
+def test_columnar_format_and_gzip_for_large_responses() -> None:
+    tickers = ",".join(f"SYN{index}" for index in range(40))
+    params = {"tickers": tickers, "lookback_days": 30}
+
+    objects = client.get("/recommendations", params=params, headers={"Accept-Encoding": "gzip"})
+    columnar = client.get("/recommendations", params={**params, "format": "columnar"}).json()["results"]
+
+    assert objects.headers["content-encoding"] == "gzip"
+    assert len(columnar["ticker"]) == len(objects.json()["results"]) == 40
+    assert set(columnar) == {"ticker", "score", "signal", "reasoning"}
+    assert columnar["score"] == sorted(columnar["score"], reverse=True)
+    small = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_fast_json_serializes_dataclasses_and_datetimes() -> None:
+    import json
+    from datetime import UTC, datetime
+
+    from analysis_engine.app.serialization import dumps
+    from data_integration.providers.base import Fundamental, Quote
+
+    quote = Quote(ticker="AAPL", price=189.3, currency="USD", timestamp=datetime(2024, 6, 1, tzinfo=UTC))
+    decoded = json.loads(dumps({"quote": quote, "fundamental": Fundamental(ticker="AAPL", pe_ratio=15.0)}))
+
+    assert decoded["quote"]["timestamp"] == "2024-06-01T00:00:00+00:00"
+    assert decoded["fundamental"]["pe_ratio"] == 15.0
+
+
+def test_metrics_endpoint_and_profiling_header() -> None:
+    profiled = client.get(
+        "/recommendations", params={"tickers": "AAPL,VOLV", "lookback_days": 30}, headers={"X-Profile": "1"}
+    )
+    plain = client.get("/recommendations", params={"tickers": "AAPL,VOLV", "lookback_days": 30})
+
+    stages = dict(item.strip().split(";dur=") for item in profiled.headers["server-timing"].split(","))
+    assert {"fetch_history", "prepare", "indicators", "scoring", "rank", "serialize", "total"} <= set(stages)
+    assert float(stages["total"]) >= float(stages["scoring"])
+    assert "server-timing" not in plain.headers
+
+    metrics = client.get("/metrics")
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = metrics.text
+    assert 'pipeline_stage_seconds_count{stage="scoring"}' in body
+    assert 'pipeline_universe_size{interval="1d"} 2' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/recommendations",status="200"}' in body
+    assert 'cache_hit_ratio{cache="quotes"}' in body
@@ -0,0 +1,87 @@
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from analysis_engine.engine.backtesting import run_backtest
+from data_integration.providers.archive import (
+    COLUMNS,
+    ArchiveWriter,
+    MarketDataArchive,
+    import_history,
+    write_archive,
+)
+from data_integration.providers.candles import CandleSeries
+from data_integration.providers.local_sample import LocalSampleProvider
+
+END = datetime(2024, 6, 1, tzinfo=UTC)
+START = END - timedelta(days=200)
+
+
+def test_import_round_trips_provider_history_as_zero_copy_views(tmp_path: Path) -> None:
+    tickers = ["AAPL", "tsla", "ERIC"]
+    expected = LocalSampleProvider().get_history_batch([ticker.upper() for ticker in tickers], start=START, end=END)
+
+    archive = import_history(LocalSampleProvider(), tickers, tmp_path / "archive", start=START, end=END, chunk_size=2)
+    reopened = MarketDataArchive(tmp_path / "archive")
+
+    assert reopened.tickers == ["AAPL", "TSLA", "ERIC"] and "tsla" in reopened
+    for ticker, series in expected.items():
+        stored = reopened.series(ticker)
+        assert stored.close.tolist() == series.close.tolist()
+        assert stored.timestamp.tolist() == series.timestamp.tolist()
+    close = reopened.series("TSLA").close
+    assert np.shares_memory(close, reopened._columns["close"])
+    assert not close.flags.writeable
+    assert len(archive) == 3
+
+
+def test_series_slices_by_date_with_binary_search(tmp_path: Path) -> None:
+    history = LocalSampleProvider().get_history_batch(["AAPL"], start=START, end=END)
+    archive = write_archive(tmp_path, {**history, "EMPTY": CandleSeries.empty()})
+
+    window = archive.series("AAPL", start=END - timedelta(days=30), end=END - timedelta(days=10, hours=1))
+    full = history["AAPL"]
+    mask = (full.timestamp >= (END - timedelta(days=30)).timestamp()) & (
+        full.timestamp <= (END - timedelta(days=10, hours=1)).timestamp()
+    )
+
+    assert window.close.tolist() == full.close[mask].tolist()
+    assert len(archive.series("EMPTY")) == 0
+    assert len(archive.history(["AAPL", "MISSING"])["MISSING"]) == 0
+    with pytest.raises(KeyError):
+        archive.series("MISSING")
+
+
+def test_backtest_runs_directly_on_archive(tmp_path: Path) -> None:
+    provider = LocalSampleProvider()
+    history = provider.get_history_batch(["AAPL", "TSLA"], start=START, end=END)
+    archive = write_archive(tmp_path, history)
+
+    from_memory = run_backtest(history)
+    from_archive = run_backtest(archive.history())
+
+    assert from_archive.metrics == from_memory.metrics
+
+
+def test_rewrite_switches_versions_atomically(tmp_path: Path) -> None:
+    provider = LocalSampleProvider()
+    first = provider.get_history_batch(["AAPL"], start=START, end=END)
+    second = provider.get_history_batch(["TSLA"], start=START, end=END)
+    write_archive(tmp_path, first)
+    open_reader = MarketDataArchive(tmp_path)
+
+    with pytest.raises(RuntimeError):
+        with ArchiveWriter(tmp_path) as writer:
+            writer.add("TSLA", second["TSLA"])
+            raise RuntimeError("avbruten import")
+
+    assert MarketDataArchive(tmp_path).tickers == ["AAPL"]
+    write_archive(tmp_path, second)
+    write_archive(tmp_path, second)
+
+    assert MarketDataArchive(tmp_path).tickers == ["TSLA"]
+    assert open_reader.series("AAPL").close.tolist() == first["AAPL"].close.tolist()
+    assert len(list(tmp_path.glob("*.f8"))) == 2 * len(COLUMNS)
+    assert not list(tmp_path.glob("*.tmp"))
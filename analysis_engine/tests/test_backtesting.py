@@ -0,0 +1,126 @@
+import math
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from analysis_engine.engine.backtesting import IndicatorPanel, compute_metrics, run_backtest, walk_forward
+from analysis_engine.engine.indicators import calculate_atr, calculate_return, calculate_rsi, calculate_sma
+from analysis_engine.engine.scoring import IndicatorSnapshot, RecommendationScorer
+from data_integration.providers.base import Fundamental, Quote
+from data_integration.providers.candles import CandleSeries
+from data_integration.providers.local_sample import LocalSampleProvider
+
+END = datetime(2024, 6, 1, tzinfo=UTC)
+
+
+def _history() -> dict[str, CandleSeries]:
+    provider = LocalSampleProvider()
+    return {
+        "AAPL": provider.get_history("AAPL", start=END - timedelta(days=200), end=END),
+        "TSLA": provider.get_history("TSLA", start=END - timedelta(days=90), end=END),
+        "ERIC": provider.get_history("ERIC", start=END - timedelta(days=150), end=END - timedelta(days=20)),
+    }
+
+
+def _prefix(series: CandleSeries, timestamp: float) -> CandleSeries:
+    """Candles up to and including ``timestamp``."""
+
+    count = int(np.searchsorted(series.timestamp, timestamp, side="right"))
+    return CandleSeries(
+        timestamp=series.timestamp[:count],
+        open=series.open[:count],
+        high=series.high[:count],
+        low=series.low[:count],
+        close=series.close[:count],
+        volume=series.volume[:count],
+    )
+
+
+def test_panel_matches_scalar_indicators_at_every_bar() -> None:
+    history = _history()
+    panel = IndicatorPanel.from_history(history)
+
+    for row, ticker in enumerate(panel.tickers):
+        series = history[ticker]
+        for bar in (0, 4, 5, 14, 15, 19, 49, 50, len(series) - 1):
+            column = int(np.searchsorted(panel.timestamps, series.timestamp[bar]))
+            prefix = _prefix(series, series.timestamp[bar])
+            expected = (
+                calculate_sma(prefix, 20),
+                calculate_sma(prefix, 50),
+                calculate_rsi(prefix, 14),
+                calculate_atr(prefix, 14),
+                calculate_return(prefix, 5),
+            )
+            actual = (panel.sma_short, panel.sma_long, panel.rsi, panel.atr, panel.price_return)
+            for values, value in zip(actual, expected):
+                if value is None:
+                    assert np.isnan(values[row, column])
+                else:
+                    assert math.isclose(values[row, column], value, rel_tol=1e-9)
+
+
+def test_backtest_scores_match_live_scorer_without_lookahead() -> None:
+    history = _history()
+    fundamentals = [Fundamental(ticker="AAPL", pe_ratio=15.0, roe=20.0, debt_to_equity=0.4)]
+    scorer = RecommendationScorer()
+    result = run_backtest(history, fundamentals, scorer)
+
+    row = list(history).index("AAPL")
+    for column in (60, 120, len(result.timestamps) - 1):
+        prefix = _prefix(history["AAPL"], result.timestamps[column])
+        snapshot = {
+            "AAPL": IndicatorSnapshot(
+                "AAPL",
+                calculate_sma(prefix, 20),
+                calculate_sma(prefix, 50),
+                calculate_rsi(prefix, 14),
+                calculate_atr(prefix, 14),
+                calculate_return(prefix, 5),
+            )
+        }
+        quote = Quote(ticker="AAPL", price=float(prefix.close[-1]), currency="USD", timestamp=END)
+        [live] = scorer.score({"AAPL": prefix}, fundamentals, [quote], snapshot)
+        assert result.scores[row, column] == live.score
+
+
+def test_positions_follow_previous_close_and_metrics_are_consistent() -> None:
+    result = run_backtest(_history(), entry_score=0.0)
+
+    # ERIC starts late and stops 20 days early: flat before its first bar and after its last.
+    history = _history()
+    eric = result.positions[2]
+    first = int(np.searchsorted(result.timestamps, history["ERIC"].timestamp[0]))
+    last = int(np.searchsorted(result.timestamps, history["ERIC"].timestamp[-1]))
+    assert not eric[:first].any() and eric[first : last + 1].all() and not eric[last + 1 :].any()
+    # Once ERIC has ended, the portfolio is split equally between the two remaining tickers.
+    tail = len(result.returns) - last - 2
+    closes = np.array([history[ticker].close[-tail - 1 :] for ticker in ("AAPL", "TSLA")])
+    assert np.allclose(result.returns[-tail:], (closes[:, 1:] / closes[:, :-1] - 1).mean(axis=0))
+    assert result.returns[0] == 0.0
+    assert math.isclose(result.equity[-1] - 1, result.metrics.total_return)
+    assert 0.0 <= result.metrics.max_drawdown < 1.0
+    assert result.metrics.trades == 3
+
+    windows = walk_forward(result, window=40, step=20)
+    assert len(windows) == (len(result.returns) - 40) // 20 + 1
+    assert all(0.0 <= window.win_rate <= 1.0 for window in windows)
+
+
+def test_compute_metrics_on_known_series() -> None:
+    returns = np.array([0.0, 0.10, -0.50, 0.20])
+    metrics = compute_metrics(returns, np.array([0.1, -0.2]), periods_per_year=3)
+
+    assert math.isclose(metrics.total_return, 1.1 * 0.5 * 1.2 - 1)
+    assert math.isclose(metrics.cagr, 1.1 * 0.5 * 1.2 - 1)
+    assert math.isclose(metrics.max_drawdown, 0.5)
+    assert metrics.win_rate == 0.5
+
+
+def test_weekly_bars_annualise_with_52_periods_and_unknown_intervals_raise() -> None:
+    panel = IndicatorPanel.from_history(_history())
+
+    assert run_backtest(panel, interval="1w").periods_per_year == 52
+    with pytest.raises(ValueError, match="unknown interval"):
+        run_backtest(panel, interval="5m")
@@ -0,0 +1,49 @@
+import math
+from datetime import UTC, datetime, timedelta
+
+from analysis_engine.engine.batch import PriceMatrix, compute_indicators, required_window
+from analysis_engine.engine.indicators import calculate_atr, calculate_return, calculate_rsi, calculate_sma
+from data_integration.providers.candles import CandleSeries
+from data_integration.providers.local_sample import LocalSampleProvider
+
+
+def _ragged_history() -> dict[str, CandleSeries]:
+    provider = LocalSampleProvider()
+    end = datetime(2024, 6, 1, tzinfo=UTC)
+    full = provider.get_history("AAPL", start=end - timedelta(days=120), end=end)
+    return {
+        "AAPL": full,
+        "TSLA": provider.get_history("TSLA", start=end - timedelta(days=60), end=end),
+        "SHORT": full.tail(10),
+        "EDGE": full.tail(15),
+        "EMPTY": CandleSeries.empty(),
+    }
+
+
+def _assert_close(batch_value: float | None, scalar_value: float | None) -> None:
+    if scalar_value is None:
+        assert batch_value is None
+    else:
+        assert batch_value is not None
+        assert math.isclose(batch_value, scalar_value, rel_tol=1e-9, abs_tol=1e-12)
+
+
+def test_batch_indicators_match_scalar_functions() -> None:
+    history = _ragged_history()
+
+    snapshots = compute_indicators(PriceMatrix.from_series(history, window=required_window())).to_snapshots()
+
+    for ticker, series in history.items():
+        snapshot = snapshots[ticker]
+        _assert_close(snapshot.sma_short, calculate_sma(series, 20))
+        _assert_close(snapshot.sma_long, calculate_sma(series, 50))
+        _assert_close(snapshot.rsi, calculate_rsi(series, 14))
+        _assert_close(snapshot.atr, calculate_atr(series, 14))
+        _assert_close(snapshot.price_return, calculate_return(series, 5))
+
+
+def test_price_matrix_masks_padding() -> None:
+    matrix = PriceMatrix.from_series(_ragged_history(), window=30)
+
+    assert matrix.close.shape == (5, 30)
+    assert matrix.mask.sum(axis=1).tolist() == [30, 30, 10, 15, 0]
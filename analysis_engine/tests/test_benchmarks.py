@@ -0,0 +1,59 @@
+from pathlib import Path
+
+from analysis_engine.benchmarks.__main__ import main
+from analysis_engine.benchmarks.runner import (
+    Benchmark,
+    BenchmarkResult,
+    compare,
+    load_results,
+    measure,
+    save_results,
+)
+from analysis_engine.benchmarks.suite import benchmarks_for, synthetic_universe
+
+
+def _result(median: float, peak: int) -> BenchmarkResult:
+    return BenchmarkResult("case", {"tickers": 10}, 3, median, median, median, peak)
+
+
+def test_measure_times_run_and_records_allocation_peak() -> None:
+    teardown: list[object] = []
+    benchmark = Benchmark(
+        "alloc",
+        run=lambda size: bytearray(size),
+        setup=lambda: 1_000_000,
+        teardown=teardown.append,
+        params={"bytes": 1_000_000},
+    )
+
+    result = measure(benchmark, repeats=2)
+
+    assert result.key == "alloc[bytes=1000000]"
+    assert result.repeats == 2 and 0 < result.best <= result.median
+    assert result.peak_bytes >= 1_000_000
+    assert teardown == [1_000_000]
+
+
+def test_compare_flags_time_and_memory_regressions(tmp_path: Path) -> None:
+    save_results(tmp_path / "baseline.json", [_result(0.010, 1000)])
+    baseline = load_results(tmp_path / "baseline.json")
+
+    assert compare([_result(0.012, 1100)], baseline) == []
+    regressions = compare([_result(0.020, 2000)], baseline)
+    assert [(regression.metric, round(regression.ratio, 1)) for regression in regressions] == [
+        ("time", 2.0),
+        ("memory", 2.0),
+    ]
+
+
+def test_suite_is_deterministic_and_runs_end_to_end(tmp_path: Path) -> None:
+    first = synthetic_universe(3, 40)
+    second = synthetic_universe(3, 40)
+    assert first.history["SYN00002"].close.tolist() == second.history["SYN00002"].close.tolist()
+    names = {case.name for case in benchmarks_for([(3, 40)])}
+    assert {"indicators.calculate_rsi", "scoring.score", "pipeline.run", "http.recommendations"} <= names
+
+    baseline = tmp_path / "baseline.json"
+    assert main(["--tickers", "3", "--bars", "40", "--repeats", "1", "--save", str(baseline)]) == 0
+    rerun = ["--tickers", "3", "--bars", "40", "--repeats", "1", "--filter", "pipeline", "--baseline", str(baseline)]
+    assert main([*rerun, "--time-tolerance", "100", "--memory-tolerance", "100"]) == 0
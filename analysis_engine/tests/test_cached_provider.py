@@ -0,0 +1,132 @@
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from data_integration.providers.cached import CachedMarketDataProvider, CandleStore, missing_ranges
+from data_integration.providers.candles import CandleSeries
+from data_integration.providers.local_sample import LocalSampleProvider
+
+END = datetime(2024, 6, 1, tzinfo=UTC)
+
+
+class CountingProvider(LocalSampleProvider):
+    def __init__(self) -> None:
+        super().__init__()
+        self.requests: list[tuple[datetime, datetime]] = []
+
+    def get_history(self, ticker, start, end, interval="1d") -> CandleSeries:  # type: ignore[override]
+        self.requests.append((start, end))
+        return super().get_history(ticker, start, end, interval)
+
+
+def test_missing_ranges_skips_covered_and_short_gaps() -> None:
+    covered = [(10.0, 20.0), (18.0, 30.0), (40.0, 50.0)]
+
+    assert missing_ranges(0.0, 60.0, covered) == [(0.0, 10.0), (30.0, 40.0), (50.0, 60.0)]
+    assert missing_ranges(0.0, 60.0, covered, min_gap=10.0) == [(0.0, 10.0), (30.0, 40.0), (50.0, 60.0)]
+    assert missing_ranges(12.0, 52.0, covered, min_gap=5.0) == [(30.0, 40.0)]
+
+
+def test_cached_provider_only_fetches_missing_ranges(tmp_path: Path) -> None:
+    upstream = CountingProvider()
+    provider = CachedMarketDataProvider(upstream=upstream, store=CandleStore(tmp_path / "candles.db"))
+
+    first = provider.get_history("AAPL", start=END - timedelta(days=30), end=END)
+    second = provider.get_history("AAPL", start=END - timedelta(days=20), end=END)
+    extended = provider.get_history("AAPL", start=END - timedelta(days=60), end=END)
+
+    assert len(first) == 30
+    assert second.close.tolist() == first.close[-20:].tolist()
+    assert len(extended) == 60
+    assert upstream.requests == [
+        (END - timedelta(days=30), END),
+        (END - timedelta(days=60), END - timedelta(days=30)),
+    ]
+
+
+def test_cached_candles_persist_between_instances(tmp_path: Path) -> None:
+    path = tmp_path / "candles.db"
+    start = END - timedelta(days=30)
+    cached = CachedMarketDataProvider(upstream=CountingProvider(), store=CandleStore(path))
+    expected = cached.get_history("AAPL", start=start, end=END)
+
+    upstream = CountingProvider()
+    reopened = CachedMarketDataProvider(upstream=upstream, store=CandleStore(path))
+
+    assert reopened.get_history("AAPL", start=start, end=END).close.tolist() == expected.close.tolist()
+    assert upstream.requests == []
+
+
+def test_cached_batch_groups_tickers_with_the_same_gap(tmp_path: Path) -> None:
+    class BatchCountingProvider(CountingProvider):
+        batches: list[list[str]] = []
+
+        def get_history_batch(self, tickers, start, end, interval="1d"):  # type: ignore[override]
+            tickers = list(tickers)
+            self.batches.append(tickers)
+            return super().get_history_batch(tickers, start, end, interval)
+
+    upstream = BatchCountingProvider()
+    provider = CachedMarketDataProvider(upstream=upstream, store=CandleStore(tmp_path / "candles.db"))
+    provider.get_history("AAPL", start=END - timedelta(days=30), end=END)
+
+    history = provider.get_history_batch(["AAPL", "TSLA", "ERIC"], start=END - timedelta(days=30), end=END)
+
+    assert upstream.batches == [["TSLA", "ERIC"]]
+    assert [len(series) for series in history.values()] == [30, 30, 30]
+
+
+def test_warm_batch_stays_local_until_the_forming_bar_expires(tmp_path: Path) -> None:
+    class BatchCountingProvider(CountingProvider):
+        def __init__(self) -> None:
+            super().__init__()
+            self.batches: list[list[str]] = []
+
+        def get_history_batch(self, tickers, start, end, interval="1d"):  # type: ignore[override]
+            tickers = list(tickers)
+            self.batches.append(tickers)
+            return super().get_history_batch(tickers, start, end, interval)
+
+    now = [(END + timedelta(hours=10)).timestamp()]
+    upstream = BatchCountingProvider()
+    provider = CachedMarketDataProvider(
+        upstream, CandleStore(tmp_path / "candles.db"), clock=lambda: now[0], forming_ttl=timedelta(minutes=1)
+    )
+    tickers = ["AAPL", "TSLA", "ERIC"]
+    window = {"start": END - timedelta(days=30), "end": END + timedelta(hours=10)}
+
+    provider.get_history_batch(tickers, **window)
+    now[0] += 30
+    provider.get_history_batch(tickers, **window)
+    provider.get_history("AAPL", **window)
+    assert upstream.batches == [tickers] and len(upstream.requests) == 3
+
+    now[0] += 60
+    provider.get_history_batch(tickers, **window)
+    assert upstream.batches == [tickers, tickers]
+
+
+def test_forming_bar_is_refetched_later_the_same_day(tmp_path: Path) -> None:
+    class LiveProvider(CountingProvider):
+        last_close = 101.0
+
+        def get_history(self, ticker, start, end, interval="1d") -> CandleSeries:  # type: ignore[override]
+            self.requests.append((start, end))
+            first = -(-start.timestamp() // 86_400) * 86_400
+            timestamp = np.arange(first, end.timestamp() + 1, 86_400.0)
+            close = np.where(timestamp == END.timestamp(), self.last_close, 100.0)
+            return CandleSeries(timestamp, close, close, close, close, np.ones(timestamp.size))
+
+    now = [(END + timedelta(hours=10)).timestamp()]
+    upstream = LiveProvider()
+    provider = CachedMarketDataProvider(upstream, CandleStore(tmp_path / "candles.db"), clock=lambda: now[0])
+
+    morning = provider.get_history("AAPL", start=END - timedelta(days=10), end=END + timedelta(hours=10))
+    upstream.last_close = 105.0
+    now[0] = (END + timedelta(hours=14)).timestamp()
+    afternoon = provider.get_history("AAPL", start=END - timedelta(days=10), end=END + timedelta(hours=14))
+
+    assert morning.close[-1] == 101.0
+    assert afternoon.close[-1] == 105.0 and len(afternoon) == len(morning) == 11
+    assert upstream.requests[1][0] >= END - timedelta(days=1)
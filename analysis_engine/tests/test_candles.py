@@ -0,0 +1,68 @@
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+
+from analysis_engine.engine.indicators import calculate_atr, calculate_return, calculate_rsi, calculate_sma
+from data_integration.providers.candles import CandleSeries, as_candle_series, parse_timestamps
+from data_integration.providers.local_sample import LocalSampleProvider
+
+
+def _records() -> list[dict]:
+    base = datetime(2024, 1, 1, tzinfo=UTC)
+    return [
+        {"close": 103.0, "high": 104.0, "low": 101.0, "timestamp": (base + timedelta(days=2)).isoformat()},
+        {"close": 100.0, "timestamp": base.isoformat()},
+        {"close": None, "timestamp": (base + timedelta(days=3)).isoformat()},
+        {"close": "101.5", "high": 102.0, "low": 99.0, "timestamp": (base + timedelta(days=1)).isoformat()},
+    ]
+
+
+def test_from_records_sorts_and_drops_invalid_rows() -> None:
+    series = CandleSeries.from_records(_records())
+
+    assert len(series) == 3
+    assert series.close.tolist() == [100.0, 101.5, 103.0]
+    assert series.high[0] == 100.0
+    assert np.all(np.diff(series.timestamp) > 0)
+
+
+def test_as_candle_series_passes_series_through() -> None:
+    series = CandleSeries.from_records(_records())
+
+    assert as_candle_series(series) is series
+    assert len(as_candle_series([])) == 0
+
+
+def test_indicators_accept_records_and_series_alike() -> None:
+    end = datetime(2024, 6, 1, tzinfo=UTC)
+    series = LocalSampleProvider().get_history("AAPL", start=end - timedelta(days=60), end=end)
+    records = series.to_records()
+
+    assert calculate_sma(records, 20) == calculate_sma(series, 20)
+    assert calculate_rsi(records, 14) == calculate_rsi(series, 14)
+    assert calculate_atr(records, 14) == calculate_atr(series, 14)
+    assert calculate_return(records, 5) == calculate_return(series, 5)
+
+
+def test_bulk_timestamp_parsing_matches_isoformat() -> None:
+    base = datetime(2024, 3, 10, 22, 30, 15, 250_000, tzinfo=UTC)
+    stamps = [base + timedelta(hours=index) for index in range(48)]
+    zulu = [stamp.isoformat().replace("+00:00", "Z") for stamp in stamps]
+    expected = [stamp.timestamp() for stamp in stamps]
+
+    assert parse_timestamps(zulu).tolist() == expected
+    assert parse_timestamps([stamp.isoformat() for stamp in stamps]).tolist() == expected
+    offset = "2024-03-10T12:00:00+02:00"
+    mixed = parse_timestamps([zulu[0], offset, 1_700_000_000, "not a date", None])
+    assert mixed.tolist() == [expected[0], datetime.fromisoformat(offset).timestamp(), 1_700_000_000.0, 0.0, 0.0]
+
+
+def test_from_arrays_keeps_sorted_columns_without_copying() -> None:
+    timestamp = np.arange(5, dtype=np.float64)
+    close = np.linspace(100.0, 104.0, 5)
+
+    series = CandleSeries.from_arrays(timestamp, close, close, close, close, close)
+    shuffled = CandleSeries.from_arrays(timestamp[::-1], close, close, close, close, close)
+
+    assert series.close is close and series.timestamp is timestamp
+    assert shuffled.close.tolist() == close[::-1].tolist()
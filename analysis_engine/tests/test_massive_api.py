@@ -0,0 +1,205 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from analysis_engine.engine.pipeline import AnalysisPipeline, PipelineConfig
+from analysis_engine.engine.scoring import RecommendationScorer
+from data_integration.providers.base import chunk_symbols
+from data_integration.providers.http_pool import HttpClientPool
+from data_integration.providers.local_sample import LocalSampleProvider
+from data_integration.providers.massive_api import MassiveAPIProvider
+
+END = datetime(2024, 6, 1, tzinfo=UTC)
+START = END - timedelta(days=30)
+
+
+def _candles(count: int = 20) -> list[dict]:
+    return [
+        {
+            "open": 100.0 + index,
+            "high": 101.0 + index,
+            "low": 99.0 + index,
+            "close": 100.5 + index,
+            "volume": 1000,
+            "timestamp": (START + timedelta(days=index)).isoformat(),
+        }
+        for index in range(count)
+    ]
+
+
+def _history_batch(request: httpx.Request, count: int = 20) -> httpx.Response:
+    symbols = request.url.params["symbols"].split(",")
+    return httpx.Response(200, json={"results": [{"symbol": symbol, "candles": _candles(count)} for symbol in symbols]})
+
+
+def test_get_history_many_limits_concurrency() -> None:
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return _history_batch(request)
+
+    provider = MassiveAPIProvider(
+        api_key="test",
+        max_concurrency=3,
+        history_batch_size=1,
+        async_transport=httpx.MockTransport(handler),
+        bulk_history=True,
+    )
+    tickers = [f"T{index}" for index in range(10)]
+
+    history = asyncio.run(provider.get_history_many(tickers, start=START, end=END))
+
+    assert list(history) == tickers
+    assert all(len(series) == 20 for series in history.values())
+    assert peak == 3
+
+
+def test_get_history_many_retries_rate_limited_requests() -> None:
+    calls: dict[str, int] = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        ticker = request.url.params["symbols"]
+        calls[ticker] = calls.get(ticker, 0) + 1
+        if calls[ticker] == 1:
+            return httpx.Response(429)
+        if ticker == "BROKEN":
+            return httpx.Response(503)
+        return _history_batch(request)
+
+    provider = MassiveAPIProvider(
+        api_key="test", max_retries=2, backoff=0, async_transport=httpx.MockTransport(handler), bulk_history=True
+    )
+
+    history = asyncio.run(provider.get_history_many(["aapl"], start=START, end=END))
+    assert len(history["aapl"]) == 20
+    assert calls["AAPL"] == 2
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(provider.get_history_many(["BROKEN"], start=START, end=END))
+    assert calls["BROKEN"] == 3
+
+
+def test_pipeline_arun_matches_run() -> None:
+    config = PipelineConfig(tickers=["AAPL", "TSLA", "ERIC"], start=START, end=END)
+    serial = AnalysisPipeline(LocalSampleProvider(), RecommendationScorer(), config).run()
+    concurrent = asyncio.run(AnalysisPipeline(LocalSampleProvider(), RecommendationScorer(), config).arun())
+
+    assert [recommendation.ticker for recommendation in concurrent] == config.tickers
+    assert [(r.ticker, r.score, r.signal) for r in concurrent] == [(r.ticker, r.score, r.signal) for r in serial]
+
+
+def test_shared_pool_reuses_clients_and_counts_requests() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if "symbols" in request.url.params:
+            return _history_batch(request, 5)
+        return httpx.Response(200, json={"results": _candles(5)})
+
+    pool = HttpClientPool(transport=httpx.MockTransport(handler), async_transport=httpx.MockTransport(handler))
+    provider = MassiveAPIProvider(api_key="test", pool=pool, bulk_history=True)
+
+    async def fetch_twice() -> None:
+        first_client = pool.async_client()
+        await provider.get_history_many(["AAPL", "TSLA"], start=START, end=END)
+        await provider.get_history_many(["ERIC"], start=START, end=END)
+        assert pool.async_client() is first_client
+        await provider.aclose()
+        assert not first_client.is_closed  # the pool belongs to the caller
+        await pool.aclose()
+        assert first_client.is_closed
+
+    provider.get_history("AAPL", start=START, end=END)
+    asyncio.run(fetch_twice())
+
+    stats = pool.stats()
+    assert stats.requests == 3
+    assert stats.open_clients == 0
+    with pytest.raises(RuntimeError):
+        provider.get_history("AAPL", start=START, end=END)
+
+
+def test_history_batch_chunks_symbols_and_fills_missing() -> None:
+    requested: list[list[str]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path.endswith("/market/history")
+        symbols = request.url.params["symbols"].split(",")
+        requested.append(symbols)
+        return httpx.Response(
+            200,
+            json={"results": [{"symbol": symbol, "candles": _candles()} for symbol in symbols if symbol != "GONE"]},
+        )
+
+    pool = HttpClientPool(transport=httpx.MockTransport(handler), async_transport=httpx.MockTransport(handler))
+    provider = MassiveAPIProvider(api_key="test", pool=pool, history_batch_size=2, bulk_history=True)
+    tickers = ["aapl", "TSLA", "ERIC", "GONE", "VOLV"]
+
+    history = provider.get_history_batch(tickers, start=START, end=END)
+    concurrent = asyncio.run(provider.get_history_many(tickers, start=START, end=END))
+
+    assert requested[:3] == [["AAPL", "TSLA"], ["ERIC", "GONE"], ["VOLV"]]
+    assert list(history) == list(concurrent) == tickers
+    assert len(history["aapl"]) == 20 and len(history["GONE"]) == 0
+    assert pool.stats().requests == 6
+
+
+def test_history_batch_falls_back_to_per_ticker_requests() -> None:
+    paths: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        if request.url.path.endswith("/market/history"):
+            return httpx.Response(404)
+        return httpx.Response(200, json={"results": _candles()})
+
+    pool = HttpClientPool(transport=httpx.MockTransport(handler), async_transport=httpx.MockTransport(handler))
+    default = MassiveAPIProvider(api_key="test", pool=pool)
+    bulk = MassiveAPIProvider(api_key="test", pool=pool, bulk_history=True)
+
+    assert len(default.get_history_batch(["AAPL", "TSLA"], start=START, end=END)["TSLA"]) == 20
+    assert paths == ["/v3/market/history/AAPL", "/v3/market/history/TSLA"]
+
+    paths.clear()
+    history = bulk.get_history_batch(["aapl", "TSLA"], start=START, end=END)
+    concurrent = asyncio.run(bulk.get_history_many(["ERIC"], start=START, end=END))
+
+    assert paths == [f"/v3/market/history{suffix}" for suffix in ("", "/AAPL", "/TSLA", "/ERIC")]
+    assert not bulk.bulk_history
+    assert list(history) == ["aapl", "TSLA"] and len(history["aapl"]) == 20
+    assert len(concurrent["ERIC"]) == 20
+
+
+def test_chunk_symbols_respects_length_limit() -> None:
+    symbols = ["AAAA", "BBBB", "CCCC", "DDDD"]
+
+    assert chunk_symbols(symbols, max_symbols=3) == [["AAAA", "BBBB", "CCCC"], ["DDDD"]]
+    assert chunk_symbols(symbols, max_symbols=10, max_length=9) == [["AAAA", "BBBB"], ["CCCC", "DDDD"]]
+    assert chunk_symbols([*symbols, "AAAA"], max_symbols=10) == [symbols]
+
+
+def test_pipeline_run_uses_batch_history() -> None:
+    class BatchOnlyProvider(LocalSampleProvider):
+        batches: list[list[str]] = []
+
+        def get_history_batch(self, tickers, start, end, interval="1d"):  # type: ignore[override]
+            tickers = list(tickers)
+            self.batches.append(tickers)
+            return {ticker: LocalSampleProvider.get_history(self, ticker, start, end, interval) for ticker in tickers}
+
+        def get_history(self, *args, **kwargs):  # type: ignore[override]
+            raise AssertionError("per-ticker history should not be used")
+
+    config = PipelineConfig(tickers=["AAPL", "TSLA", "ERIC"], start=START, end=END)
+    provider = BatchOnlyProvider()
+
+    assert len(AnalysisPipeline(provider, RecommendationScorer(), config).run()) == 3
+    assert len(asyncio.run(AnalysisPipeline(provider, RecommendationScorer(), config).arun())) == 3
+    assert provider.batches == [config.tickers, config.tickers]
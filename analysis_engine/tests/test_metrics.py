@@ -0,0 +1,25 @@
+from data_integration.metrics import profiling, render, server_timing, stage
+
+
+def test_stage_histogram_is_exposed_in_text_format() -> None:
+    with stage("render-test"):
+        pass
+
+    lines = render().decode().splitlines()
+
+    assert "# TYPE pipeline_stage_seconds histogram" in lines
+    assert 'pipeline_stage_seconds_count{stage="render-test"} 1.0' in lines
+    assert not any("_created" in line for line in lines)
+
+
+def test_stage_accumulates_into_active_profile_only() -> None:
+    with stage("outside"):
+        pass
+    with profiling() as profile:
+        with stage("scoring"):
+            pass
+        with stage("scoring"):
+            pass
+
+    assert list(profile) == ["scoring"]
+    assert server_timing({"scoring": 0.0125}) == "scoring;dur=12.50"
@@ -0,0 +1,44 @@
+import pytest
+
+from analysis_engine.engine.ranking import InvalidCursorError, rank_recommendations
+from analysis_engine.engine.scoring import Recommendation
+
+
+def _recommendations() -> list[Recommendation]:
+    scores = {"AAA": 55.0, "BBB": 81.0, "CCC": 55.0, "DDD": 20.0, "EEE": 72.5, "FFF": 44.0}
+    signals = {"AAA": "ACCUMULATE", "BBB": "BUY", "CCC": "ACCUMULATE", "DDD": "SELL", "EEE": "BUY", "FFF": "HOLD"}
+    return [Recommendation(ticker, score, signals[ticker], []) for ticker, score in scores.items()]
+
+
+def test_rank_orders_by_score_then_ticker_with_offset() -> None:
+    page = rank_recommendations(_recommendations(), limit=3, offset=1)
+
+    assert [r.ticker for r in page.results] == ["EEE", "AAA", "CCC"]
+    assert page.total == 6
+    assert page.next_cursor is not None
+
+
+def test_rank_filters_by_min_score_and_signal() -> None:
+    page = rank_recommendations(_recommendations(), min_score=50, signals=["accumulate", "HOLD"])
+
+    assert [r.ticker for r in page.results] == ["AAA", "CCC"]
+    assert page.total == 2
+    assert page.next_cursor is None
+
+
+def test_cursor_pages_through_all_results_and_survives_new_items() -> None:
+    recommendations = _recommendations()
+    first = rank_recommendations(recommendations, limit=2)
+    recommendations.append(Recommendation("ZZZ", 99.0, "BUY", []))
+    second = rank_recommendations(recommendations, limit=2, cursor=first.next_cursor)
+    third = rank_recommendations(recommendations, limit=2, cursor=second.next_cursor)
+
+    assert [r.ticker for r in first.results] == ["BBB", "EEE"]
+    assert [r.ticker for r in second.results] == ["AAA", "CCC"]
+    assert [r.ticker for r in third.results] == ["FFF", "DDD"]
+    assert third.next_cursor is None
+
+
+def test_invalid_cursor_is_rejected() -> None:
+    with pytest.raises(InvalidCursorError):
+        rank_recommendations(_recommendations(), limit=2, cursor="not-a-cursor")
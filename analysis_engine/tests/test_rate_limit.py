@@ -0,0 +1,93 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from data_integration.providers.http_pool import HttpClientPool
+from data_integration.providers.massive_api import MassiveAPIProvider
+from data_integration.providers.rate_limit import (
+    RateLimitConfig,
+    RateLimiter,
+    TokenBucket,
+    parse_rate_limits,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_spaces_requests_after_burst() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(RateLimitConfig(rate=2.0, burst=2), clock=clock)
+
+    waits = [bucket.reserve() for _ in range(4)]
+    clock.now = 5.0
+
+    assert waits == [0.0, 0.0, 0.5, 1.0]
+    assert bucket.reserve() == 0.0
+    assert bucket.stats().throttled == 2
+
+
+def test_retry_after_pauses_and_429_slows_down_until_recovered() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(RateLimitConfig(rate=4.0), clock=clock)
+
+    bucket.observe(429, {"retry-after": "3"})
+    assert bucket.rate == 2.0
+    assert bucket.reserve() == pytest.approx(3.5)
+
+    for _ in range(10):
+        bucket.observe(200, {})
+    assert bucket.rate == 4.0
+    assert bucket.stats().rate_limited == 1
+
+
+def test_exhausted_quota_header_pauses_until_reset() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(RateLimitConfig(rate=10.0), clock=clock)
+
+    bucket.observe(200, {"x-ratelimit-remaining": "0", "x-ratelimit-reset": "2"})
+
+    assert bucket.reserve() == pytest.approx(2.1)
+
+
+def test_parsers() -> None:
+    later = (datetime.now(UTC) + timedelta(seconds=30)).strftime("%a, %d %b %Y %H:%M:%S GMT")
+
+    assert parse_retry_after("1.5") == 1.5
+    assert 25 < parse_retry_after(later) <= 30  # type: ignore[operator]
+    assert parse_retry_after("soon") is None
+    assert parse_rate_limits("history:5, search:1") == {
+        "history": RateLimitConfig(rate=5.0),
+        "search": RateLimitConfig(rate=1.0),
+    }
+
+
+def test_massive_retries_rate_limited_sync_calls_and_reports_throttling() -> None:
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"results": [{"symbol": "AAPL", "peRatio": 20}]})
+
+    limiter = RateLimiter(endpoints={"fundamentals": RateLimitConfig(rate=100.0)})
+    provider = MassiveAPIProvider(
+        api_key="test", pool=HttpClientPool(transport=httpx.MockTransport(handler)), rate_limiter=limiter
+    )
+
+    fundamentals = provider.get_fundamentals(["AAPL"])
+
+    assert fundamentals[0].pe_ratio == 20.0
+    assert calls == 2
+    stats = limiter.stats()["fundamentals"]
+    assert stats["requests"] == 2 and stats["rate_limited"] == 1 and stats["pauses"] == 1
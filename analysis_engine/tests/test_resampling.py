@@ -0,0 +1,153 @@
+from datetime import UTC, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pytest
+
+from analysis_engine.engine.pipeline import AnalysisPipeline, PipelineConfig
+from analysis_engine.engine.resampling import Session, fetch_timeframes, resample, source_interval
+from analysis_engine.engine.scheduler import RecommendationScheduler, UniverseConfig
+from analysis_engine.engine.scoring import RecommendationScorer
+from data_integration.providers.candles import CandleSeries
+from data_integration.providers.local_sample import LocalSampleProvider
+
+END = datetime(2024, 6, 3, tzinfo=UTC)
+
+
+class CountingProvider(LocalSampleProvider):
+    def __init__(self) -> None:
+        super().__init__()
+        self.intervals: list[str] = []
+
+    def get_history(self, ticker, start, end, interval="1d") -> CandleSeries:  # type: ignore[override]
+        self.intervals.append(interval)
+        return super().get_history(ticker, start, end, interval)
+
+
+def _hourly(days: int = 10) -> CandleSeries:
+    return LocalSampleProvider().get_history("AAPL", start=END - timedelta(days=days), end=END, interval="1h")
+
+
+def test_hourly_candles_aggregate_into_daily_bars() -> None:
+    hourly = _hourly()
+    daily = resample(hourly, "1d")
+
+    assert len(daily) == 10
+    for index, day_start in enumerate(daily.timestamp):
+        rows = (hourly.timestamp >= day_start) & (hourly.timestamp < day_start + 86_400)
+        assert daily.open[index] == hourly.open[rows][0]
+        assert daily.close[index] == hourly.close[rows][-1]
+        assert daily.high[index] == hourly.high[rows].max()
+        assert daily.low[index] == hourly.low[rows].min()
+        assert daily.volume[index] == pytest.approx(hourly.volume[rows].sum())
+    assert len(resample(CandleSeries.empty(), "1w")) == 0
+
+
+def test_weekly_bars_start_on_monday() -> None:
+    daily = LocalSampleProvider().get_history("TSLA", start=END - timedelta(days=70), end=END)
+    weekly = resample(daily, "1w")
+
+    starts = [datetime.fromtimestamp(value, UTC) for value in weekly.timestamp]
+    assert all(start.weekday() == 0 and start.hour == 0 for start in starts)
+    assert weekly.volume.sum() == pytest.approx(daily.volume.sum())
+    assert weekly.close[-1] == daily.close[-1]
+
+
+def test_session_filters_bars_and_buckets_by_exchange_day() -> None:
+    # New York switches to daylight saving time on 2024-03-10.
+    start = datetime(2024, 3, 7, tzinfo=UTC)
+    hours = np.arange(6 * 24, dtype=np.float64)
+    series = CandleSeries(
+        start.timestamp() + hours * 3_600, hours, hours + 0.5, hours - 0.5, hours + 0.25, np.ones(hours.size)
+    )
+    session = Session(timezone="America/New_York", open=time(9, 30), close=time(16, 0))
+
+    daily = resample(series, "1d", session)
+
+    zone = ZoneInfo(session.timezone)
+    local = [datetime.fromtimestamp(value, UTC).astimezone(zone) for value in daily.timestamp]
+    assert [(value.hour, value.minute) for value in local] == [(0, 0)] * len(daily)
+    assert [value.day for value in local] == [7, 8, 9, 10, 11, 12]
+    assert daily.volume.tolist() == [6.0] * 6  # 10:00-15:00 local, both before and after the switch
+
+
+def test_source_interval_picks_finest_native_interval() -> None:
+    assert source_interval(["1d"]) == "1d"
+    assert source_interval(["1w"]) == "1d"
+    assert source_interval(["1w", "1d", "1h"]) == "1h"
+    with pytest.raises(ValueError):
+        source_interval(["5m"])
+
+
+def test_timeframes_are_derived_from_one_fetch() -> None:
+    provider = CountingProvider()
+
+    history = fetch_timeframes(provider, ["AAPL", "ERIC"], END - timedelta(days=30), END, ["1d", "1h", "1w"])
+
+    assert provider.intervals == ["1h", "1h"]
+    assert len(history["1h"]["AAPL"]) == 720 and len(history["1d"]["AAPL"]) == 30
+    assert len(history["1w"]["ERIC"]) == 5
+    assert history["1d"]["AAPL"].close.tolist() == resample(history["1h"]["AAPL"], "1d").close.tolist()
+
+
+def test_fixed_source_is_used_even_when_a_coarser_one_would_do() -> None:
+    provider = CountingProvider()
+
+    history = fetch_timeframes(provider, ["AAPL"], END - timedelta(days=30), END, ["1d"], source="1h")
+
+    assert provider.intervals == ["1h"] and len(history["1d"]["AAPL"]) == 30
+    with pytest.raises(ValueError):
+        fetch_timeframes(provider, ["AAPL"], END - timedelta(days=30), END, ["1h"], source="1d")
+
+
+def test_daily_bars_become_weeks_regardless_of_session() -> None:
+    daily = LocalSampleProvider().get_history("TSLA", start=END - timedelta(days=70), end=END)
+    utc = resample(daily, "1w")
+
+    for session in (
+        Session(timezone="America/New_York", open=time(9, 30), close=time(16, 0)),
+        Session(timezone="America/New_York"),
+        Session(timezone="Asia/Tokyo"),
+    ):
+        weekly = resample(daily, "1w", session)
+        assert weekly.timestamp.tolist() == utc.timestamp.tolist()
+        assert weekly.close.tolist() == utc.close.tolist()
+        assert weekly.volume.sum() == pytest.approx(daily.volume.sum())
+        assert len(resample(daily, "1w", session, source="1d")) == len(utc) == 10
+
+
+def test_pipeline_derives_weekly_interval() -> None:
+    provider = CountingProvider()
+    config = PipelineConfig(tickers=["AAPL", "TSLA"], start=END - timedelta(days=365), end=END, interval="1w")
+
+    results = AnalysisPipeline(provider, RecommendationScorer(), config).run()
+
+    assert {result.ticker for result in results} == {"AAPL", "TSLA"}
+    assert set(provider.intervals) == {"1d"}
+
+
+def test_scheduler_grouping_does_not_change_the_data_source() -> None:
+    provider = CountingProvider()
+    universes = [
+        UniverseConfig(name="us", tickers=("AAPL", "TSLA", "ERIC"), interval=interval, lookback_days=120)
+        for interval in ("1d", "1h", "1w")
+    ]
+    scheduler = RecommendationScheduler(
+        universes,
+        pipeline_factory=lambda config: AnalysisPipeline(provider, RecommendationScorer(), config),
+    )
+
+    daily, hourly, weekly = scheduler.refresh("us")
+    alone = scheduler._refresh(universes[0])
+    weekly_alone = scheduler._refresh(universes[2])
+
+    # The group's source is 1h, whether 1d is refreshed with 1h or alone.
+    assert provider.intervals == ["1h"] * 9
+    assert (daily.interval, hourly.interval, weekly.interval) == ("1d", "1h", "1w")
+
+    def summary(snapshot):
+        return sorted((r.ticker, round(r.score, 6), r.signal) for r in snapshot.recommendations)
+
+    assert summary(daily) == summary(alone)
+    assert summary(weekly) == summary(weekly_alone)
+    assert len(daily.pipeline._history["AAPL"]) == len(alone.pipeline._history["AAPL"]) in (120, 121)
@@ -0,0 +1,93 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from data_integration.providers.local_sample import LocalSampleProvider
+from data_integration.providers.response_cache import ResponseCache, ResponseCacheProvider
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_ttl() -> None:
+    clock = FakeClock()
+    cache: ResponseCache[str] = ResponseCache(ttl=10.0, clock=clock)
+    loads: list[list] = []
+
+    def load(keys: list) -> dict:
+        loads.append(keys)
+        return {key: f"value-{key}" for key in keys}
+
+    assert cache.get_many(["A", "B"], load) == {"A": "value-A", "B": "value-B"}
+    clock.now = 5.0
+    cache.get_many(["A", "B", "C"], load)
+    clock.now = 12.0
+    cache.get_many(["A"], load)
+
+    assert loads == [["A", "B"], ["C"], ["A"]]
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.expirations) == (2, 4, 1)
+
+
+def test_lru_eviction_is_bounded_by_size() -> None:
+    cache: ResponseCache[str] = ResponseCache(ttl=60.0, max_bytes=30, sizeof=lambda value: 10)
+    load = lambda keys: {key: key for key in keys}  # noqa: E731
+
+    cache.get_many(["A", "B", "C"], load)
+    cache.get_many(["A"], load)
+    cache.get_many(["D"], load)
+
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.size_bytes == 30
+    assert cache.get_many(["A", "C", "D"], lambda keys: {}) == {"A": "A", "C": "C", "D": "D"}
+
+
+def test_concurrent_misses_share_one_upstream_call() -> None:
+    cache: ResponseCache[str] = ResponseCache(ttl=60.0)
+    started = threading.Event()
+    calls: list[list] = []
+
+    def slow_load(keys: list) -> dict:
+        calls.append(keys)
+        started.set()
+        time.sleep(0.05)
+        return {key: key.lower() for key in keys}
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(cache.get_many, ["AAPL", "TSLA"], slow_load)
+        started.wait()
+        second = pool.submit(cache.get_many, ["TSLA", "ERIC"], slow_load)
+        assert first.result() == {"AAPL": "aapl", "TSLA": "tsla"}
+        assert second.result() == {"TSLA": "tsla", "ERIC": "eric"}
+
+    assert calls == [["AAPL", "TSLA"], ["ERIC"]]
+    assert cache.stats().coalesced == 1
+
+
+def test_provider_serves_quotes_and_fundamentals_from_cache() -> None:
+    upstream = LocalSampleProvider()
+    requested: list[list[str]] = []
+    original = upstream.get_fundamentals
+
+    def counting_fundamentals(tickers):
+        tickers = list(tickers)
+        requested.append(tickers)
+        return original(tickers)
+
+    upstream.get_fundamentals = counting_fundamentals  # type: ignore[method-assign]
+    provider = ResponseCacheProvider(upstream, quotes=ResponseCache(ttl=15.0), fundamentals=ResponseCache(ttl=60.0))
+
+    first = provider.get_fundamentals(["aapl", "TSLA"])
+    second = provider.get_fundamentals(["TSLA", "ERIC", "AAPL"])
+    quotes = provider.get_quotes(["AAPL", "AAPL"])
+
+    assert [item.ticker for item in first] == ["AAPL", "TSLA"]
+    assert [item.ticker for item in second] == ["TSLA", "ERIC", "AAPL"]
+    assert requested == [["AAPL", "TSLA"], ["ERIC"]]
+    assert [quote.ticker for quote in quotes] == ["AAPL"]
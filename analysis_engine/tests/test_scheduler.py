@@ -0,0 +1,76 @@
+import time
+from datetime import UTC, datetime, timedelta
+
+from analysis_engine.engine.pipeline import AnalysisPipeline, PipelineConfig
+from analysis_engine.engine.scheduler import RecommendationScheduler, UniverseConfig, parse_cadences
+from analysis_engine.engine.scoring import RecommendationScorer
+from data_integration.providers.base import Quote
+from data_integration.providers.local_sample import LocalSampleProvider
+
+
+def _factory(configs: list[PipelineConfig]):
+    def create(config: PipelineConfig) -> AnalysisPipeline:
+        configs.append(config)
+        return AnalysisPipeline(provider=LocalSampleProvider(), scorer=RecommendationScorer(), config=config)
+
+    return create
+
+
+def test_refresh_publishes_versioned_snapshots() -> None:
+    configs: list[PipelineConfig] = []
+    universe = UniverseConfig(name="nordic", tickers=("ERIC", "VOLV"), interval="1d", lookback_days=60)
+    scheduler = RecommendationScheduler([universe], pipeline_factory=_factory(configs))
+
+    first, = scheduler.refresh()
+    second, = scheduler.refresh("nordic")
+
+    assert (first.version, second.version) == (1, 2)
+    assert scheduler.latest(universe) is second
+    assert {r.ticker for r in second.recommendations} == {"ERIC", "VOLV"}
+    assert configs[0].end - configs[0].start == timedelta(days=60)
+    assert scheduler.refresh("unknown") == []
+    assert scheduler.find(["VOLV", "ERIC"], "1d", 60) is universe
+    assert scheduler.find(["VOLV", "ERIC"], "1h", 60) is None
+
+
+def test_background_thread_recomputes_on_cadence_and_trigger() -> None:
+    universe = UniverseConfig(name="us", tickers=("AAPL",), interval="1h", lookback_days=10, cadence=3600)
+    scheduler = RecommendationScheduler([universe], pipeline_factory=_factory([]))
+    scheduler.start()
+    try:
+        deadline = time.monotonic() + 5
+        while scheduler.latest(universe) is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert scheduler.latest(universe).version == 1
+
+        scheduler.trigger("us")
+        while scheduler.latest(universe).version < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert scheduler.latest(universe).version == 2
+    finally:
+        scheduler.stop()
+
+
+def test_snapshot_staleness_and_cadence_parsing() -> None:
+    universe = UniverseConfig(name="us", tickers=("AAPL",), cadence=60)
+    scheduler = RecommendationScheduler([universe], pipeline_factory=_factory([]))
+    snapshot, = scheduler.refresh()
+
+    assert not snapshot.is_stale()
+    assert snapshot.is_stale(datetime.now(UTC) + timedelta(seconds=121))
+    assert parse_cadences("1d:300, 1h:60") == {"1d": 300.0, "1h": 60.0}
+
+
+def test_snapshot_is_explained_on_copies_against_its_own_inputs() -> None:
+    universe = UniverseConfig(name="nordic", tickers=("ERIC", "VOLV"), interval="1d", lookback_days=60)
+    scheduler = RecommendationScheduler([universe], pipeline_factory=_factory([]))
+    snapshot, = scheduler.refresh()
+    expected = [r.reasoning for r in snapshot.pipeline.explain(snapshot.recommendations)]
+
+    # Quote repricing reuses the live pipeline; the older snapshot must still explain its own scores.
+    scheduler.apply_quotes([Quote("ERIC", 1.0, "SEK", datetime.now(UTC))])
+    explained = snapshot.pipeline.explain(snapshot.recommendations, snapshot.inputs)
+
+    assert [r.reasoning for r in explained] == expected and all(expected)
+    assert all(not r.reasoning for r in snapshot.recommendations)
+    assert [r.reasoning for r in snapshot.pipeline.explain(snapshot.recommendations)] != expected
@@ -1,5 +1,7 @@
 from datetime import UTC, datetime, timedelta
 
+import pytest
+
 from data_integration.providers.base import Fundamental, Quote
 from analysis_engine.engine.scoring import IndicatorSnapshot, RecommendationScorer
 
@@ -37,3 +39,85 @@ def test_recommendation_scoring_generates_reasoning() -> None:
     assert recommendation.ticker == "AAPL"
     assert recommendation.score > 0
     assert len(recommendation.reasoning) <= 3
+
+
+def test_vectorized_scoring_matches_scalar_path() -> None:
+    import numpy as np
+
+    from analysis_engine.engine.batch import BatchIndicators
+
+    scorer = RecommendationScorer()
+    now = datetime.now(UTC)
+    tickers = ["UP", "DOWN", "FLAT", "BARE", "ZERO", "HOT"]
+    nan = float("nan")
+    indicators = BatchIndicators(
+        tickers=tickers,
+        sma_short=np.array([158.0, 90.0, 100.0, nan, 10.0, 210.0]),
+        sma_long=np.array([150.0, 110.0, 100.0, nan, 0.0, 150.0]),
+        rsi=np.array([58.0, 25.0, 45.0, nan, 30.0, 82.0]),
+        atr=np.array([4.5, 12.0, 0.0, nan, 1.0, 30.0]),
+        price_return=np.array([0.08, -0.3, 0.0, nan, 0.01, 0.5]),
+    )
+    fundamentals = [
+        Fundamental(ticker="UP", pe_ratio=22.0, roe=18.0, debt_to_equity=0.45),
+        Fundamental(ticker="DOWN", pe_ratio=45.0, roe=-30.0, debt_to_equity=2.0),
+        Fundamental(ticker="FLAT", pe_ratio=12.0, roe=None, debt_to_equity=0.8),
+        Fundamental(ticker="HOT", pe_ratio=18.0, roe=40.0, debt_to_equity=1.0),
+    ]
+    quotes = [
+        Quote(ticker=ticker, price=price, currency="USD", timestamp=now)
+        for ticker, price in (("UP", 168.0), ("DOWN", 80.0), ("FLAT", 100.0), ("ZERO", 0.0), ("HOT", 220.0))
+    ]
+    history = {ticker: [{"close": 1.0}] for ticker in tickers}
+
+    scalar = scorer.score(history, fundamentals, quotes, indicators.to_snapshots())
+    vectorized = scorer.score_batch(indicators, fundamentals, quotes, explain_top=2, explain=["BARE"])
+
+    assert [(r.ticker, r.score, r.signal) for r in vectorized] == [(r.ticker, r.score, r.signal) for r in scalar]
+    explained = {r.ticker for r in vectorized if r.reasoning}
+    top_two = {r.ticker for r in sorted(scalar, key=lambda r: r.score, reverse=True)[:2]}
+    assert explained == top_two | ({"BARE"} if scalar[3].reasoning else set())
+    for recommendation in vectorized:
+        if recommendation.reasoning:
+            assert recommendation.reasoning == next(r.reasoning for r in scalar if r.ticker == recommendation.ticker)
+
+
+def test_missing_and_nan_inputs_score_the_same_in_both_paths() -> None:
+    import numpy as np
+
+    from analysis_engine.engine.batch import BatchIndicators
+
+    scorer = RecommendationScorer()
+    now = datetime.now(UTC)
+    tickers = ["NONE", "ABSENT", "NAN_PE", "NAN_ROE", "NAN_PRICE"]
+    nan = float("nan")
+    indicators = BatchIndicators(
+        tickers=tickers,
+        sma_short=np.full(5, 105.0),
+        sma_long=np.full(5, 100.0),
+        rsi=np.full(5, 55.0),
+        atr=np.full(5, 2.0),
+        price_return=np.full(5, 0.02),
+    )
+    fundamentals = [
+        Fundamental(ticker="NONE", pe_ratio=None, roe=None, debt_to_equity=None),
+        Fundamental(ticker="NAN_PE", pe_ratio=nan, roe=12.0, debt_to_equity=nan),
+        Fundamental(ticker="NAN_ROE", pe_ratio=15.0, roe=nan, debt_to_equity=0.3),
+        Fundamental(ticker="NAN_PRICE", pe_ratio=15.0, roe=12.0, debt_to_equity=0.3),
+    ]
+    prices = {"NONE": 100.0, "ABSENT": 100.0, "NAN_PE": 100.0, "NAN_ROE": 100.0, "NAN_PRICE": nan}
+    quotes = [Quote(ticker=ticker, price=price, currency="USD", timestamp=now) for ticker, price in prices.items()]
+    history = {ticker: [{"close": 1.0}] for ticker in tickers}
+
+    scalar = {r.ticker: r for r in scorer.score(history, fundamentals, quotes, indicators.to_snapshots())}
+    vectorized = scorer.score_arrays(indicators, fundamentals, quotes)
+
+    assert [scalar[ticker].score for ticker in tickers] == vectorized.tolist()
+    assert scalar["NONE"].score == scalar["ABSENT"].score
+    # A reported NaN is not missing: P/E and debt/equity score as expensive and high, a NaN ROE
+    # or price turns the sum into NaN and the clamp into 0.
+    config = scorer.config
+    expected_pe = scalar["NONE"].score + config.pe_expensive_score + 12.0 / 25.0 * 12.0 + config.debt_high_score
+    assert scalar["NAN_PE"].score == pytest.approx(expected_pe)
+    assert "P/E nan högt" in scalar["NAN_PE"].reasoning
+    assert scalar["NAN_ROE"].score == scalar["NAN_PRICE"].score == 0.0
@@ -0,0 +1,39 @@
+from datetime import UTC, datetime, timedelta
+
+from analysis_engine.engine.pipeline import AnalysisPipeline, PipelineConfig
+from analysis_engine.engine.scoring import RecommendationScorer
+from data_integration.providers.candles import CandleSeries
+from data_integration.providers.local_sample import LocalSampleProvider
+
+END = datetime(2024, 6, 1, tzinfo=UTC)
+
+
+class FixedHistoryProvider(LocalSampleProvider):
+    """Serves the same candles on every call so serial and sharded runs see identical data."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._cache: dict[str, CandleSeries] = {}
+
+    def get_history(self, ticker, start, end, interval="1d") -> CandleSeries:  # type: ignore[override]
+        if ticker not in self._cache:
+            series = super().get_history(ticker, start, end, interval)
+            self._cache[ticker] = CandleSeries.empty() if ticker == "EMPTY" else series
+        return self._cache[ticker]
+
+
+def test_sharded_run_is_identical_to_serial_run() -> None:
+    provider = FixedHistoryProvider()
+    tickers = ["AAPL", "TSLA", "ERIC", "EMPTY"] + [f"SYN{index}" for index in range(9)]
+
+    def run(workers: int):
+        config = PipelineConfig(tickers=tickers, start=END - timedelta(days=90), end=END, workers=workers)
+        pipeline = AnalysisPipeline(provider=provider, scorer=RecommendationScorer(), config=config)
+        return pipeline.run(), pipeline._indicators
+
+    serial, serial_indicators = run(1)
+    sharded, sharded_indicators = run(3)
+
+    assert sharded == serial
+    assert sharded_indicators == serial_indicators
+    assert "EMPTY" not in {recommendation.ticker for recommendation in sharded}
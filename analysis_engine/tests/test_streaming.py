@@ -0,0 +1,103 @@
+import json
+import math
+from datetime import UTC, datetime, timedelta
+
+from analysis_engine.engine.indicators import calculate_atr, calculate_return, calculate_rsi, calculate_sma
+from analysis_engine.engine.pipeline import AnalysisPipeline, PipelineConfig
+from analysis_engine.engine.scoring import IndicatorSnapshot, RecommendationScorer
+from analysis_engine.engine.streaming import IndicatorState
+from data_integration.providers.base import Quote
+from data_integration.providers.candles import CandleSeries
+from data_integration.providers.local_sample import LocalSampleProvider
+
+END = datetime(2024, 6, 1, tzinfo=UTC)
+
+
+class FailingProvider(LocalSampleProvider):
+    """Serves history until ``fail`` is set; refreshes must then work without fetching."""
+
+    fail = False
+
+    def get_history(self, ticker, start, end, interval="1d") -> CandleSeries:  # type: ignore[override]
+        if self.fail:
+            raise AssertionError("history must not be refetched")
+        return super().get_history(ticker, start, end, interval)
+
+
+def _history(days: int = 120) -> CandleSeries:
+    return LocalSampleProvider().get_history("AAPL", start=END - timedelta(days=days), end=END)
+
+
+def _assert_matches(snapshot: IndicatorSnapshot, series: CandleSeries) -> None:
+    expected = {
+        "sma_short": calculate_sma(series, 20),
+        "sma_long": calculate_sma(series, 50),
+        "rsi": calculate_rsi(series, 14),
+        "atr": calculate_atr(series, 14),
+        "price_return": calculate_return(series, 5),
+    }
+    for name, value in expected.items():
+        actual = getattr(snapshot, name)
+        assert (actual is None) == (value is None), name
+        if value is not None:
+            assert math.isclose(actual, value, rel_tol=1e-9), name
+
+
+def test_state_seeded_from_history_matches_scalar_indicators() -> None:
+    history = _history()
+    for length in (3, 15, 40, len(history)):
+        series = history.tail(length)
+        _assert_matches(IndicatorState.from_series(series).snapshot("AAPL"), series)
+
+
+def test_incremental_updates_match_full_recompute() -> None:
+    history = _history()
+    state = IndicatorState.from_series(history.tail(60))
+
+    for index in range(60, len(history)):
+        state.update(float(history.close[index]), float(history.high[index]), float(history.low[index]))
+
+    _assert_matches(state.snapshot("AAPL"), history)
+
+
+def test_state_survives_json_checkpoint() -> None:
+    history = _history()
+    state = IndicatorState.from_series(history)
+
+    restored = IndicatorState.from_dict(json.loads(json.dumps(state.to_dict())))
+    state.update(200.0)
+    restored.update(200.0)
+
+    assert restored.snapshot("AAPL") == state.snapshot("AAPL")
+
+
+def test_pipeline_refresh_applies_quote_without_refetch() -> None:
+    provider = FailingProvider()
+    config = PipelineConfig(tickers=["AAPL", "TSLA"], start=END - timedelta(days=60), end=END)
+    pipeline = AnalysisPipeline(provider=provider, scorer=RecommendationScorer(), config=config)
+    pipeline.run()
+    provider.fail = True
+
+    results = pipeline.refresh([Quote(ticker="AAPL", price=250.0, currency="USD", timestamp=END)])
+
+    assert {recommendation.ticker for recommendation in results} == {"AAPL", "TSLA"}
+    assert pipeline.states["AAPL"].sma_short._window[-1] == 250.0
+    assert "TSLA" not in pipeline.states
+
+
+def test_pipeline_refresh_scores_states_restored_from_checkpoint() -> None:
+    checkpoint = json.loads(json.dumps(IndicatorState.from_series(_history()).to_dict()))
+    expected = IndicatorState.from_dict(checkpoint)
+    expected.update(250.0)
+    provider = FailingProvider()
+    provider.fail = True
+    config = PipelineConfig(tickers=["AAPL"], start=END - timedelta(days=60), end=END)
+    pipeline = AnalysisPipeline(provider=provider, scorer=RecommendationScorer(), config=config)
+    pipeline.states = {"AAPL": IndicatorState.from_dict(checkpoint)}
+
+    results = pipeline.refresh([Quote(ticker="AAPL", price=250.0, currency="USD", timestamp=END)])
+
+    assert [recommendation.ticker for recommendation in results] == ["AAPL"]
+    assert pipeline._indicators["AAPL"] == expected.snapshot("AAPL")
+    quote = Quote(ticker="AAPL", price=250.0, currency="USD", timestamp=END)
+    assert results[0] == RecommendationScorer().score_one("AAPL", quote, None, expected.snapshot("AAPL"))
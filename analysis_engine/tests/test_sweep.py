@@ -0,0 +1,108 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from analysis_engine.engine.backtesting import IndicatorPanel, run_backtest
+from analysis_engine.engine.scoring import IndicatorSnapshot, RecommendationScorer, ScoringConfig
+from analysis_engine.engine.sweep import parameter_grid, random_configs, run_sweep
+from data_integration.providers.base import Fundamental, Quote
+from data_integration.providers.local_sample import LocalSampleProvider
+
+END = datetime(2024, 6, 1, tzinfo=UTC)
+
+
+def _panel() -> IndicatorPanel:
+    provider = LocalSampleProvider()
+    tickers = ["AAPL", "TSLA", "ERIC", "VOLV"]
+    return IndicatorPanel.from_history(
+        {ticker: provider.get_history(ticker, start=END - timedelta(days=200), end=END) for ticker in tickers}
+    )
+
+
+def _quote(price: float) -> Quote:
+    return Quote(ticker="T", price=price, currency="USD", timestamp=END)
+
+
+# Score, signal and reasoning produced by the scorer before its constants moved into ScoringConfig.
+BASELINE_CASES = [
+    (
+        _quote(100.0),
+        Fundamental("T", pe_ratio=15.0, roe=30.0, debt_to_equity=0.3),
+        IndicatorSnapshot("T", sma_short=110.0, sma_long=100.0, rsi=55.0, atr=2.0, price_return=0.12),
+        (99.0, "BUY", ["P/E 15.0 attraktivt", "RSI 55.0 (positivt momentum)", "Pris stigande 12.0%"]),
+    ),
+    (
+        _quote(50.0),
+        Fundamental("T", pe_ratio=45.0, roe=-20.0, debt_to_equity=2.5),
+        IndicatorSnapshot("T", sma_short=90.0, sma_long=100.0, rsi=25.0, atr=6.0, price_return=-0.2),
+        (0.0, "SELL", ["Pris fallande -20.0%", "RSI 25.0 signalerar svaghet", "P/E 45.0 högt"]),
+    ),
+    (
+        _quote(80.0),
+        Fundamental("T", pe_ratio=25.0, roe=10.0, debt_to_equity=0.8),
+        IndicatorSnapshot("T", sma_short=101.0, sma_long=100.0, rsi=38.0, atr=4.0, price_return=0.03),
+        (59.8, "ACCUMULATE", ["P/E 25.0 attraktivt", "RSI 38.0 (positivt momentum)", "ROE 10.0%"]),
+    ),
+    (
+        _quote(40.0),
+        None,
+        IndicatorSnapshot("T", sma_short=100.0, sma_long=104.0, rsi=78.0, atr=3.2, price_return=-0.05),
+        (
+            18.0384615385,
+            "SELL",
+            ["RSI 78.0 signalerar svaghet", "Pris fallande -5.0%", "Kort trend under lång trend"],
+        ),
+    ),
+    (None, Fundamental("T", pe_ratio=20.0, roe=5.0), None, (40.4, "HOLD", ["P/E 20.0 attraktivt", "ROE 5.0%"])),
+    (None, None, None, (30.0, "TRIM", [])),
+]
+
+
+@pytest.mark.parametrize(("quote", "fundamental", "indicator", "expected"), BASELINE_CASES)
+def test_default_config_reproduces_baseline_scores(quote, fundamental, indicator, expected) -> None:
+    scorer = RecommendationScorer()
+    result = scorer.score_one("T", quote, fundamental, indicator)
+
+    assert (result.score, result.signal, result.reasoning) == (pytest.approx(expected[0]), *expected[1:])
+
+
+def test_signal_cutoffs_match_baseline_and_are_configurable() -> None:
+    scorer = RecommendationScorer()
+
+    assert [scorer.signal_for(score) for score in (70.0, 69.9, 50.0, 40.0, 30.0, 29.9)] == [
+        "BUY",
+        "ACCUMULATE",
+        "ACCUMULATE",
+        "HOLD",
+        "TRIM",
+        "SELL",
+    ]
+    assert RecommendationScorer(ScoringConfig(buy_cutoff=80.0)).signal_for(75.0) == "ACCUMULATE"
+
+
+def test_parameter_grid_and_random_configs() -> None:
+    grid = parameter_grid({"rsi_oversold": [25.0, 30.0], "atr_threshold": [0.06, 0.08, 0.1]})
+
+    assert len(grid) == 6
+    assert {config.atr_threshold for config in grid} == {0.06, 0.08, 0.1}
+    samples = random_configs({"pe_cheap": (10.0, 20.0)}, samples=5, seed=1)
+    assert len(samples) == 5 and all(10.0 <= config.pe_cheap <= 20.0 for config in samples)
+    with pytest.raises(ValueError):
+        parameter_grid({"unknown": [1.0]})
+
+
+def test_parallel_sweep_matches_serial_and_is_ranked() -> None:
+    panel = _panel()
+    fundamentals = [Fundamental(ticker="AAPL", pe_ratio=25.0, roe=15.0, debt_to_equity=0.8)]
+    configs = parameter_grid({"accumulate_cutoff": [40.0, 50.0, 60.0], "pe_fair": [20.0, 30.0]})
+
+    serial = run_sweep(panel, configs, fundamentals, workers=1)
+    parallel = run_sweep(panel, configs, fundamentals, workers=2, chunk_size=2)
+
+    assert [result.metrics for result in parallel] == [result.metrics for result in serial]
+    sharpes = [result.metrics.sharpe for result in serial]
+    assert sharpes == sorted(sharpes, reverse=True)
+    best = serial[0]
+    expected = run_backtest(panel, fundamentals, RecommendationScorer(best.config)).metrics
+    assert best.metrics == expected
+    assert set(best.to_dict()["params"]) <= {"accumulate_cutoff", "pe_fair"}
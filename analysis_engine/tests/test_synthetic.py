@@ -0,0 +1,105 @@
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from data_integration.providers.local_sample import LocalSampleProvider
+from data_integration.providers.synthetic import (
+    SyntheticConfig,
+    SyntheticMarketDataProvider,
+    generate_batch,
+    generate_history,
+    synthetic_tickers,
+)
+
+END = datetime(2024, 6, 3, tzinfo=UTC)
+START = END - timedelta(days=500)
+
+
+def test_history_is_independent_of_call_order_and_batching() -> None:
+    provider = SyntheticMarketDataProvider(universe_size=50)
+    tickers = provider.universe[:5]
+
+    forward = provider.get_history_batch(tickers, start=START, end=END)
+    backward = SyntheticMarketDataProvider().get_history_batch(list(reversed(tickers)), start=START, end=END)
+    single = provider.get_history(tickers[2], start=START, end=END)
+
+    for ticker in tickers:
+        assert forward[ticker].close.tolist() == backward[ticker].close.tolist()
+    assert single.close.tolist() == forward[tickers[2]].close.tolist()
+    assert forward[tickers[0]].close.tolist() != forward[tickers[1]].close.tolist()
+
+
+def test_chunked_generation_matches_one_matrix() -> None:
+    config = SyntheticConfig(missing_probability=0.1, skip_weekends=True, gap_probability=0.1)
+    tickers = synthetic_tickers(7)
+
+    whole = generate_batch(tickers, START, END, config=config, chunk_size=len(tickers))
+    chunked = generate_batch(tickers, START, END, config=config, chunk_size=3)
+
+    assert list(chunked) == tickers
+    for ticker in tickers:
+        assert chunked[ticker].timestamp.tolist() == whole[ticker].timestamp.tolist()
+        assert chunked[ticker].close.tolist() == whole[ticker].close.tolist()
+        assert chunked[ticker].volume.tolist() == whole[ticker].volume.tolist()
+    with pytest.raises(ValueError):
+        generate_batch(tickers, START, END, chunk_size=0)
+
+
+def test_local_sample_history_no_longer_depends_on_call_order() -> None:
+    first = LocalSampleProvider()
+    first.get_history("TSLA", start=START, end=END)
+    after_other = first.get_history("AAPL", start=START, end=END)
+
+    fresh = LocalSampleProvider().get_history("AAPL", start=START, end=END)
+
+    assert after_other.close.tolist() == fresh.close.tolist()
+    assert fresh.open[0] == 189.3
+
+
+def test_generated_candles_are_consistent() -> None:
+    config = SyntheticConfig(gap_probability=0.1, regimes=(0.005, 0.04), regime_switch_probability=0.05)
+    series = generate_history("SYN00001", START, END, config=config)
+
+    assert len(series) == 500
+    assert np.all(np.diff(series.timestamp) == 86_400)
+    assert np.all(series.high >= np.maximum(series.open, series.close))
+    assert np.all(series.low <= np.minimum(series.open, series.close))
+    assert np.all(series.close > 0) and np.all(series.volume > 0)
+    # Gaps open away from the previous close.
+    assert np.any(np.abs(series.open[1:] - series.close[:-1]) > 0.02 * series.close[:-1])
+
+
+def test_volatility_regimes_change_return_dispersion() -> None:
+    calm = generate_history("X", START, END, config=SyntheticConfig(regimes=(0.005,)))
+    wild = generate_history("X", START, END, config=SyntheticConfig(regimes=(0.05,)))
+
+    assert np.std(np.diff(np.log(wild.close))) > 5 * np.std(np.diff(np.log(calm.close)))
+
+
+def test_weekends_and_missing_bars_are_removed() -> None:
+    config = SyntheticConfig(skip_weekends=True, missing_probability=0.1)
+    series = generate_history("SYN00002", START, END, config=config)
+
+    weekdays = {datetime.fromtimestamp(value, UTC).weekday() for value in series.timestamp}
+    assert weekdays <= {0, 1, 2, 3, 4}
+    assert len(series) < 500 * 5 / 7
+
+
+def test_config_and_interval_are_validated() -> None:
+    with pytest.raises(ValueError):
+        SyntheticConfig(regimes=())
+    with pytest.raises(ValueError):
+        SyntheticConfig(gap_probability=1.5)
+    with pytest.raises(ValueError):
+        generate_history("X", START, END, interval="1m")
+
+
+def test_universe_scales_to_many_tickers() -> None:
+    provider = SyntheticMarketDataProvider(universe_size=10_000)
+
+    assert provider.universe[:2] == ["SYN00000", "SYN00001"] and len(provider.universe) == 10_000
+    assert synthetic_tickers(3, prefix="T") == ["T00000", "T00001", "T00002"]
+    history = provider.get_history_batch(provider.universe[:2_000], start=END - timedelta(days=250), end=END)
+    assert len(history) == 2_000 and all(len(series) == 250 for series in history.values())
+    assert [item["ticker"] for item in provider.search_ticker("syn0000")][:2] == ["SYN00000", "SYN00001"]
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+from datetime import UTC, datetime
+
+from analysis_engine.engine.pipeline import AnalysisPipeline, PipelineConfig
+from analysis_engine.engine.scheduler import RecommendationScheduler, UniverseConfig
+from analysis_engine.engine.scoring import Recommendation, RecommendationScorer
+from analysis_engine.engine.updates import UpdateHub, diff_recommendations
+from data_integration.providers.base import Quote
+from data_integration.providers.local_sample import LocalSampleProvider
+
+
+class _Snapshot:
+    def __init__(self, version: int, scores: dict[str, tuple[float, str]]) -> None:
+        self.universe = "default"
+        self.interval = "1d"
+        self.version = version
+        self.recommendations = [Recommendation(t, score, signal, []) for t, (score, signal) in scores.items()]
+
+
+def test_diff_reports_changed_added_and_removed_tickers() -> None:
+    previous = {"AAPL": (70.0, "BUY"), "TSLA": (50.0, "ACCUMULATE"), "ERIC": (40.0, "HOLD")}
+    current = [
+        Recommendation("AAPL", 70.0, "BUY", []),
+        Recommendation("TSLA", 45.0, "HOLD", []),
+        Recommendation("VOLV", 60.0, "ACCUMULATE", []),
+    ]
+
+    deltas = {delta.ticker: delta for delta in diff_recommendations(previous, current)}
+
+    assert set(deltas) == {"TSLA", "VOLV", "ERIC"}
+    assert (deltas["TSLA"].previous_signal, deltas["TSLA"].signal) == ("ACCUMULATE", "HOLD")
+    assert deltas["VOLV"].previous_score is None
+    assert deltas["ERIC"].removed
+
+
+def test_subscriptions_filter_tickers_and_coalesce_for_slow_consumers() -> None:
+    hub = UpdateHub()
+    hub.publish(_Snapshot(1, {"AAPL": (70.0, "BUY"), "TSLA": (50.0, "ACCUMULATE")}))
+
+    async def consume():
+        subscription = hub.subscribe("default", "1d", ["AAPL"])
+        initial = hub.current(subscription)
+
+        # Published from another thread while the consumer is not reading.
+        def publish() -> None:
+            hub.publish(_Snapshot(2, {"AAPL": (60.0, "ACCUMULATE"), "TSLA": (20.0, "SELL")}))
+            hub.publish(_Snapshot(3, {"AAPL": (55.0, "ACCUMULATE"), "TSLA": (20.0, "SELL")}))
+            hub.publish(_Snapshot(4, {"AAPL": (55.0, "ACCUMULATE"), "TSLA": (90.0, "BUY")}))
+
+        thread = threading.Thread(target=publish)
+        thread.start()
+        thread.join()
+        batch = await subscription.next(timeout=1)
+        idle = await subscription.next(timeout=0.01)
+        subscription.close()
+        return initial, batch, idle, subscription.coalesced
+
+    initial, batch, idle, coalesced = asyncio.run(consume())
+
+    assert [(c.ticker, c.score) for c in initial.changes] == [("AAPL", 70.0)]
+    assert batch.version == 4
+    [change] = batch.changes
+    assert (change.ticker, change.previous_score, change.score) == ("AAPL", 70.0, 55.0)
+    assert idle is None
+    assert coalesced == 1
+    assert hub.stats()["subscriptions"] == 0
+
+
+def test_scheduler_reprices_with_quotes_and_notifies_listeners() -> None:
+    universe = UniverseConfig(name="us", tickers=("AAPL", "TSLA"), lookback_days=60)
+
+    def create(config: PipelineConfig) -> AnalysisPipeline:
+        return AnalysisPipeline(provider=LocalSampleProvider(), scorer=RecommendationScorer(), config=config)
+
+    scheduler = RecommendationScheduler([universe], pipeline_factory=create)
+    published = []
+    scheduler.add_listener(published.append)
+    first, = scheduler.refresh()
+    indicators = dict(first.pipeline._indicators)
+
+    # A price crash changes the ATR-to-price ratio but must not add a bar to the indicators.
+    now = datetime.now(UTC)
+    repriced, = scheduler.apply_quotes([Quote("AAPL", 1.0, "USD", now), Quote("NVDA", 1.0, "USD", now)])
+
+    assert [snapshot.version for snapshot in published] == [1, 2]
+    assert repriced.pipeline._indicators == indicators
+    scores = {r.ticker: r.score for r in repriced.recommendations}
+    before = {r.ticker: r.score for r in first.recommendations}
+    assert scores["AAPL"] != before["AAPL"]
+    assert scores["TSLA"] == before["TSLA"]
@@ -2,32 +2,243 @@
 
 from __future__ import annotations
 
-from typing import Protocol
+import asyncio
+import importlib.util
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Mapping, Protocol
 
 import httpx
+from prometheus_client import Counter, Histogram
+
+from .metrics import REGISTRY, parse_server_timing, profile_active, record
+
+DEFAULT_BASE_URL = "http://localhost:9000"
+# Svarshuvuden från analysmotorn som skickas vidare oförändrade till klienten.
+FORWARDED_HEADERS = ("content-type", "content-encoding", "vary", "etag", "cache-control")
+
+UPSTREAM_SECONDS = Histogram(
+    "analysis_engine_request_seconds",
+    "Tid till svarshuvuden från analysmotorn",
+    ("path", "status"),
+    registry=REGISTRY,
+)
+UPSTREAM_ERRORS = Counter(
+    "analysis_engine_errors_total", "Misslyckade anrop mot analysmotorn", ("path", "reason"), registry=REGISTRY
+)
+
+
+@dataclass
+class UpstreamResponse:
+    """Ett ännu inte läst svar från analysmotorn; kroppen strömmas som råa bytes."""
+
+    status_code: int
+    headers: dict[str, str]
+    body: AsyncIterator[bytes]
+    close: Callable[[], Awaitable[None]]
+    # Kroppens storlek i bytes enligt ``Content-Length``; ``None`` när analysmotorn inte angav den.
+    content_length: int | None = None
+
+    async def read(self) -> bytes:
+        try:
+            return b"".join([chunk async for chunk in self.body])
+        finally:
+            await self.close()
 
 
 class AnalysisClient(Protocol):
     """Gränssnitt för att hämta data från analysmotorn."""
 
-    def fetch_recommendations(self) -> list[dict]:
-        """Hämta aktuella rekommendationer."""
+    async def stream_recommendations(
+        self,
+        params: Mapping[str, Any] | None = None,
+        etag: str | None = None,
+        accept_encoding: str = "identity",
+    ) -> UpstreamResponse:
+        """Öppna ett strömmande anrop mot ``/recommendations`` (hela svaret inklusive paginering).
+
+        Med ``etag`` blir anropet villkorat och analysmotorn kan svara 304. Kroppen kommer
+        kodad enligt ``accept_encoding`` och skickas vidare utan avkodning.
+        """
+
+    async def stream_updates(self, params: Mapping[str, Any] | None = None) -> UpstreamResponse:
+        """Öppna analysmotorns Server-Sent Events-ström med ändrade rekommendationer."""
 
 
 class HttpAnalysisClient:
-    """HTTP-implementering mot analysmotorns REST-endpoints."""
+    """Asynkron HTTP-implementering mot analysmotorns REST-endpoints.
 
-    def __init__(self, base_url: str, timeout: float = 5.0) -> None:
+    En instans håller en keep-alive-pool mot analysmotorn och ska delas under hela
+    applikationens livstid; :meth:`aclose` anropas vid nedstängning.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 5.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
         self.base_url = base_url.rstrip("/")
-        self._client = httpx.Client(timeout=timeout)
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = importlib.util.find_spec("h2") is not None if http2 is None else http2
+        self._transport = transport
+        # En asynkron anslutningspool är knuten till den event loop den skapades i.
+        self._clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._requests = 0
+        self._connections_opened = 0
+        self._lock = threading.Lock()
+
+    async def stream_recommendations(  # type: ignore[override]
+        self,
+        params: Mapping[str, Any] | None = None,
+        etag: str | None = None,
+        accept_encoding: str = "identity",
+    ) -> UpstreamResponse:
+        headers = {"Accept-Encoding": accept_encoding}
+        if etag:
+            headers["If-None-Match"] = etag
+        return await self._stream("/recommendations", params, headers=headers)
 
-    def fetch_recommendations(self) -> list[dict]:  # type: ignore[override]
-        response = self._client.get(f"{self.base_url}/recommendations")
-        response.raise_for_status()
-        return response.json().get("results", [])
+    async def stream_updates(  # type: ignore[override]
+        self, params: Mapping[str, Any] | None = None
+    ) -> UpstreamResponse:
+        # Strömmen är långlivad: ingen läs-timeout, men anslutningen får fortfarande ta slut i tid.
+        timeout = httpx.Timeout(self.timeout, read=None)
+        headers = {"Accept-Encoding": "identity"}
+        return await self._stream("/recommendations/stream", params, headers=headers, timeout=timeout)
 
+    async def _stream(
+        self,
+        path: str,
+        params: Mapping[str, Any] | None,
+        headers: Mapping[str, str] | None = None,
+        timeout: httpx.Timeout | None = None,
+    ) -> UpstreamResponse:
+        query = {key: value for key, value in (params or {}).items() if value is not None}
+        profiled = profile_active()
+        if profiled:
+            # Analysmotorns egna stegtider hamnar i profilen med prefixet ``engine.``.
+            headers = {**(headers or {}), "X-Profile": "1"}
+        client = self._get_client()
+        request = client.build_request(
+            "GET",
+            f"{self.base_url}{path}",
+            params=query,
+            headers=headers,
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+        )
+        start = time.perf_counter()
+        try:
+            response = await client.send(request, stream=True)
+        except httpx.HTTPError as exc:
+            UPSTREAM_ERRORS.labels(path=path, reason=type(exc).__name__).inc()
+            raise
+        elapsed = time.perf_counter() - start
+        UPSTREAM_SECONDS.labels(path=path, status=response.status_code).observe(elapsed)
+        if response.status_code >= 500:
+            UPSTREAM_ERRORS.labels(path=path, reason=str(response.status_code)).inc()
+        if profiled:
+            record("upstream", elapsed)
+            for name, seconds in parse_server_timing(response.headers.get("server-timing")).items():
+                record(f"engine.{name}", seconds)
+        headers = {name: response.headers[name] for name in FORWARDED_HEADERS if name in response.headers}
+        # Råa bytes: eventuell komprimering från analysmotorn skickas vidare utan omkodning.
+        return UpstreamResponse(
+            status_code=response.status_code,
+            headers=headers,
+            body=response.aiter_raw(),
+            close=response.aclose,
+            content_length=_content_length(response.headers.get("content-length")),
+        )
 
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            open_clients = sum(1 for client in self._clients.values() if not client.is_closed)
+            return {
+                "requests": self._requests,
+                "connectionsOpened": self._connections_opened,
+                "reused": max(self._requests - self._connections_opened, 0),
+                "http2": self.http2,
+                "openClients": open_clients,
+                "closed": open_clients == 0,
+            }
+
+    async def aclose(self) -> None:
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            if not client.is_closed:
+                try:
+                    await client.aclose()
+                except RuntimeError:  # pragma: no cover - klient från en avslutad loop
+                    pass
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Klienten för den aktuella event loopen; en klient per loop, återanvänd mellan anrop."""
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    timeout=self.timeout,
+                    limits=self.limits,
+                    http2=self.http2,
+                    transport=self._transport,
+                    event_hooks={"request": [self._on_request]},
+                )
+                self._clients[loop] = client
+            return client
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        with self._lock:
+            self._requests += 1
+        request.extensions["trace"] = self._trace
+
+    async def _trace(self, event: str, _: dict[str, Any]) -> None:
+        if event == "connection.connect_tcp.complete":
+            with self._lock:
+                self._connections_opened += 1
+
+
+def _content_length(value: str | None) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=1)
 def get_analysis_client() -> HttpAnalysisClient:
-    """Dependency som kan overridas i tester."""
+    """Dependency som kan overridas i tester; en delad klient per process."""
+
+    http2 = os.environ.get("ANALYSIS_ENGINE_HTTP2", "auto").lower()
+    return HttpAnalysisClient(
+        base_url=os.environ.get("ANALYSIS_ENGINE_URL", DEFAULT_BASE_URL),
+        timeout=float(os.environ.get("ANALYSIS_ENGINE_TIMEOUT", 5.0)),
+        max_connections=int(os.environ.get("ANALYSIS_ENGINE_MAX_CONNECTIONS", 100)),
+        max_keepalive_connections=int(os.environ.get("ANALYSIS_ENGINE_MAX_KEEPALIVE", 20)),
+        http2=None if http2 == "auto" else http2 in {"1", "true", "yes"},
+    )
+
 
-    return HttpAnalysisClient(base_url="http://localhost:9000")
+async def close_analysis_client() -> None:
+    if get_analysis_client.cache_info().currsize:
+        await get_analysis_client().aclose()
+    get_analysis_client.cache_clear()
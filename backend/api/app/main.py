@@ -2,10 +2,25 @@
 
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 
+from . import metrics
+from .analysis_client import close_analysis_client, get_analysis_client
 from .routers import recommendations
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    try:
+        yield
+    finally:
+        await close_analysis_client()
+
+
 app = FastAPI(
     title="AktieTipset API",
     version="0.1.0",
@@ -13,7 +28,9 @@ app = FastAPI(
         "Backend-API för AktieTipset. Tillhandahåller marknadsdata, rekommendationer, "
         "portföljhantering och notifieringar."
     ),
+    lifespan=lifespan,
 )
+app.add_middleware(metrics.MetricsMiddleware)
 
 
 @app.get("/health", tags=["system"])
@@ -23,4 +40,18 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/http/stats", tags=["system"])
+def http_stats() -> dict[str, Any]:
+    """Anslutningsstatistik för klienten mot analysmotorn."""
+
+    return get_analysis_client().stats()
+
+
+@app.get("/metrics", tags=["system"], response_class=PlainTextResponse)
+def metrics_endpoint() -> PlainTextResponse:
+    """Mätvärden i Prometheus textformat: svarstider, anrop mot analysmotorn och cacheträffar."""
+
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 app.include_router(recommendations.router)
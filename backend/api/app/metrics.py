@@ -0,0 +1,119 @@
+"""Prometheus-mätvärden och opt-in-profilering för backend-API:t."""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, MutableMapping
+
+from prometheus_client import CollectorRegistry, Histogram, disable_created_metrics, generate_latest
+from starlette.datastructures import Headers, MutableHeaders
+
+PROFILE_HEADER = "x-profile"
+
+Message = MutableMapping[str, Any]
+ASGIApp = Callable[[MutableMapping[str, Any], Any, Any], Awaitable[None]]
+
+
+# Textformatet som ``generate_latest`` skriver.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+disable_created_metrics()
+
+REGISTRY = CollectorRegistry()
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Svarstid per route", ("method", "route", "status"), registry=REGISTRY
+)
+
+
+def render() -> bytes:
+    return generate_latest(REGISTRY)
+
+
+_profile: ContextVar[dict[str, float] | None] = ContextVar("profile", default=None)
+
+
+def record(name: str, seconds: float) -> None:
+    """Lägg till tid för ett steg i den aktuella förfrågans profil, om profilering är på."""
+
+    profile = _profile.get()
+    if profile is not None:
+        profile[name] = profile.get(name, 0.0) + seconds
+
+
+def profile_active() -> bool:
+    return _profile.get() is not None
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+@contextmanager
+def profiling() -> Iterator[dict[str, float]]:
+    profile: dict[str, float] = {}
+    token = _profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _profile.reset(token)
+
+
+def parse_server_timing(value: str | None) -> dict[str, float]:
+    """Tolka ett ``Server-Timing``-huvud till sekunder per steg."""
+
+    timings: dict[str, float] = {}
+    for item in (value or "").split(","):
+        name, _, parameters = item.strip().partition(";")
+        for parameter in parameters.split(";"):
+            key, _, duration = parameter.strip().partition("=")
+            if name and key == "dur":
+                try:
+                    timings[name] = float(duration) / 1000
+                except ValueError:
+                    pass
+    return timings
+
+
+class MetricsMiddleware:
+    """Svarstid per route; med ``X-Profile: 1`` returneras stegtider i ``Server-Timing``."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: MutableMapping[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        requested = Headers(scope=scope).get(PROFILE_HEADER, "").lower() in {"1", "true", "yes"}
+        start = time.perf_counter()
+        status = 500
+
+        with profiling() if requested else nullcontext() as profile:
+
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    if profile is not None:
+                        timings = {**profile, "total": time.perf_counter() - start}
+                        MutableHeaders(scope=message).append(
+                            "Server-Timing",
+                            ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items()),
+                        )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                route = getattr(scope.get("route"), "path", "unmatched")
+                REQUEST_SECONDS.labels(method=scope["method"], route=route, status=str(status)).observe(
+                    time.perf_counter() - start
+                )
@@ -0,0 +1,115 @@
+"""Kortlivad cache för rekommendationssvar som revalideras mot analysmotorn med ETag."""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Mapping
+
+DEFAULT_TTL = 5.0
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BODY = 256 * 1024
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+CacheKey = tuple[tuple[str, str], ...]
+
+
+@dataclass
+class CachedResponse:
+    etag: str
+    body: bytes
+    headers: dict[str, str]
+    stored_at: float
+    ttl: float
+
+
+class RecommendationCache:
+    """LRU-cache per fråga med svarskroppen som råa bytes.
+
+    En post är färsk i ``ttl`` sekunder (eller kortare om analysmotorns ``max-age`` är
+    lägre); därefter revalideras den med ``If-None-Match`` i stället för att hämtas om.
+    Bara kroppar på högst ``max_body`` bytes cachas; större svar strömmas förbi cachen.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_body: int = DEFAULT_MAX_BODY,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_body = max_body
+        self._clock = clock
+        self._entries: OrderedDict[CacheKey, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(params: Mapping[str, Any]) -> CacheKey:
+        return tuple(sorted((name, str(value)) for name, value in params.items() if value is not None))
+
+    def get(self, key: CacheKey) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def fits(self, size: int | None) -> bool:
+        """Om en kropp av ``size`` bytes får cachas; okänd storlek cachas inte."""
+
+        return size is not None and size <= self.max_body
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return self._clock() - entry.stored_at < entry.ttl
+
+    def store(self, key: CacheKey, etag: str, body: bytes, headers: Mapping[str, str]) -> CachedResponse:
+        entry = CachedResponse(
+            etag=etag,
+            body=body,
+            headers=dict(headers),
+            stored_at=self._clock(),
+            ttl=self._ttl_for(headers),
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def renew(self, key: CacheKey, entry: CachedResponse, headers: Mapping[str, str]) -> CachedResponse:
+        """Analysmotorn svarade 304: behåll kroppen och starta om färskhetstiden."""
+
+        merged = {**entry.headers, **{name: value for name, value in headers.items() if name != "content-type"}}
+        return self.store(key, entry.etag, entry.body, merged)
+
+    def _ttl_for(self, headers: Mapping[str, str]) -> float:
+        cache_control = headers.get("cache-control", "")
+        if "no-cache" in cache_control or "no-store" in cache_control:
+            return 0.0
+        match = _MAX_AGE.search(cache_control)
+        return min(self.ttl, float(match.group(1))) if match else self.ttl
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {item.strip().removeprefix("W/") for item in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+@lru_cache(maxsize=1)
+def get_recommendation_cache() -> RecommendationCache:
+    """Dependency; styrs med ``RECOMMENDATION_CACHE_TTL`` och ``RECOMMENDATION_CACHE_MAX_BODY``."""
+
+    return RecommendationCache(
+        ttl=float(os.environ.get("RECOMMENDATION_CACHE_TTL", DEFAULT_TTL)),
+        max_body=int(os.environ.get("RECOMMENDATION_CACHE_MAX_BODY", DEFAULT_MAX_BODY)),
+    )
@@ -4,18 +4,145 @@ from __future__ import annotations
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+import httpx
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from prometheus_client import Counter
+from starlette.background import BackgroundTask
 
 from ..analysis_client import AnalysisClient, get_analysis_client
+from ..metrics import REGISTRY, stage
+from ..recommendation_cache import CachedResponse, RecommendationCache, etag_matches, get_recommendation_cache
 
 router = APIRouter(prefix="/recommendations", tags=["recommendations"])
 
+CACHE_LOOKUPS = Counter(
+    "recommendation_cache_lookups_total", "Uppslag i rekommendationscachen", ("result",), registry=REGISTRY
+)
+
 
 @router.get("/", summary="Hämta rekommendationer")
-def list_recommendations(
+async def list_recommendations(
+    client: Annotated[AnalysisClient, Depends(get_analysis_client)],
+    cache: Annotated[RecommendationCache, Depends(get_recommendation_cache)],
+    tickers: Annotated[str | None, Query(description="Kommaseparerad lista av tickers")] = None,
+    lookback_days: Annotated[int | None, Query(ge=5, le=365, description="Antal dagar att analysera")] = None,
+    interval: Annotated[str | None, Query(pattern="^(1d|1h|1w)$", description="Aggregeringsintervall")] = None,
+    limit: Annotated[int | None, Query(ge=1, le=1000, description="Max antal resultat")] = None,
+    offset: Annotated[int, Query(ge=0, description="Antal resultat att hoppa över")] = 0,
+    min_score: Annotated[float | None, Query(ge=0, le=100, description="Lägsta score")] = None,
+    signal: Annotated[str | None, Query(description="Kommaseparerade signaler")] = None,
+    cursor: Annotated[str | None, Query(description="Cursor från föregående sida")] = None,
+    payload_format: Annotated[
+        str | None, Query(alias="format", pattern="^(objects|columnar)$", description="objects eller columnar")
+    ] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+    accept_encoding: Annotated[str | None, Header()] = None,
+) -> Response:
+    """Returnera en rankad sida rekommendationer från analysmotorn.
+
+    Små svar med ETag cachas kort per fråga och revalideras mot analysmotorn med
+    ``If-None-Match``; klienter som skickar samma ETag får 304. Svar större än cachens
+    ``max_body`` (eller utan ``Content-Length``) strömmas vidare byte för byte utan att
+    JSON-kroppen läses in. Accepterar klienten gzip
+    (``q`` > 0) begärs gzip från analysmotorn och de komprimerade bytena skickas vidare
+    som de är; annars begärs ett okomprimerat svar.
+    """
+
+    params = {
+        "tickers": tickers,
+        "lookback_days": lookback_days,
+        "interval": interval,
+        "limit": limit,
+        "offset": offset,
+        "min_score": min_score,
+        "signal": signal,
+        "cursor": cursor,
+        "format": payload_format,
+    }
+    encoding = "gzip" if _accepts_gzip(accept_encoding) else "identity"
+    key = cache.key({**params, "encoding": encoding})
+    cached = cache.get(key)
+    if cached is not None and cache.is_fresh(cached):
+        CACHE_LOOKUPS.labels(result="hit").inc()
+        return _from_cache(cached, if_none_match)
+    CACHE_LOOKUPS.labels(result="stale" if cached is not None else "miss").inc()
+
+    try:
+        upstream = await client.stream_recommendations(
+            params, etag=cached.etag if cached else None, accept_encoding=encoding
+        )
+    except httpx.HTTPError as exc:
+        raise HTTPException(status_code=502, detail="Analysmotorn kunde inte nås") from exc
+    if upstream.status_code >= 500:
+        await upstream.close()
+        raise HTTPException(status_code=502, detail="Analysmotorn svarade med ett fel")
+    if upstream.status_code == 304 and cached is not None:
+        await upstream.close()
+        CACHE_LOOKUPS.labels(result="revalidated").inc()
+        return _from_cache(cache.renew(key, cached, upstream.headers), if_none_match)
+    etag = upstream.headers.get("etag")
+    if upstream.status_code == 200 and etag and cache.fits(upstream.content_length):
+        with stage("read"):
+            body = await upstream.read()
+        return _from_cache(cache.store(key, etag, body, upstream.headers), if_none_match)
+    return StreamingResponse(
+        upstream.body,
+        status_code=upstream.status_code,
+        headers=upstream.headers,
+        background=BackgroundTask(upstream.close),
+    )
+
+
+@router.get("/stream", summary="Prenumerera på ändrade rekommendationer")
+async def stream_recommendations(
     client: Annotated[AnalysisClient, Depends(get_analysis_client)],
-) -> dict[str, list[dict]]:
-    """Returnera aktuella rekommendationer från analysmotorn."""
+    tickers: Annotated[str | None, Query(description="Kommaseparerade tickers (alla om tomt)")] = None,
+    interval: Annotated[str | None, Query(pattern="^(1d|1h|1w)$", description="Aggregeringsintervall")] = None,
+    universe: Annotated[str | None, Query(description="Schemalagt universum")] = None,
+) -> StreamingResponse:
+    """Server-Sent Events från analysmotorn: ett ``snapshot``-event och sedan ``delta``-event.
+
+    Eventen skickas vidare oförändrade; mottryck och sammanslagning sköts av analysmotorn
+    per anslutning.
+    """
+
+    try:
+        upstream = await client.stream_updates({"tickers": tickers, "interval": interval, "universe": universe})
+    except httpx.HTTPError as exc:
+        raise HTTPException(status_code=502, detail="Analysmotorn kunde inte nås") from exc
+    if upstream.status_code != 200:
+        await upstream.close()
+        raise HTTPException(status_code=502, detail="Analysmotorn svarade med ett fel")
+    return StreamingResponse(
+        upstream.body,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(upstream.close),
+    )
+
+
+def _accepts_gzip(accept_encoding: str | None) -> bool:
+    """Om ``Accept-Encoding`` tillåter gzip; ``gzip;q=0`` avböjer och ``*`` gäller när gzip saknas."""
+
+    weights: dict[str, float] = {}
+    for item in (accept_encoding or "").split(","):
+        coding, *parameters = (part.strip() for part in item.split(";"))
+        weight = 1.0
+        for parameter in parameters:
+            name, _, value = parameter.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            weights[coding.lower()] = weight
+    return weights.get("gzip", weights.get("x-gzip", weights.get("*", 0.0))) > 0
+
 
-    recommendations = client.fetch_recommendations()
-    return {"results": recommendations}
+def _from_cache(entry: CachedResponse, if_none_match: str | None) -> Response:
+    if etag_matches(if_none_match, entry.etag):
+        headers = {name: value for name, value in entry.headers.items() if name in {"etag", "cache-control"}}
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, headers=entry.headers)
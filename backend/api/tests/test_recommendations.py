@@ -0,0 +1,259 @@
+import asyncio
+from typing import Any, AsyncIterator, Mapping
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.analysis_client import HttpAnalysisClient, UpstreamResponse, get_analysis_client
+from app.main import app
+from app.recommendation_cache import RecommendationCache, get_recommendation_cache
+
+BODY = b'{"total": 3,  "nextCursor": "abc", "results": [{"ticker": "AAPL", "score": 80.0, "signal": "BUY"}]}'
+
+
+async def _chunks(*chunks: bytes) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+class FakeAnalysisClient:
+    def __init__(self, status_code: int = 200, etag: str | None = None) -> None:
+        self.params: list[dict[str, Any]] = []
+        self.conditional: list[str | None] = []
+        self.encodings: list[str] = []
+        self.closed = 0
+        self.status_code = status_code
+        self.etag = etag
+
+    async def stream_recommendations(
+        self,
+        params: Mapping[str, Any] | None = None,
+        etag: str | None = None,
+        accept_encoding: str = "identity",
+    ) -> UpstreamResponse:
+        self.params.append(dict(params or {}))
+        self.encodings.append(accept_encoding)
+        self.conditional.append(etag)
+
+        async def close() -> None:
+            self.closed += 1
+
+        headers = {"content-type": "application/json"}
+        if self.etag:
+            headers.update({"etag": self.etag, "cache-control": "no-cache"})
+        unchanged = etag is not None and etag == self.etag
+        return UpstreamResponse(
+            status_code=304 if unchanged else self.status_code,
+            headers=headers,
+            body=_chunks() if unchanged else _chunks(BODY[:10], BODY[10:]),
+            close=close,
+            content_length=0 if unchanged else len(BODY),
+        )
+
+    async def stream_updates(self, params: Mapping[str, Any] | None = None) -> UpstreamResponse:
+        self.params.append(dict(params or {}))
+
+        async def close() -> None:
+            self.closed += 1
+
+        return UpstreamResponse(
+            status_code=self.status_code,
+            headers={"content-type": "text/event-stream"},
+            body=_chunks(b"event: snapshot\ndata: {}\n\n", b"event: delta\ndata: {}\n\n"),
+            close=close,
+        )
+
+
+def _get(
+    client: Any,
+    params: dict[str, Any],
+    headers: dict[str, str] | None = None,
+    cache: RecommendationCache | None = None,
+) -> httpx.Response:
+    app.dependency_overrides[get_analysis_client] = lambda: client
+    app.dependency_overrides[get_recommendation_cache] = lambda: cache or RecommendationCache()
+    try:
+        return TestClient(app).get("/recommendations/", params=params, headers=headers)
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_list_recommendations_forwards_parameters_and_streams_body_verbatim() -> None:
+    fake = FakeAnalysisClient()
+
+    response = _get(fake, {"limit": 1, "signal": "BUY", "tickers": "AAPL,TSLA", "interval": "1h"})
+
+    assert response.status_code == 200
+    assert response.content == BODY
+    assert response.headers["content-type"] == "application/json"
+    assert fake.params == [
+        {
+            "tickers": "AAPL,TSLA",
+            "lookback_days": None,
+            "interval": "1h",
+            "limit": 1,
+            "offset": 0,
+            "min_score": None,
+            "signal": "BUY",
+            "cursor": None,
+            "format": None,
+        }
+    ]
+    assert fake.closed == 1
+
+
+def test_upstream_server_errors_become_bad_gateway() -> None:
+    fake = FakeAnalysisClient(status_code=503)
+
+    response = _get(fake, {})
+
+    assert response.status_code == 502
+    assert fake.closed == 1
+
+
+def test_responses_with_etag_are_cached_and_revalidated() -> None:
+    now = [0.0]
+    cache = RecommendationCache(ttl=5.0, clock=lambda: now[0])
+    fake = FakeAnalysisClient(etag='"v1"')
+    fake_fresh = FakeAnalysisClient(etag='"v1"')
+
+    first = _get(fake, {"limit": 2}, cache=cache)
+    assert first.status_code == 200 and first.content == BODY
+    assert first.headers["etag"] == '"v1"'
+
+    # no-cache from the engine: every poll revalidates, and an unchanged ETag costs a 304.
+    again = _get(fake, {"limit": 2}, headers={"If-None-Match": '"v1"'}, cache=cache)
+    assert again.status_code == 304 and again.content == b""
+    assert fake.conditional == [None, '"v1"']
+
+    cache.store(cache.key({"limit": 3, "offset": 0, "encoding": "identity"}), '"v2"', b"{}", {"cache-control": "public, max-age=60"})
+    identity = {"Accept-Encoding": "identity"}
+    hit = _get(fake_fresh, {"limit": 3}, headers=identity, cache=cache)
+    assert hit.content == b"{}"
+    assert fake_fresh.params == []
+
+    now[0] = 10.0
+    _get(fake_fresh, {"limit": 3}, headers=identity, cache=cache)
+    assert fake_fresh.conditional == ['"v2"']
+    assert fake_fresh.encodings == ["identity"]
+    assert fake.encodings == ["gzip", "gzip"]
+
+
+def test_bodies_above_the_size_limit_are_streamed_past_the_cache() -> None:
+    cache = RecommendationCache(max_body=len(BODY) - 1)
+    fake = FakeAnalysisClient(etag='"v1"')
+
+    first = _get(fake, {"limit": 2}, cache=cache)
+    second = _get(fake, {"limit": 2}, cache=cache)
+
+    assert first.content == second.content == BODY
+    assert first.headers["etag"] == '"v1"'
+    assert fake.conditional == [None, None]
+    assert fake.closed == 2
+    assert not cache.fits(None)
+
+
+def test_gzip_is_only_requested_when_the_client_accepts_it() -> None:
+    fake = FakeAnalysisClient()
+
+    for header in ("gzip;q=0", "br, gzip;q=0.0", "identity", "*;q=0", "deflate, GZIP;q=0.5", "*"):
+        _get(fake, {}, headers={"Accept-Encoding": header})
+
+    assert fake.encodings == ["identity", "identity", "identity", "identity", "gzip", "gzip"]
+
+
+def test_update_stream_is_proxied_event_for_event() -> None:
+    fake = FakeAnalysisClient()
+    app.dependency_overrides[get_analysis_client] = lambda: fake
+    try:
+        params = {"tickers": "AAPL", "universe": "nordic"}
+        with TestClient(app).stream("GET", "/recommendations/stream", params=params) as response:
+            body = response.read()
+            content_type = response.headers["content-type"]
+    finally:
+        app.dependency_overrides.clear()
+
+    assert content_type.startswith("text/event-stream")
+    assert body == b"event: snapshot\ndata: {}\n\nevent: delta\ndata: {}\n\n"
+    assert fake.params == [{"tickers": "AAPL", "interval": None, "universe": "nordic"}]
+    assert fake.closed == 1
+
+
+def test_http_analysis_client_streams_raw_bytes_over_one_pooled_client() -> None:
+    requests: list[httpx.Request] = []
+
+    class StreamingTransport(httpx.AsyncBaseTransport):
+        # MockTransport reads the body up front, so it cannot exercise streaming.
+        async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, stream=httpx.ByteStream(BODY), headers={"content-type": "application/json"})
+
+    client = HttpAnalysisClient("http://engine", transport=StreamingTransport())
+
+    async def run() -> list[bytes]:
+        first = await client.stream_recommendations({"limit": 5, "cursor": None, "tickers": "AAPL"})
+        second = await client.stream_recommendations()
+        bodies = [await first.read(), await second.read()]
+        await client.aclose()
+        return bodies
+
+    assert asyncio.run(run()) == [BODY, BODY]
+    assert [str(request.url) for request in requests] == [
+        "http://engine/recommendations?limit=5&tickers=AAPL",
+        "http://engine/recommendations",
+    ]
+    assert client.stats()["requests"] == 2
+    assert client.stats()["closed"] is True
+
+
+def test_profiling_header_merges_engine_timings_and_metrics_are_exposed() -> None:
+    seen: list[httpx.Request] = []
+
+    class ProfilingEngine(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            headers = {"content-type": "application/json", "etag": '"p1"', "cache-control": "no-cache"}
+            headers["content-length"] = str(len(BODY))
+            if request.headers.get("x-profile") == "1":
+                headers["server-timing"] = "scoring;dur=12.50, total;dur=20.00"
+            return httpx.Response(200, stream=httpx.ByteStream(BODY), headers=headers)
+
+    engine = HttpAnalysisClient("http://engine", transport=ProfilingEngine())
+    profiled = _get(engine, {"limit": 7}, headers={"X-Profile": "1"})
+    plain = _get(engine, {"limit": 8})
+
+    timings = dict(item.strip().split(";dur=") for item in profiled.headers["server-timing"].split(","))
+    assert float(timings["engine.scoring"]) == 12.5
+    assert {"upstream", "read", "engine.total", "total"} <= set(timings)
+    assert "server-timing" not in plain.headers
+    assert [request.headers.get("x-profile") for request in seen] == ["1", None]
+
+    body = TestClient(app).get("/metrics").text
+    assert 'analysis_engine_request_seconds_count{path="/recommendations",status="200"}' in body
+    assert 'recommendation_cache_lookups_total{result="miss"}' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/recommendations/",status="200"}' in body
+
+
+def test_http_analysis_client_keeps_one_client_per_event_loop() -> None:
+    client = HttpAnalysisClient("http://engine", transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+
+    async def clients() -> tuple[httpx.AsyncClient, httpx.AsyncClient]:
+        return client._get_client(), client._get_client()
+
+    loops = [asyncio.new_event_loop(), asyncio.new_event_loop()]
+    try:
+        first, again = loops[0].run_until_complete(clients())
+        second, _ = loops[1].run_until_complete(clients())
+        assert first is again and first is not second
+        assert client.stats()["openClients"] == 2
+
+        loops[1].run_until_complete(client.aclose())
+    finally:
+        for loop in loops:
+            loop.close()
+    assert first.is_closed and second.is_closed
+    assert client.stats()["closed"] is True
@@ -1,11 +1,17 @@
 """Dataintegrationsmodul för AktieTipset."""
 
 from .providers.base import Fundamental, MarketDataProvider, Quote
+from .providers.cached import CachedMarketDataProvider, CandleStore
+from .providers.candles import CandleSeries, as_candle_series
 from .providers.local_sample import LocalSampleProvider
 
 __all__ = [
     "MarketDataProvider",
     "Quote",
     "Fundamental",
+    "CandleSeries",
+    "as_candle_series",
     "LocalSampleProvider",
+    "CachedMarketDataProvider",
+    "CandleStore",
 ]
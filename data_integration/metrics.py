@@ -0,0 +1,62 @@
+"""Prometheus-mätvärden (via ``prometheus_client``) och tidsmätning per pipelinesteg."""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Mapping
+
+from prometheus_client import CollectorRegistry, Histogram, disable_created_metrics, generate_latest
+
+# Textformatet som ``generate_latest`` skriver.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ``*_created``-serierna används inte och dubblerar bara antalet tidsserier.
+disable_created_metrics()
+
+REGISTRY = CollectorRegistry()
+
+STAGE_SECONDS = Histogram("pipeline_stage_seconds", "Tid per steg i analysflödet", ("stage",), registry=REGISTRY)
+
+_profile: ContextVar[dict[str, float] | None] = ContextVar("profile", default=None)
+_profile_lock = threading.Lock()
+
+
+def render() -> bytes:
+    return generate_latest(REGISTRY)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Mät ett steg i histogrammet och, om profilering är på, i den aktuella förfrågans profil."""
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(stage=name).observe(elapsed)
+        profile = _profile.get()
+        if profile is not None:
+            with _profile_lock:
+                profile[name] = profile.get(name, 0.0) + elapsed
+
+
+@contextmanager
+def profiling() -> Iterator[dict[str, float]]:
+    """Samla sekunder per steg för allt som körs i den här kontexten (även i trådar via ``to_thread``)."""
+
+    profile: dict[str, float] = {}
+    token = _profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _profile.reset(token)
+
+
+def server_timing(profile: Mapping[str, float]) -> str:
+    """Profilen som ``Server-Timing``-huvud (millisekunder)."""
+
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in profile.items())
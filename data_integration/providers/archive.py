@@ -0,0 +1,235 @@
+"""Minnesmappat arkiv med historiska candles för långa backtester och screening."""
+
+from __future__ import annotations
+
+import json
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Mapping, Sequence
+
+import numpy as np
+
+from .base import MarketDataProvider, fetch_history_batch
+from .candles import CandleSeries, as_candle_series
+
+ARCHIVE_VERSION = 2
+INDEX_FILE = "index.json"
+COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+# Fast bredd: varje värde är en little-endian float64, så rad ``n`` ligger på byte ``8 * n``.
+COLUMN_DTYPE = np.dtype("<f8")
+DEFAULT_IMPORT_CHUNK = 100
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    """En tickers segment i kolumnfilerna: rader ``[offset, offset + length)``."""
+
+    offset: int
+    length: int
+    first: float
+    last: float
+
+
+class ArchiveWriter:
+    """Skriver ett arkiv: en binär kolumnfil per fält där varje ticker är ett sammanhängande segment.
+
+    Varje skrivning får en egen generation (``<fält>.<generation>.f8``) som indexet pekar
+    ut. Bytet sker i ett enda atomiskt ``os.replace`` av indexet, så en läsare ser alltid
+    antingen det gamla eller det nya arkivet och aldrig en blandning. Föregående
+    generation behålls så att läsare som just läst det gamla indexet kan mappa dess
+    filer; äldre generationer tas bort.
+    """
+
+    def __init__(self, path: str | Path, interval: str = "1d") -> None:
+        self.path = Path(path)
+        self.interval = interval
+        self.generation = uuid.uuid4().hex[:12]
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._files = {name: open(self.path / self._file_name(name), "wb") for name in COLUMNS}
+        self._entries: dict[str, ArchiveEntry] = {}
+        self._rows = 0
+
+    def __enter__(self) -> ArchiveWriter:
+        return self
+
+    def __exit__(self, exc_type: Any, *_: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def add(self, ticker: str, candles: CandleSeries | Sequence[dict[str, Any]]) -> ArchiveEntry:
+        key = ticker.upper()
+        if key in self._entries:
+            raise ValueError(f"{key} finns redan i arkivet")
+        series = as_candle_series(candles)
+        for name in COLUMNS:
+            getattr(series, name).astype(COLUMN_DTYPE, copy=False).tofile(self._files[name])
+        length = len(series)
+        entry = ArchiveEntry(
+            offset=self._rows,
+            length=length,
+            first=float(series.timestamp[0]) if length else 0.0,
+            last=float(series.timestamp[-1]) if length else 0.0,
+        )
+        self._entries[key] = entry
+        self._rows += length
+        return entry
+
+    def close(self) -> None:
+        for handle in self._files.values():
+            handle.flush()
+            os.fsync(handle.fileno())
+            handle.close()
+        previous = _index_generation(self.path)
+        index = {
+            "version": ARCHIVE_VERSION,
+            "interval": self.interval,
+            "dtype": COLUMN_DTYPE.str,
+            "rows": self._rows,
+            "files": {name: self._file_name(name) for name in COLUMNS},
+            "tickers": {
+                ticker: [entry.offset, entry.length, entry.first, entry.last]
+                for ticker, entry in self._entries.items()
+            },
+        }
+        temporary = self.path / f"{INDEX_FILE}.{self.generation}.tmp"
+        temporary.write_text(json.dumps(index))
+        os.replace(temporary, self.path / INDEX_FILE)
+        _remove_generations(self.path, keep={self.generation, previous})
+
+    def abort(self) -> None:
+        for name, handle in self._files.items():
+            handle.close()
+            (self.path / self._file_name(name)).unlink(missing_ok=True)
+
+    def _file_name(self, name: str) -> str:
+        return f"{name}.{self.generation}.f8"
+
+
+class MarketDataArchive:
+    """Läser ett arkiv via ``np.memmap``; serier är nollkopierande vyer mot filerna.
+
+    Att öppna arkivet läser bara indexet. Sidor laddas in av operativsystemet först när
+    en serie används och kan släppas igen, så residentminnet beror på vad som läses och
+    inte på arkivets storlek.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        index = json.loads((self.path / INDEX_FILE).read_text())
+        if index.get("version") != ARCHIVE_VERSION or index.get("dtype") != COLUMN_DTYPE.str:
+            raise ValueError(f"Okänt arkivformat i {self.path}")
+        self.interval: str = index["interval"]
+        self.rows: int = index["rows"]
+        self.entries = {ticker: ArchiveEntry(*values) for ticker, values in index["tickers"].items()}
+        self._columns = {name: self._map(index["files"][name]) for name in COLUMNS}
+
+    def __contains__(self, ticker: object) -> bool:
+        return isinstance(ticker, str) and ticker.upper() in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.entries)
+
+    @property
+    def tickers(self) -> list[str]:
+        return list(self.entries)
+
+    def series(self, ticker: str, start: datetime | None = None, end: datetime | None = None) -> CandleSeries:
+        """Staplar för ``ticker`` inom ``[start, end]``, sökta binärt i tidsstämpelkolumnen."""
+
+        entry = self.entries[ticker.upper()]
+        lower, upper = entry.offset, entry.offset + entry.length
+        timestamps = self._columns["timestamp"][lower:upper]
+        first = int(np.searchsorted(timestamps, start.timestamp(), side="left")) if start else 0
+        last = int(np.searchsorted(timestamps, end.timestamp(), side="right")) if end else entry.length
+        return CandleSeries(*(self._columns[name][lower + first : lower + last] for name in COLUMNS))
+
+    def history(
+        self,
+        tickers: Iterable[str] | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> dict[str, CandleSeries]:
+        """Serier för flera tickers (standard: alla); okända tickers ger tomma serier."""
+
+        selected = self.tickers if tickers is None else list(dict.fromkeys(tickers))
+        return {
+            ticker: self.series(ticker, start, end) if ticker in self else CandleSeries.empty()
+            for ticker in selected
+        }
+
+    def close(self) -> None:
+        """Släpp mappningarna; vyer som fortfarande används håller sina filer öppna."""
+
+        self._columns = {name: np.empty(0, dtype=COLUMN_DTYPE) for name in COLUMNS}
+
+    def _map(self, file_name: str) -> np.ndarray:
+        path = self.path / file_name
+        if self.rows == 0:
+            return np.empty(0, dtype=COLUMN_DTYPE)
+        return np.memmap(path, dtype=COLUMN_DTYPE, mode="r", shape=(self.rows,))
+
+
+def _index_generation(path: Path) -> str | None:
+    try:
+        files = json.loads((path / INDEX_FILE).read_text()).get("files", {})
+    except (OSError, ValueError):
+        return None
+    return _generation(files.get("close", ""))
+
+
+def _generation(file_name: str) -> str | None:
+    parts = file_name.split(".")
+    return parts[1] if len(parts) == 3 and parts[0] in COLUMNS and parts[2] == "f8" else None
+
+
+def _remove_generations(path: Path, keep: set[str | None]) -> None:
+    for candidate in path.glob("*.f8"):
+        generation = _generation(candidate.name)
+        if generation is not None and generation not in keep:
+            candidate.unlink(missing_ok=True)
+
+
+def write_archive(
+    path: str | Path,
+    history: Mapping[str, CandleSeries | Sequence[dict[str, Any]]],
+    interval: str = "1d",
+) -> MarketDataArchive:
+    with ArchiveWriter(path, interval=interval) as writer:
+        for ticker, series in history.items():
+            writer.add(ticker, series)
+    return MarketDataArchive(path)
+
+
+def import_history(
+    provider: MarketDataProvider,
+    tickers: Iterable[str],
+    path: str | Path,
+    start: datetime,
+    end: datetime,
+    interval: str = "1d",
+    chunk_size: int = DEFAULT_IMPORT_CHUNK,
+) -> MarketDataArchive:
+    """Hämta historik från en leverantör och skriv den till ett arkiv.
+
+    Tickers hämtas ``chunk_size`` åt gången via batchvägen och skrivs direkt till disk,
+    så importen håller bara en klump i minnet oavsett universumets storlek.
+    """
+
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    unique = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+    with ArchiveWriter(path, interval=interval) as writer:
+        for index in range(0, len(unique), chunk_size):
+            chunk = unique[index : index + chunk_size]
+            fetched = fetch_history_batch(provider, chunk, start=start, end=end, interval=interval)
+            for ticker in chunk:
+                writer.add(ticker, fetched[ticker])
+    return MarketDataArchive(path)
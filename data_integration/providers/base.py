@@ -3,10 +3,15 @@
 from __future__ import annotations
 
 import abc
+import asyncio
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Iterable, Protocol
 
+from .candles import CandleSeries
+
+DEFAULT_HISTORY_CONCURRENCY = 8
+
 
 @dataclass
 class Quote:
@@ -37,8 +42,17 @@ class MarketDataProvider(Protocol):
         start: datetime,
         end: datetime,
         interval: str = "1d",
-    ) -> list[dict]:
-        """Returnera historisk OHLC-data."""
+    ) -> CandleSeries:
+        """Returnera historisk OHLC-data som kolumnbaserad serie."""
+
+    def get_history_batch(
+        self,
+        tickers: Iterable[str],
+        start: datetime,
+        end: datetime,
+        interval: str = "1d",
+    ) -> dict[str, CandleSeries]:
+        """Returnera historik för flera tickers, helst med få anrop mot källan."""
 
     def get_fundamentals(self, tickers: Iterable[str]) -> list[Fundamental]:
         """Returnera fundamentala nyckeltal."""
@@ -50,6 +64,8 @@ class MarketDataProvider(Protocol):
 class AbstractMarketDataProvider(abc.ABC):
     """Bas-klass som implementeringar kan ärva."""
 
+    max_concurrency: int = DEFAULT_HISTORY_CONCURRENCY
+
     @abc.abstractmethod
     def get_quotes(self, tickers: Iterable[str]) -> list[Quote]:
         raise NotImplementedError
@@ -61,9 +77,26 @@ class AbstractMarketDataProvider(abc.ABC):
         start: datetime,
         end: datetime,
         interval: str = "1d",
-    ) -> list[dict]:
+    ) -> CandleSeries:
         raise NotImplementedError
 
+    def get_history_batch(
+        self,
+        tickers: Iterable[str],
+        start: datetime,
+        end: datetime,
+        interval: str = "1d",
+    ) -> dict[str, CandleSeries]:
+        """Historik för flera tickers; standard är ett ``get_history``-anrop per ticker.
+
+        Leverantörer med ett flersymbols-endpoint överlagrar och hämtar i klumpar.
+        """
+
+        return {
+            ticker: self.get_history(ticker, start=start, end=end, interval=interval)
+            for ticker in dict.fromkeys(tickers)
+        }
+
     @abc.abstractmethod
     def get_fundamentals(self, tickers: Iterable[str]) -> list[Fundamental]:
         raise NotImplementedError
@@ -71,3 +104,82 @@ class AbstractMarketDataProvider(abc.ABC):
     @abc.abstractmethod
     def search_ticker(self, query: str) -> list[dict]:
         raise NotImplementedError
+
+    async def get_history_many(
+        self,
+        tickers: Iterable[str],
+        start: datetime,
+        end: datetime,
+        interval: str = "1d",
+    ) -> dict[str, CandleSeries]:
+        """Hämta historik för flera tickers parallellt (standard: trådar runt ``get_history``).
+
+        En leverantör som överlagrar :meth:`get_history_batch` använder i stället batchvägen.
+        """
+
+        if type(self).get_history_batch is not AbstractMarketDataProvider.get_history_batch:
+            return await asyncio.to_thread(self.get_history_batch, list(tickers), start, end, interval)
+        return await fetch_history_concurrently(
+            self, tickers, start, end, interval, concurrency=self.max_concurrency
+        )
+
+
+async def fetch_history_concurrently(
+    provider: MarketDataProvider,
+    tickers: Iterable[str],
+    start: datetime,
+    end: datetime,
+    interval: str = "1d",
+    concurrency: int = DEFAULT_HISTORY_CONCURRENCY,
+) -> dict[str, CandleSeries]:
+    """Kör en synkron ``get_history`` i trådar med högst ``concurrency`` samtidiga anrop."""
+
+    if concurrency <= 0:
+        raise ValueError("concurrency must be positive")
+    semaphore = asyncio.Semaphore(concurrency)
+    unique = list(dict.fromkeys(tickers))
+
+    async def fetch(ticker: str) -> CandleSeries:
+        async with semaphore:
+            return await asyncio.to_thread(provider.get_history, ticker, start, end, interval)
+
+    results = await asyncio.gather(*(fetch(ticker) for ticker in unique))
+    return dict(zip(unique, results))
+
+
+def fetch_history_batch(
+    provider: MarketDataProvider,
+    tickers: Iterable[str],
+    start: datetime,
+    end: datetime,
+    interval: str = "1d",
+) -> dict[str, CandleSeries]:
+    """``get_history_batch`` om leverantören har den, annars en loop över ``get_history``."""
+
+    get_history_batch = getattr(provider, "get_history_batch", None)
+    if get_history_batch is not None:
+        return get_history_batch(tickers, start=start, end=end, interval=interval)
+    return {
+        ticker: provider.get_history(ticker, start=start, end=end, interval=interval)
+        for ticker in dict.fromkeys(tickers)
+    }
+
+
+def chunk_symbols(symbols: Iterable[str], max_symbols: int, max_length: int | None = None) -> list[list[str]]:
+    """Dela upp symboler i klumpar om högst ``max_symbols`` och ``max_length`` tecken kommaseparerat."""
+
+    if max_symbols <= 0:
+        raise ValueError("max_symbols must be positive")
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    length = 0
+    for symbol in dict.fromkeys(symbols):
+        added = len(symbol) + (1 if current else 0)
+        if current and (len(current) >= max_symbols or (max_length is not None and length + added > max_length)):
+            chunks.append(current)
+            current, length, added = [], 0, len(symbol)
+        current.append(symbol)
+        length += added
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,259 @@
+"""Lokal SQLite-cache för historiska candles med gap-medveten hämtning."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Iterable
+
+import numpy as np
+
+from .base import AbstractMarketDataProvider, Fundamental, MarketDataProvider, Quote, fetch_history_batch
+from .candles import CandleSeries, as_candle_series
+
+INTERVAL_STEPS = {"1h": timedelta(hours=1), "1d": timedelta(days=1)}
+# Hur länge en hämtad, ännu inte stängd stapel räknas som färsk.
+DEFAULT_FORMING_TTL = timedelta(minutes=1)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    ticker TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    ts REAL NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    volume REAL NOT NULL,
+    PRIMARY KEY (ticker, interval, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    ticker TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS coverage_key ON coverage (ticker, interval);
+"""
+
+
+class CandleStore:
+    """Persistent lagring av candles per (ticker, intervall) och vilka tidsintervall som hämtats."""
+
+    def __init__(self, path: str | Path = ":memory:") -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def coverage(self, ticker: str, interval: str) -> list[tuple[float, float]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT start, end FROM coverage WHERE ticker = ? AND interval = ? ORDER BY start",
+                (ticker, interval),
+            ).fetchall()
+        return [(float(start), float(end)) for start, end in rows]
+
+    def read(self, ticker: str, interval: str, start: float, end: float) -> CandleSeries:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ts, open, high, low, close, volume FROM candles "
+                "WHERE ticker = ? AND interval = ? AND ts >= ? AND ts <= ? ORDER BY ts",
+                (ticker, interval, start, end),
+            ).fetchall()
+        if not rows:
+            return CandleSeries.empty()
+        return CandleSeries(*np.array(rows, dtype=np.float64).T)
+
+    def write(self, ticker: str, interval: str, series: CandleSeries, start: float, end: float) -> None:
+        """Spara candles och markera ``[start, end]`` som hämtat (inget markeras om ``end <= start``)."""
+
+        rows = zip(
+            series.timestamp.tolist(),
+            series.open.tolist(),
+            series.high.tolist(),
+            series.low.tolist(),
+            series.close.tolist(),
+            series.volume.tolist(),
+        )
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((ticker, interval, *row) for row in rows),
+            )
+            if end <= start:
+                return
+            existing = self._conn.execute(
+                "SELECT start, end FROM coverage WHERE ticker = ? AND interval = ?",
+                (ticker, interval),
+            ).fetchall()
+            merged = _merge_ranges([*existing, (start, end)])
+            self._conn.execute("DELETE FROM coverage WHERE ticker = ? AND interval = ?", (ticker, interval))
+            self._conn.executemany(
+                "INSERT INTO coverage VALUES (?, ?, ?, ?)",
+                ((ticker, interval, range_start, range_end) for range_start, range_end in merged),
+            )
+
+
+class CachedMarketDataProvider(AbstractMarketDataProvider):
+    """Wrapper som serverar historik från disk och bara hämtar saknade intervall uppströms.
+
+    Den senaste stapellängden före ``clock()`` markeras aldrig permanent som hämtad. En
+    stapel som fortfarande bildas räknas som färsk i ``forming_ttl`` och hämtas sedan om,
+    så den blir inte kvar halvfärdig men varje anrop går inte heller uppströms.
+    """
+
+    def __init__(
+        self,
+        upstream: MarketDataProvider,
+        store: CandleStore,
+        min_gap: timedelta | None = None,
+        clock: Callable[[], float] = time.time,
+        forming_ttl: timedelta = DEFAULT_FORMING_TTL,
+    ) -> None:
+        self.upstream = upstream
+        self.store = store
+        self.min_gap = min_gap
+        self.forming_ttl = forming_ttl
+        self._clock = clock
+        # (ticker, intervall) -> (start, slut, giltig till) för senast hämtade ej stängda staplar.
+        self._forming: dict[tuple[str, str], tuple[float, float, float]] = {}
+
+    def get_quotes(self, tickers: Iterable[str]) -> list[Quote]:  # type: ignore[override]
+        return self.upstream.get_quotes(tickers)
+
+    def get_history(  # type: ignore[override]
+        self,
+        ticker: str,
+        start: datetime,
+        end: datetime,
+        interval: str = "1d",
+    ) -> CandleSeries:
+        key = ticker.upper()
+        now = self._clock()
+        for gap_start, gap_end in self._gaps(key, start, end, interval, now):
+            fetched = self.upstream.get_history(
+                ticker,
+                start=datetime.fromtimestamp(gap_start, UTC),
+                end=datetime.fromtimestamp(gap_end, UTC),
+                interval=interval,
+            )
+            self._write(key, interval, fetched, gap_start, gap_end, now)
+        return self.store.read(key, interval, start.timestamp(), end.timestamp())
+
+    def get_history_batch(  # type: ignore[override]
+        self,
+        tickers: Iterable[str],
+        start: datetime,
+        end: datetime,
+        interval: str = "1d",
+    ) -> dict[str, CandleSeries]:
+        """Som :meth:`get_history`, men tickers med samma saknade intervall hämtas i ett batchanrop."""
+
+        unique = list(dict.fromkeys(tickers))
+        now = self._clock()
+        groups: dict[tuple[float, float], list[str]] = {}
+        for ticker in unique:
+            for gap in self._gaps(ticker.upper(), start, end, interval, now):
+                groups.setdefault(gap, []).append(ticker)
+        for (gap_start, gap_end), group in groups.items():
+            fetched = fetch_history_batch(
+                self.upstream,
+                group,
+                start=datetime.fromtimestamp(gap_start, UTC),
+                end=datetime.fromtimestamp(gap_end, UTC),
+                interval=interval,
+            )
+            for ticker in group:
+                self._write(ticker.upper(), interval, fetched[ticker], gap_start, gap_end, now)
+        return {
+            ticker: self.store.read(ticker.upper(), interval, start.timestamp(), end.timestamp())
+            for ticker in unique
+        }
+
+    def _gaps(
+        self, key: str, start: datetime, end: datetime, interval: str, now: float
+    ) -> list[tuple[float, float]]:
+        min_gap = self.min_gap if self.min_gap is not None else INTERVAL_STEPS.get(interval, timedelta(0))
+        covered = self.store.coverage(key, interval)
+        forming = self._forming.get((key, interval))
+        if forming is not None and now < forming[2]:
+            covered.append(forming[:2])
+        return missing_ranges(
+            start.timestamp(),
+            min(end.timestamp(), now),
+            covered,
+            min_gap=min_gap.total_seconds(),
+        )
+
+    def _write(
+        self, key: str, interval: str, fetched: CandleSeries, gap_start: float, gap_end: float, now: float
+    ) -> None:
+        fetched = as_candle_series(fetched)
+        inside = (fetched.timestamp >= gap_start) & (fetched.timestamp <= gap_end)
+        step = INTERVAL_STEPS.get(interval, timedelta(0)).total_seconds()
+        covered_end = min(gap_end, now - step)
+        self.store.write(key, interval, _select(fetched, inside), gap_start, covered_end)
+        if gap_end > covered_end:
+            expires = now + self.forming_ttl.total_seconds()
+            self._forming[(key, interval)] = (max(gap_start, covered_end), gap_end, expires)
+
+    def get_fundamentals(self, tickers: Iterable[str]) -> list[Fundamental]:  # type: ignore[override]
+        return self.upstream.get_fundamentals(tickers)
+
+    def search_ticker(self, query: str) -> list[dict]:  # type: ignore[override]
+        return self.upstream.search_ticker(query)
+
+
+def missing_ranges(
+    start: float,
+    end: float,
+    covered: Iterable[tuple[float, float]],
+    min_gap: float = 0.0,
+) -> list[tuple[float, float]]:
+    """Returnera delintervall av ``[start, end]`` som inte täcks av ``covered``.
+
+    Gap kortare än ``min_gap`` sekunder ignoreras eftersom de inte kan innehålla en ny stapel.
+    """
+
+    gaps: list[tuple[float, float]] = []
+    cursor = start
+    for covered_start, covered_end in _merge_ranges(covered):
+        if covered_end < cursor:
+            continue
+        if covered_start > end:
+            break
+        if covered_start > cursor:
+            gaps.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return [(gap_start, gap_end) for gap_start, gap_end in gaps if gap_end - gap_start >= min_gap]
+
+
+def _merge_ranges(ranges: Iterable[tuple[float, float]]) -> list[tuple[float, float]]:
+    merged: list[tuple[float, float]] = []
+    for range_start, range_end in sorted(ranges):
+        if merged and range_start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+        else:
+            merged.append((range_start, range_end))
+    return merged
+
+
+def _select(series: CandleSeries, mask: np.ndarray) -> CandleSeries:
+    return CandleSeries(
+        series.timestamp[mask],
+        series.open[mask],
+        series.high[mask],
+        series.low[mask],
+        series.close[mask],
+        series.volume[mask],
+    )
@@ -0,0 +1,199 @@
+"""Kolumnbaserad representation av OHLCV-historik."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+
+_FIELDS = ("timestamp", "open", "high", "low", "close", "volume")
+TIMESTAMP_CACHE_SIZE = 65_536
+
+
+@dataclass(frozen=True, eq=False)
+class CandleSeries:
+    """OHLCV-kolumner i tidsordning, sorterade och validerade en gång vid skapandet.
+
+    Tidsstämplar lagras som sekunder sedan epok. Varje kolumn är en sammanhängande
+    ``float64``-array av samma längd.
+    """
+
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __post_init__(self) -> None:
+        length: int | None = None
+        for name in _FIELDS:
+            column = np.ascontiguousarray(getattr(self, name), dtype=np.float64)
+            if column.ndim != 1:
+                raise ValueError(f"{name} must be one-dimensional")
+            if length is None:
+                length = column.shape[0]
+            elif column.shape[0] != length:
+                raise ValueError("all columns must have the same length")
+            object.__setattr__(self, name, column)
+
+    def __len__(self) -> int:
+        return int(self.close.shape[0])
+
+    @classmethod
+    def empty(cls) -> CandleSeries:
+        return cls(*(np.empty(0) for _ in _FIELDS))
+
+    @classmethod
+    def from_arrays(
+        cls,
+        timestamp: Sequence[float] | np.ndarray,
+        open: Sequence[float] | np.ndarray,
+        high: Sequence[float] | np.ndarray,
+        low: Sequence[float] | np.ndarray,
+        close: Sequence[float] | np.ndarray,
+        volume: Sequence[float] | np.ndarray,
+    ) -> CandleSeries:
+        """Skapa en serie från kolumner och sortera dem stabilt på tidsstämpel.
+
+        Redan sorterade kolumner (det vanliga fallet från leverantörer) sorteras inte om.
+        """
+
+        series = cls(timestamp, open, high, low, close, volume)
+        if is_monotonic(series.timestamp):
+            return series
+        order = np.argsort(series.timestamp, kind="stable")
+        return cls(*(getattr(series, name)[order] for name in _FIELDS))
+
+    @classmethod
+    def from_records(cls, candles: Iterable[dict[str, Any]]) -> CandleSeries:
+        """Konvertera dict-candles från en leverantör till kolumner.
+
+        Rader utan giltigt ``close`` (eller med ogiltigt ``high``/``low``) hoppas över;
+        saknade ``high``/``low`` faller tillbaka på ``close``.
+        """
+
+        timestamps: list[Any] = []
+        rows: list[tuple[float, float, float, float, float]] = []
+        for candle in candles:
+            raw_close = candle.get("close")
+            close = _to_float(raw_close)
+            high = _to_float(candle.get("high", raw_close))
+            low = _to_float(candle.get("low", raw_close))
+            if close is None or high is None or low is None:
+                continue
+            open_price = _to_float(candle.get("open", raw_close))
+            volume = _to_float(candle.get("volume"))
+            timestamps.append(candle.get("timestamp"))
+            rows.append(
+                (
+                    close if open_price is None else open_price,
+                    high,
+                    low,
+                    close,
+                    0.0 if volume is None else volume,
+                )
+            )
+        if not rows:
+            return cls.empty()
+        columns = np.array(rows, dtype=np.float64).T
+        return cls.from_arrays(parse_timestamps(timestamps), *columns)
+
+    def to_records(self) -> list[dict[str, Any]]:
+        """Returnera serien som dict-candles, t.ex. för JSON-serialisering."""
+
+        return [
+            {
+                "timestamp": float(ts),
+                "open": float(o),
+                "high": float(h),
+                "low": float(lo),
+                "close": float(c),
+                "volume": float(v),
+            }
+            for ts, o, h, lo, c, v in zip(
+                self.timestamp, self.open, self.high, self.low, self.close, self.volume
+            )
+        ]
+
+    def tail(self, count: int) -> CandleSeries:
+        """Returnera de sista ``count`` staplarna som vyer mot samma data."""
+
+        if count <= 0:
+            return CandleSeries.empty()
+        return CandleSeries(*(getattr(self, name)[-count:] for name in _FIELDS))
+
+
+def as_candle_series(candles: CandleSeries | Sequence[dict[str, Any]]) -> CandleSeries:
+    """Enda adaptern mellan dict-candles och :class:`CandleSeries`."""
+
+    if isinstance(candles, CandleSeries):
+        return candles
+    return CandleSeries.from_records(candles)
+
+
+def is_monotonic(values: np.ndarray) -> bool:
+    return values.shape[0] < 2 or bool(np.all(values[1:] >= values[:-1]))
+
+
+def parse_timestamps(values: Sequence[Any]) -> np.ndarray:
+    """Tidsstämplar (epoksekunder, ISO-strängar eller ``datetime``) som epoksekunder.
+
+    ISO-strängar i UTC (``Z`` eller ``+00:00``) tolkas i ett svep med ``datetime64``;
+    övriga värden går via :func:`parse_timestamp`, som minns strängar den sett.
+    """
+
+    if values and all(type(value) is str for value in values):
+        parsed = _parse_utc_iso(values)
+        if parsed is not None:
+            return parsed
+    return np.fromiter((parse_timestamp(value) for value in values), dtype=np.float64, count=len(values))
+
+
+def parse_timestamp(ts: Any) -> float:
+    """En tidsstämpel som epoksekunder; okända eller ogiltiga värden blir ``0.0``."""
+
+    if isinstance(ts, (int, float)):
+        return float(ts)
+    if isinstance(ts, str):
+        return _parse_iso(ts)
+    if isinstance(ts, datetime):
+        return ts.timestamp()
+    return 0.0
+
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def _parse_iso(ts: str) -> float:
+    # Samma tidsstämplar återkommer för varje ticker i ett universum.
+    try:
+        return datetime.fromisoformat(ts.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def _parse_utc_iso(values: Sequence[str]) -> np.ndarray | None:
+    stripped: list[str] = []
+    for value in values:
+        if value.endswith("Z"):
+            stripped.append(value[:-1])
+        elif value.endswith("+00:00"):
+            stripped.append(value[:-6])
+        else:
+            return None
+    try:
+        parsed = np.array(stripped, dtype="datetime64[us]")
+    except ValueError:
+        return None
+    return parsed.astype(np.int64) / 1e6
+
+
+def _to_float(value: Any) -> float | None:
+    try:
+        if value is None:
+            return None
+        return float(value)
+    except (TypeError, ValueError):
+        return None
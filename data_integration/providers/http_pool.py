@@ -0,0 +1,180 @@
+"""Delade HTTP-klienter med connection pooling för leverantörsanrop."""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import threading
+import weakref
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import httpx
+
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+
+def http2_available() -> bool:
+    """HTTP/2 kräver paketet ``h2`` (``httpx[http2]``)."""
+
+    return importlib.util.find_spec("h2") is not None
+
+
+@dataclass(frozen=True)
+class HttpPoolConfig:
+    timeout: float = DEFAULT_TIMEOUT
+    max_connections: int = DEFAULT_MAX_CONNECTIONS
+    max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY
+    http2: bool | None = None
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    @property
+    def use_http2(self) -> bool:
+        """``None`` betyder HTTP/2 när ``h2`` finns installerat."""
+
+        return http2_available() if self.http2 is None else self.http2
+
+
+@dataclass
+class PoolStats:
+    requests: int = 0
+    errors: int = 0
+    connections_opened: int = 0
+    tls_handshakes: int = 0
+    open_clients: int = 0
+    http2: bool = False
+
+    @property
+    def reused(self) -> int:
+        return max(self.requests - self.connections_opened, 0)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "reused": self.reused}
+
+
+class HttpClientPool:
+    """Äger en synkron och (per event loop) en asynkron ``httpx``-klient med gemensamma gränser.
+
+    Klienterna skapas vid första användning och lever tills :meth:`close`/:meth:`aclose`,
+    så att anslutningar och TLS-sessioner återanvänds mellan anrop. Antalet nya
+    anslutningar räknas via httpcore:s trace-händelser.
+    """
+
+    def __init__(
+        self,
+        config: HttpPoolConfig | None = None,
+        transport: httpx.BaseTransport | None = None,
+        async_transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.config = config or HttpPoolConfig()
+        self._transport = transport
+        self._async_transport = async_transport
+        self._client: httpx.Client | None = None
+        self._async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._stats = PoolStats(http2=self.config.use_http2)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def client(self) -> httpx.Client:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("HTTP-poolen är stängd")
+            if self._client is None:
+                self._client = httpx.Client(
+                    timeout=self.config.timeout,
+                    limits=self.config.limits,
+                    http2=self.config.use_http2,
+                    transport=self._transport,
+                    event_hooks={"request": [self._on_request], "response": [self._on_response]},
+                )
+            return self._client
+
+    def async_client(self) -> httpx.AsyncClient:
+        """Asynkron klient för den aktuella event loopen (en asynkron pool kan inte delas mellan loopar)."""
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("HTTP-poolen är stängd")
+            client = self._async_clients.get(loop)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    timeout=self.config.timeout,
+                    limits=self.config.limits,
+                    http2=self.config.use_http2,
+                    transport=self._async_transport,
+                    event_hooks={"request": [self._aon_request], "response": [self._aon_response]},
+                )
+                self._async_clients[loop] = client
+            return client
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            open_clients = int(self._client is not None) + sum(
+                1 for client in self._async_clients.values() if not client.is_closed
+            )
+            return PoolStats(**{**asdict(self._stats), "open_clients": open_clients})
+
+    def close(self) -> None:
+        """Stäng den synkrona klienten; asynkrona klienter stängs med :meth:`aclose`."""
+
+        with self._lock:
+            self._closed = True
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+
+    async def aclose(self) -> None:
+        with self._lock:
+            async_clients = list(self._async_clients.values())
+            self._async_clients.clear()
+        for loop_client in async_clients:
+            if not loop_client.is_closed:
+                try:
+                    await loop_client.aclose()
+                except RuntimeError:  # pragma: no cover - klient från en avslutad loop
+                    pass
+        self.close()
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            setattr(self._stats, field, getattr(self._stats, field) + 1)
+
+    def _trace(self, event: str, _: dict[str, Any]) -> None:
+        if event == "connection.connect_tcp.complete":
+            self._count("connections_opened")
+        elif event == "connection.start_tls.complete":
+            self._count("tls_handshakes")
+
+    async def _atrace(self, event: str, info: dict[str, Any]) -> None:
+        self._trace(event, info)
+
+    def _on_request(self, request: httpx.Request) -> None:
+        self._count("requests")
+        request.extensions["trace"] = self._trace
+
+    def _on_response(self, response: httpx.Response) -> None:
+        if response.is_error:
+            self._count("errors")
+
+    async def _aon_request(self, request: httpx.Request) -> None:
+        self._count("requests")
+        request.extensions["trace"] = self._atrace
+
+    async def _aon_response(self, response: httpx.Response) -> None:
+        if response.is_error:
+            self._count("errors")
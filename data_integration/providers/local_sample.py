@@ -2,18 +2,24 @@
 
 from __future__ import annotations
 
-from datetime import UTC, datetime, timedelta
-from random import Random
+from datetime import UTC, datetime
 from typing import Iterable
 
 from .base import AbstractMarketDataProvider, Fundamental, Quote
+from .candles import CandleSeries
+from .synthetic import SyntheticConfig, generate_history
+
+# Roughly the character of the original sample data: a mild upward drift, one calm regime.
+LOCAL_SAMPLE_CONFIG = SyntheticConfig(drift=0.0025, regimes=(0.01,), base_volume=1_250_000.0)
 
 
 class LocalSampleProvider(AbstractMarketDataProvider):
-    """Generate deterministic mock data when external APIs are unavailable."""
+    """Generate deterministic mock data when external APIs are unavailable.
+
+    History is seeded per ticker, so a series does not depend on call order.
+    """
 
     def __init__(self) -> None:
-        self._rng = Random(42)
         self._base_quotes: dict[str, Quote] = {}
         self._fundamentals: dict[str, Fundamental] = {
             "AAPL": Fundamental(ticker="AAPL", pe_ratio=24.5, ps_ratio=6.2, roe=32.1, debt_to_equity=0.55),
@@ -43,35 +49,9 @@ class LocalSampleProvider(AbstractMarketDataProvider):
         start: datetime,
         end: datetime,
         interval: str = "1d",
-    ) -> list[dict]:
-        if interval not in {"1d", "1h"}:
-            raise ValueError("Unsupported interval")
-
-        step = timedelta(days=1) if interval == "1d" else timedelta(hours=1)
-        candles: list[dict] = []
+    ) -> CandleSeries:
         quote = self._quote_for(ticker)
-        span = int((end - start) / step)
-        price = quote.price
-        for index in range(max(span, 30)):
-            timestamp = start + step * index
-            drift = self._rng.uniform(-0.015, 0.02)
-            high = price * (1 + max(drift, 0) + 0.01)
-            low = price * (1 + min(drift, 0) - 0.01)
-            close = max(1.0, price * (1 + drift))
-            open_price = price
-            volume = int(1_000_000 + self._rng.random() * 500_000)
-            candles.append(
-                {
-                    "open": round(open_price, 2),
-                    "high": round(high, 2),
-                    "low": round(low, 2),
-                    "close": round(close, 2),
-                    "volume": volume,
-                    "timestamp": timestamp.isoformat(),
-                }
-            )
-            price = close
-        return candles
+        return generate_history(ticker, start, end, interval, LOCAL_SAMPLE_CONFIG, start_price=quote.price)
 
     def get_fundamentals(self, tickers: Iterable[str]) -> list[Fundamental]:  # type: ignore[override]
         results: list[Fundamental] = []
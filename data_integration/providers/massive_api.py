@@ -2,21 +2,91 @@
 
 from __future__ import annotations
 
+import asyncio
+import time
 from datetime import datetime
-from typing import Iterable
+from typing import Iterable, Mapping
 
 import httpx
 
-from .base import AbstractMarketDataProvider, Fundamental, MarketDataProvider, Quote
+from prometheus_client import Counter, Histogram
+
+from ..metrics import REGISTRY
+from .base import (
+    DEFAULT_HISTORY_CONCURRENCY,
+    AbstractMarketDataProvider,
+    Fundamental,
+    MarketDataProvider,
+    Quote,
+    chunk_symbols,
+)
+from .candles import CandleSeries
+from .http_pool import HttpClientPool
+from .rate_limit import RateLimiter
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# Svar som betyder att flersymbols-endpointet inte finns hos den här API-versionen.
+BULK_UNAVAILABLE_STATUS_CODES = frozenset({404, 405, 501})
+DEFAULT_HISTORY_BATCH_SIZE = 50
+# Håller query-strängen för ``symbols`` väl under vanliga URL-gränser (~2 kB).
+MAX_SYMBOLS_LENGTH = 1500
+
+REQUEST_SECONDS = Histogram(
+    "provider_request_seconds", "Svarstid per leverantörsanrop", ("provider", "endpoint"), registry=REGISTRY
+)
+REQUEST_ERRORS = Counter(
+    "provider_errors_total", "Misslyckade leverantörsanrop", ("provider", "endpoint", "reason"), registry=REGISTRY
+)
 
 
 class MassiveAPIProvider(AbstractMarketDataProvider):
-    """REST-baserad integration mot Massive API."""
+    """REST-baserad integration mot Massive API.
 
-    def __init__(self, api_key: str, base_url: str = "https://api.massive.com/v3") -> None:
+    Historik hämtas per ticker från ``/market/history/{ticker}``. Med ``bulk_history``
+    används i stället det antagna flersymbols-endpointet ``/market/history?symbols=``;
+    svarar det 404/405/501 stängs det av och hämtningen görs om per ticker.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.massive.com/v3",
+        max_concurrency: int = DEFAULT_HISTORY_CONCURRENCY,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        async_transport: httpx.AsyncBaseTransport | None = None,
+        pool: HttpClientPool | None = None,
+        history_batch_size: int = DEFAULT_HISTORY_BATCH_SIZE,
+        rate_limiter: RateLimiter | None = None,
+        bulk_history: bool = False,
+    ) -> None:
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+        if history_batch_size <= 0:
+            raise ValueError("history_batch_size must be positive")
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
-        self._client = httpx.Client(timeout=10.0)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.history_batch_size = history_batch_size
+        self.bulk_history = bulk_history
+        self.rate_limiter = rate_limiter or RateLimiter()
+        # En egen pool stängs av close(); en delad pool ägs av applikationen.
+        self._owns_pool = pool is None
+        self.pool = pool or HttpClientPool(async_transport=async_transport)
+
+    @property
+    def _client(self) -> httpx.Client:
+        return self.pool.client
+
+    def close(self) -> None:
+        if self._owns_pool:
+            self.pool.close()
+
+    async def aclose(self) -> None:
+        if self._owns_pool:
+            await self.pool.aclose()
 
     def _headers(self) -> dict[str, str]:
         return {"Authorization": f"Bearer {self.api_key}"}
@@ -25,9 +95,7 @@ class MassiveAPIProvider(AbstractMarketDataProvider):
         symbols = ",".join(sorted({ticker.upper() for ticker in tickers}))
         if not symbols:
             return []
-        url = f"{self.base_url}/market/quotes"
-        response = self._client.get(url, params={"symbols": symbols}, headers=self._headers())
-        response.raise_for_status()
+        response = self._get("quotes", f"{self.base_url}/market/quotes", {"symbols": symbols})
         payload = response.json().get("results", [])
         quotes: list[Quote] = []
         for item in payload:
@@ -47,24 +115,158 @@ class MassiveAPIProvider(AbstractMarketDataProvider):
         start: datetime,
         end: datetime,
         interval: str = "1d",
-    ) -> list[dict]:
+    ) -> CandleSeries:
         url = f"{self.base_url}/market/history/{ticker.upper()}"
-        params = {
+        response = self._get("history", url, self._history_params(start, end, interval))
+        return CandleSeries.from_records(response.json().get("results", []))
+
+    def get_history_batch(  # type: ignore[override]
+        self,
+        tickers: Iterable[str],
+        start: datetime,
+        end: datetime,
+        interval: str = "1d",
+    ) -> dict[str, CandleSeries]:
+        """Hämta historik för flera tickers, med ``bulk_history`` i klumpar om ``history_batch_size``."""
+
+        unique = list(dict.fromkeys(tickers))
+        if self.bulk_history:
+            params = self._history_params(start, end, interval)
+            series: dict[str, CandleSeries] = {}
+            try:
+                for chunk in self._history_chunks(unique):
+                    url = f"{self.base_url}/market/history"
+                    response = self._get("history", url, {**params, "symbols": ",".join(chunk)})
+                    series.update(_parse_history_batch(response.json()))
+            except httpx.HTTPStatusError as error:
+                if error.response.status_code not in BULK_UNAVAILABLE_STATUS_CODES:
+                    raise
+                self.bulk_history = False
+            else:
+                return {ticker: series.get(ticker.upper(), CandleSeries.empty()) for ticker in unique}
+        return super().get_history_batch(unique, start=start, end=end, interval=interval)
+
+    async def get_history_many(  # type: ignore[override]
+        self,
+        tickers: Iterable[str],
+        start: datetime,
+        end: datetime,
+        interval: str = "1d",
+    ) -> dict[str, CandleSeries]:
+        """Asynkron hämtning: anropen skickas samtidigt med högst ``max_concurrency`` i luften."""
+
+        unique = list(dict.fromkeys(tickers))
+        params = self._history_params(start, end, interval)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        client = self.pool.async_client()
+
+        async def fetch(url: str, extra: Mapping[str, str]) -> dict:
+            async with semaphore:
+                response = await self._aget(client, "history", url, {**params, **extra})
+            return response.json()
+
+        if self.bulk_history:
+            try:
+                payloads = await asyncio.gather(
+                    *(
+                        fetch(f"{self.base_url}/market/history", {"symbols": ",".join(chunk)})
+                        for chunk in self._history_chunks(unique)
+                    )
+                )
+            except httpx.HTTPStatusError as error:
+                if error.response.status_code not in BULK_UNAVAILABLE_STATUS_CODES:
+                    raise
+                self.bulk_history = False
+            else:
+                series: dict[str, CandleSeries] = {}
+                for payload in payloads:
+                    series.update(_parse_history_batch(payload))
+                return {ticker: series.get(ticker.upper(), CandleSeries.empty()) for ticker in unique}
+
+        payloads = await asyncio.gather(
+            *(fetch(f"{self.base_url}/market/history/{ticker.upper()}", {}) for ticker in unique)
+        )
+        return {
+            ticker: CandleSeries.from_records(payload.get("results", []))
+            for ticker, payload in zip(unique, payloads)
+        }
+
+    def _history_params(self, start: datetime, end: datetime, interval: str) -> dict[str, str]:
+        return {
             "start": start.isoformat(),
             "end": end.isoformat(),
             "interval": interval,
         }
-        response = self._client.get(url, params=params, headers=self._headers())
-        response.raise_for_status()
-        return response.json().get("results", [])
+
+    def _history_chunks(self, tickers: Iterable[str]) -> list[list[str]]:
+        return chunk_symbols((ticker.upper() for ticker in tickers), self.history_batch_size, MAX_SYMBOLS_LENGTH)
+
+    def _get(self, endpoint: str, url: str, params: Mapping[str, object]) -> httpx.Response:
+        """GET genom rate limitern, med backoff vid 429/5xx och transportfel."""
+
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(endpoint)
+            try:
+                with REQUEST_SECONDS.labels(provider="massive", endpoint=endpoint).time():
+                    response = self._client.get(url, params=params, headers=self._headers())
+            except httpx.TransportError:
+                REQUEST_ERRORS.labels(provider="massive", endpoint=endpoint, reason="transport").inc()
+                if attempt >= self.max_retries:
+                    raise
+                response = None
+            else:
+                self._observe(endpoint, response)
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    response.raise_for_status()
+                    return response
+            time.sleep(self._retry_delay(response, attempt))
+            attempt += 1
+
+    async def _aget(
+        self,
+        client: httpx.AsyncClient,
+        endpoint: str,
+        url: str,
+        params: Mapping[str, object],
+    ) -> httpx.Response:
+        """Asynkron variant av :meth:`_get`."""
+
+        attempt = 0
+        while True:
+            await self.rate_limiter.aacquire(endpoint)
+            try:
+                with REQUEST_SECONDS.labels(provider="massive", endpoint=endpoint).time():
+                    response = await client.get(url, params=params, headers=self._headers())
+            except httpx.TransportError:
+                REQUEST_ERRORS.labels(provider="massive", endpoint=endpoint, reason="transport").inc()
+                if attempt >= self.max_retries:
+                    raise
+                response = None
+            else:
+                self._observe(endpoint, response)
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    response.raise_for_status()
+                    return response
+            await asyncio.sleep(self._retry_delay(response, attempt))
+            attempt += 1
+
+    def _observe(self, endpoint: str, response: httpx.Response) -> None:
+        self.rate_limiter.observe(endpoint, response.status_code, response.headers)
+        if response.is_error:
+            REQUEST_ERRORS.labels(provider="massive", endpoint=endpoint, reason=str(response.status_code)).inc()
+
+    def _retry_delay(self, response: httpx.Response | None, attempt: int) -> float:
+        # Vid 429 väntar rate limitern redan in Retry-After och den sänkta takten.
+        if response is not None and response.status_code == 429:
+            return 0.0
+        return self.backoff * 2**attempt
 
     def get_fundamentals(self, tickers: Iterable[str]) -> list[Fundamental]:  # type: ignore[override]
         symbols = ",".join(sorted({ticker.upper() for ticker in tickers}))
         if not symbols:
             return []
-        url = f"{self.base_url}/fundamentals/summary"
-        response = self._client.get(url, params={"symbols": symbols}, headers=self._headers())
-        response.raise_for_status()
+        response = self._get("fundamentals", f"{self.base_url}/fundamentals/summary", {"symbols": symbols})
         payload = response.json().get("results", [])
         fundamentals: list[Fundamental] = []
         for item in payload:
@@ -80,16 +282,21 @@ class MassiveAPIProvider(AbstractMarketDataProvider):
         return fundamentals
 
     def search_ticker(self, query: str) -> list[dict]:  # type: ignore[override]
-        url = f"{self.base_url}/reference/tickers"
-        response = self._client.get(
-            url,
-            params={"search": query, "limit": 20, "order": "asc", "sort": "ticker"},
-            headers=self._headers(),
+        response = self._get(
+            "search",
+            f"{self.base_url}/reference/tickers",
+            {"search": query, "limit": 20, "order": "asc", "sort": "ticker"},
         )
-        response.raise_for_status()
         return response.json().get("results", [])
 
 
+def _parse_history_batch(payload: dict) -> dict[str, CandleSeries]:
+    return {
+        item["symbol"].upper(): CandleSeries.from_records(item.get("candles", []))
+        for item in payload.get("results", [])
+    }
+
+
 def _safe_float(value: object | None) -> float | None:
     try:
         if value is None:
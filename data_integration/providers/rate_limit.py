@@ -0,0 +1,220 @@
+"""Token bucket-baserad hastighetsbegränsning för leverantörsanrop."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Mapping
+
+DEFAULT_RATE = 10.0
+# Efter en 429 halveras takten; varje lyckat svar återställer en tiondel av den konfigurerade.
+BACKOFF_FACTOR = 0.5
+RECOVERY_STEP = 0.1
+MIN_RATE_FRACTION = 0.05
+
+_REMAINING_HEADERS = ("x-ratelimit-remaining", "ratelimit-remaining")
+_RESET_HEADERS = ("x-ratelimit-reset", "ratelimit-reset")
+
+
+@dataclass(frozen=True)
+class RateLimitConfig:
+    rate: float = DEFAULT_RATE
+    burst: float | None = None
+
+    def __post_init__(self) -> None:
+        if self.rate <= 0:
+            raise ValueError("rate must be positive")
+        if self.burst is not None and self.burst < 1:
+            raise ValueError("burst must be at least 1")
+
+    @property
+    def capacity(self) -> float:
+        return self.burst if self.burst is not None else max(self.rate, 1.0)
+
+
+@dataclass
+class ThrottleStats:
+    requests: int = 0
+    throttled: int = 0
+    waited_seconds: float = 0.0
+    rate_limited: int = 0
+    pauses: int = 0
+    rate: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "waited_seconds": round(self.waited_seconds, 3), "rate": round(self.rate, 3)}
+
+
+class TokenBucket:
+    """Trådsäker token bucket med reservationer och adaptiv takt.
+
+    :meth:`reserve` drar en token direkt (saldot får bli negativt) och returnerar hur
+    länge anroparen ska vänta, så att samtidiga anrop fördelas jämnt i stället för att
+    alla väcks samtidigt. ``Retry-After`` pausar hinken och en 429 sänker takten, som
+    sedan återhämtar sig gradvis mot den konfigurerade.
+    """
+
+    def __init__(self, config: RateLimitConfig, clock: Callable[[], float] = time.monotonic) -> None:
+        self.config = config
+        self.rate = config.rate
+        self._clock = clock
+        self._tokens = config.capacity
+        self._updated = clock()
+        self._stats = ThrottleStats(rate=config.rate)
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Ta en token och returnera antal sekunder att vänta innan anropet får göras."""
+
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= 1
+            wait = max(self._updated - now, 0.0) + max(-self._tokens, 0.0) / self.rate
+            self._stats.requests += 1
+            if wait > 0:
+                self._stats.throttled += 1
+                self._stats.waited_seconds += wait
+            return wait
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Inga nya tokens på ``seconds`` sekunder (``Retry-After`` eller nollställd kvot)."""
+
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = max(self._updated, now + seconds)
+            self._stats.pauses += 1
+
+    def observe(self, status_code: int, headers: Mapping[str, str]) -> None:
+        """Anpassa hinken efter ett svar: 429, ``Retry-After`` och rate limit-huvuden."""
+
+        retry_after = parse_retry_after(headers.get("retry-after"))
+        remaining = _header_float(headers, _REMAINING_HEADERS)
+        reset = _reset_seconds(_header_float(headers, _RESET_HEADERS))
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            if status_code == 429:
+                self._stats.rate_limited += 1
+                self.rate = max(self.rate * BACKOFF_FACTOR, self.config.rate * MIN_RATE_FRACTION)
+                self._tokens = min(self._tokens, 0.0)
+            elif status_code < 400:
+                self.rate = min(self.rate + self.config.rate * RECOVERY_STEP, self.config.rate)
+            if remaining is not None:
+                self._tokens = min(self._tokens, remaining)
+            self._stats.rate = self.rate
+        if retry_after is not None:
+            self.pause(retry_after)
+        elif remaining is not None and remaining < 1 and reset is not None:
+            self.pause(reset)
+
+    def stats(self) -> ThrottleStats:
+        with self._lock:
+            return ThrottleStats(**asdict(self._stats))
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            self._tokens = min(self.config.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+
+class RateLimiter:
+    """En token bucket per endpoint, delad mellan alla anrop mot samma leverantör."""
+
+    def __init__(
+        self,
+        default: RateLimitConfig | None = None,
+        endpoints: Mapping[str, RateLimitConfig] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.default = default or RateLimitConfig()
+        self.endpoints = dict(endpoints or {})
+        self._clock = clock
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, endpoint: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(endpoint)
+            if bucket is None:
+                config = self.endpoints.get(endpoint, self.default)
+                bucket = self._buckets[endpoint] = TokenBucket(config, clock=self._clock)
+            return bucket
+
+    def acquire(self, endpoint: str) -> None:
+        self.bucket(endpoint).acquire()
+
+    async def aacquire(self, endpoint: str) -> None:
+        await self.bucket(endpoint).aacquire()
+
+    def observe(self, endpoint: str, status_code: int, headers: Mapping[str, str]) -> None:
+        self.bucket(endpoint).observe(status_code, headers)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {endpoint: bucket.stats().to_dict() for endpoint, bucket in sorted(buckets.items())}
+
+
+def parse_rate_limits(spec: str, burst: float | None = None) -> dict[str, RateLimitConfig]:
+    """Tolka ``"history:5,quotes:20"`` till anrop per sekund per endpoint."""
+
+    limits: dict[str, RateLimitConfig] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        endpoint, _, rate = item.partition(":")
+        limits[endpoint.strip()] = RateLimitConfig(rate=float(rate), burst=burst)
+    return limits
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """``Retry-After`` som sekunder eller HTTP-datum."""
+
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=UTC)
+    return max((moment - datetime.now(UTC)).total_seconds(), 0.0)
+
+
+def _header_float(headers: Mapping[str, str], names: tuple[str, ...]) -> float | None:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+def _reset_seconds(reset: float | None) -> float | None:
+    # Vissa API:er anger återställningen som epoktid i stället för sekunder kvar.
+    if reset is not None and reset > 1e9:
+        return max(reset - time.time(), 0.0)
+    return reset
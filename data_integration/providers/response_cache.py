@@ -0,0 +1,220 @@
+"""In-process cache för quotes och fundamenta med TTL, LRU och sammanslagning av anrop."""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass, fields, is_dataclass
+from datetime import datetime
+from typing import Any, Callable, Generic, Hashable, Iterable, Sequence, TypeVar
+
+from .base import AbstractMarketDataProvider, Fundamental, MarketDataProvider, Quote, fetch_history_batch
+from .candles import CandleSeries
+
+V = TypeVar("V")
+
+DEFAULT_QUOTE_TTL = 15.0
+DEFAULT_FUNDAMENTAL_TTL = 24 * 60 * 60.0
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    coalesced: int = 0
+    entries: int = 0
+    size_bytes: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class ResponseCache(Generic[V]):
+    """Trådsäker TTL-cache med LRU-eviction begränsad av uppskattad minnesanvändning.
+
+    :meth:`get_many` slår ihop samtidiga missar: en nyckel som redan hämtas av en annan
+    tråd väntar på det anropet i stället för att göra ett eget mot leverantören.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        sizeof: Callable[[Any], int] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or estimate_size
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, int, V]] = OrderedDict()
+        self._inflight: dict[Hashable, Future[V | None]] = {}
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(**self._stats.to_dict())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats.entries = 0
+            self._stats.size_bytes = 0
+
+    def get_many(
+        self,
+        keys: Iterable[Hashable],
+        load: Callable[[list[Hashable]], dict[Hashable, V]],
+    ) -> dict[Hashable, V]:
+        """Returnera värden för ``keys``; missar hämtas med ett enda ``load``-anrop."""
+
+        found: dict[Hashable, V] = {}
+        waiting: dict[Hashable, Future[V | None]] = {}
+        owned: dict[Hashable, Future[V | None]] = {}
+        with self._lock:
+            now = self._clock()
+            for key in dict.fromkeys(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._stats.hits += 1
+                    found[key] = entry[2]
+                    continue
+                if entry is not None:
+                    self._remove(key)
+                    self._stats.expirations += 1
+                pending = self._inflight.get(key)
+                if pending is not None:
+                    self._stats.coalesced += 1
+                    waiting[key] = pending
+                else:
+                    self._stats.misses += 1
+                    owned[key] = self._inflight[key] = Future()
+
+        if owned:
+            try:
+                loaded = load(list(owned))
+            except BaseException as exc:
+                with self._lock:
+                    for key, future in owned.items():
+                        self._inflight.pop(key, None)
+                        future.set_exception(exc)
+                raise
+            with self._lock:
+                for key, future in owned.items():
+                    value = loaded.get(key)
+                    if value is not None:
+                        self._store(key, value)
+                        found[key] = value
+                    self._inflight.pop(key, None)
+                    future.set_result(value)
+
+        for key, future in waiting.items():
+            value = future.result()
+            if value is not None:
+                found[key] = value
+        return found
+
+    def _store(self, key: Hashable, value: V) -> None:
+        size = self._sizeof(value)
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (self._clock() + self.ttl, size, value)
+        self._stats.entries += 1
+        self._stats.size_bytes += size
+        while self._stats.size_bytes > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._stats.entries -= 1
+        self._stats.size_bytes -= size
+
+
+class ResponseCacheProvider(AbstractMarketDataProvider):
+    """Wrapper som cachar quotes och fundamenta per ticker i delade :class:`ResponseCache`."""
+
+    def __init__(
+        self,
+        upstream: MarketDataProvider,
+        quotes: ResponseCache[Quote],
+        fundamentals: ResponseCache[Fundamental],
+    ) -> None:
+        self.upstream = upstream
+        self.quotes = quotes
+        self.fundamentals = fundamentals
+
+    def get_quotes(self, tickers: Iterable[str]) -> list[Quote]:  # type: ignore[override]
+        return _cached_by_ticker(tickers, self.quotes, self.upstream.get_quotes)
+
+    def get_history(  # type: ignore[override]
+        self,
+        ticker: str,
+        start: datetime,
+        end: datetime,
+        interval: str = "1d",
+    ) -> CandleSeries:
+        return self.upstream.get_history(ticker, start=start, end=end, interval=interval)
+
+    def get_history_batch(  # type: ignore[override]
+        self,
+        tickers: Iterable[str],
+        start: datetime,
+        end: datetime,
+        interval: str = "1d",
+    ) -> dict[str, CandleSeries]:
+        return fetch_history_batch(self.upstream, tickers, start=start, end=end, interval=interval)
+
+    async def get_history_many(  # type: ignore[override]
+        self,
+        tickers: Iterable[str],
+        start: datetime,
+        end: datetime,
+        interval: str = "1d",
+    ) -> dict[str, CandleSeries]:
+        get_history_many = getattr(self.upstream, "get_history_many", None)
+        if get_history_many is None:
+            return await super().get_history_many(tickers, start, end, interval)
+        return await get_history_many(tickers, start=start, end=end, interval=interval)
+
+    def get_fundamentals(self, tickers: Iterable[str]) -> list[Fundamental]:  # type: ignore[override]
+        return _cached_by_ticker(tickers, self.fundamentals, self.upstream.get_fundamentals)
+
+    def search_ticker(self, query: str) -> list[dict]:  # type: ignore[override]
+        return self.upstream.search_ticker(query)
+
+
+def _cached_by_ticker(
+    tickers: Iterable[str],
+    cache: ResponseCache[V],
+    fetch: Callable[[list[str]], Sequence[V]],
+) -> list[V]:
+    keys = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+
+    def load(missing: list[Hashable]) -> dict[Hashable, V]:
+        return {item.ticker.upper(): item for item in fetch([str(key) for key in missing])}  # type: ignore[attr-defined]
+
+    found = cache.get_many(keys, load)
+    return [found[key] for key in keys if key in found]
+
+
+def estimate_size(value: Any) -> int:
+    """Grov uppskattning av minnesanvändning för en dataklass eller ett enkelt värde."""
+
+    size = sys.getsizeof(value)
+    if is_dataclass(value):
+        size += sum(sys.getsizeof(getattr(value, field.name)) for field in fields(value))
+    return size
@@ -0,0 +1,244 @@
+"""Vektoriserad syntetisk marknadsdata för utveckling och lasttester."""
+
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from .base import AbstractMarketDataProvider, Fundamental, Quote
+from .candles import CandleSeries
+
+INTERVAL_STEPS = {"1d": timedelta(days=1), "1h": timedelta(hours=1)}
+_SECONDS_PER_DAY = 86_400
+# 1970-01-01 var en torsdag; (dagnummer + 3) % 7 ger veckodag med måndag = 0.
+_EPOCH_WEEKDAY = 3
+# Slumptal per ticker och stapel: (regimbyte, regimval, gap, saknad) och
+# (avkastning, gapstorlek, övre veke, nedre veke, volym).
+_UNIFORM_ROWS = 4
+_NORMAL_ROWS = 5
+# Tickers per matrisomgång: 9 slumptalsrader × 5 000 staplar × 256 tickers ≈ 90 MB.
+DEFAULT_CHUNK_SIZE = 256
+
+
+@dataclass(frozen=True)
+class SyntheticConfig:
+    """Parametrar för en geometrisk slumpvandring per ticker.
+
+    ``regimes`` är volatiliteter per stapel; med fler än en byts regim med sannolikheten
+    ``regime_switch_probability`` per stapel. ``gap_probability`` ger prisgap vid
+    öppning (normalfördelade med ``gap_size``) och ``missing_probability`` staplar som
+    saknas helt. ``skip_weekends`` tar bort lördagar och söndagar.
+    """
+
+    seed: int = 42
+    drift: float = 0.0005
+    regimes: tuple[float, ...] = (0.01, 0.025)
+    regime_switch_probability: float = 0.02
+    gap_probability: float = 0.0
+    gap_size: float = 0.03
+    missing_probability: float = 0.0
+    skip_weekends: bool = False
+    min_bars: int = 30
+    base_volume: float = 1_000_000.0
+    decimals: int = 2
+
+    def __post_init__(self) -> None:
+        if not self.regimes or min(self.regimes) < 0:
+            raise ValueError("regimes must be non-empty and non-negative")
+        for name in ("regime_switch_probability", "gap_probability", "missing_probability"):
+            if not 0.0 <= getattr(self, name) <= 1.0:
+                raise ValueError(f"{name} must be between 0 and 1")
+
+
+def ticker_rng(seed: int, ticker: str, interval: str = "1d") -> np.random.Generator:
+    """Generator som bara beror på (seed, ticker, intervall), inte på anropsordning."""
+
+    return np.random.default_rng([seed, zlib.crc32(ticker.upper().encode()), zlib.crc32(interval.encode())])
+
+
+def base_price(ticker: str, seed: int = 42) -> float:
+    """Deterministiskt startpris mellan 5 och 500, log-likformigt över tickers."""
+
+    fraction = zlib.crc32(f"{seed}:{ticker.upper()}".encode()) / 2**32
+    return round(5.0 * 100.0**fraction, 2)
+
+
+def generate_history(
+    ticker: str,
+    start: datetime,
+    end: datetime,
+    interval: str = "1d",
+    config: SyntheticConfig | None = None,
+    start_price: float | None = None,
+) -> CandleSeries:
+    """OHLCV för ``ticker`` från ``start`` med ett steg per intervall, genererat kolumnvis."""
+
+    prices = None if start_price is None else [start_price]
+    return generate_batch([ticker], start, end, interval, config, prices)[ticker]
+
+
+def generate_batch(
+    tickers: Sequence[str],
+    start: datetime,
+    end: datetime,
+    interval: str = "1d",
+    config: SyntheticConfig | None = None,
+    start_prices: Sequence[float] | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> dict[str, CandleSeries]:
+    """Serier för många tickers på en gång.
+
+    Varje ticker drar sina slumptal ur en egen generator (två anrop per ticker); resten
+    räknas som matriser med en rad per ticker, ``chunk_size`` tickers åt gången så att
+    slumptal och mellanresultat inte allokeras för hela universumet samtidigt.
+    Resultatet är identiskt med att generera tickrarna en och en.
+    """
+
+    if interval not in INTERVAL_STEPS:
+        raise ValueError("Unsupported interval")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    config = config or SyntheticConfig()
+    step = INTERVAL_STEPS[interval].total_seconds()
+    count = max(int((end - start).total_seconds() // step), config.min_bars)
+    names = list(dict.fromkeys(tickers))
+    if start_prices is None:
+        first = np.array([base_price(ticker, config.seed) for ticker in names])
+    else:
+        first = np.asarray(start_prices, dtype=np.float64)
+    timestamp = start.timestamp() + step * np.arange(count)
+    history: dict[str, CandleSeries] = {}
+    for offset in range(0, len(names), chunk_size):
+        chunk = slice(offset, offset + chunk_size)
+        history.update(_generate_chunk(names[chunk], first[chunk], timestamp, interval, config))
+    return history
+
+
+def _generate_chunk(
+    names: list[str],
+    first: np.ndarray,
+    timestamp: np.ndarray,
+    interval: str,
+    config: SyntheticConfig,
+) -> dict[str, CandleSeries]:
+    count = timestamp.size
+    uniform = np.empty((len(names), _UNIFORM_ROWS, count))
+    normal = np.empty((len(names), _NORMAL_ROWS, count))
+    for row, ticker in enumerate(names):
+        rng = ticker_rng(config.seed, ticker, interval)
+        rng.random((_UNIFORM_ROWS, count), out=uniform[row])
+        rng.standard_normal((_NORMAL_ROWS, count), out=normal[row])
+    switch_draw, regime_draw, gap_draw, missing_draw = uniform.transpose(1, 0, 2)
+    shock, gap_shock, high_wick, low_wick, volume_shock = normal.transpose(1, 0, 2)
+
+    regimes = np.asarray(config.regimes, dtype=np.float64)
+    if regimes.size > 1:
+        switches = switch_draw < config.regime_switch_probability
+        switches[:, 0] = True
+        positions = np.where(switches, np.arange(count), 0)
+        last_switch = np.maximum.accumulate(positions, axis=1)
+        choice = (regime_draw * regimes.size).astype(np.intp)
+        sigma = regimes[np.take_along_axis(choice, last_switch, axis=1)]
+    else:
+        sigma = np.full((len(names), count), regimes[0])
+
+    gaps = np.where(gap_draw < config.gap_probability, gap_shock * config.gap_size, 0.0)
+    gaps[:, 0] = 0.0
+    log_returns = config.drift - 0.5 * sigma**2 + sigma * shock + gaps
+    close = first[:, None] * np.exp(np.cumsum(log_returns, axis=1))
+    open_ = np.empty_like(close)
+    open_[:, 0] = first
+    open_[:, 1:] = close[:, :-1] * np.exp(gaps[:, 1:])
+    high = np.maximum(open_, close) * (1 + np.abs(high_wick) * sigma * 0.5)
+    low = np.minimum(open_, close) * (1 - np.abs(low_wick) * sigma * 0.5)
+    # Volymen följer volatiliteten: oroliga regimer handlas mer.
+    activity = sigma / regimes.mean() if regimes.mean() > 0 else 1.0
+    volume = np.round(config.base_volume * activity * np.exp(0.25 * volume_shock))
+    prices = np.round(np.stack((open_, high, low, close)), config.decimals)
+    np.maximum(prices[3], 10.0**-config.decimals, out=prices[3])
+
+    keep = np.ones((len(names), count), dtype=bool)
+    if config.skip_weekends:
+        keep &= (timestamp // _SECONDS_PER_DAY + _EPOCH_WEEKDAY) % 7 < 5
+    if config.missing_probability:
+        keep &= missing_draw >= config.missing_probability
+    complete = bool(keep.all())
+    history: dict[str, CandleSeries] = {}
+    for row, ticker in enumerate(names):
+        columns = (timestamp, *prices[:, row], volume[row])
+        if not complete:
+            columns = tuple(column[keep[row]] for column in columns)
+        history[ticker] = CandleSeries(*columns)
+    return history
+
+
+def synthetic_tickers(count: int, prefix: str = "SYN") -> list[str]:
+    """``SYN00000``, ``SYN00001``, ... – minst fem siffror så att namnen sorteras rätt."""
+
+    width = max(len(str(count - 1)), 5)
+    return [f"{prefix}{index:0{width}d}" for index in range(count)]
+
+
+class SyntheticMarketDataProvider(AbstractMarketDataProvider):
+    """Leverantör för godtyckligt stora syntetiska universum, deterministisk per ticker.
+
+    Samma (seed, ticker, intervall, fönster) ger alltid samma serie oavsett i vilken
+    ordning eller vilken batch tickern hämtas.
+    """
+
+    def __init__(self, config: SyntheticConfig | None = None, universe_size: int = 1_000) -> None:
+        self.config = config or SyntheticConfig()
+        self.universe = synthetic_tickers(universe_size)
+
+    def get_quotes(self, tickers: Iterable[str]) -> list[Quote]:  # type: ignore[override]
+        now = datetime.now(UTC)
+        return [
+            Quote(ticker=ticker.upper(), price=base_price(ticker, self.config.seed), currency="USD", timestamp=now)
+            for ticker in tickers
+        ]
+
+    def get_history(  # type: ignore[override]
+        self,
+        ticker: str,
+        start: datetime,
+        end: datetime,
+        interval: str = "1d",
+    ) -> CandleSeries:
+        return generate_history(ticker, start, end, interval, self.config)
+
+    def get_history_batch(  # type: ignore[override]
+        self,
+        tickers: Iterable[str],
+        start: datetime,
+        end: datetime,
+        interval: str = "1d",
+    ) -> dict[str, CandleSeries]:
+        return generate_batch(list(tickers), start, end, interval, self.config)
+
+    def get_fundamentals(self, tickers: Iterable[str]) -> list[Fundamental]:  # type: ignore[override]
+        fundamentals: list[Fundamental] = []
+        for ticker in tickers:
+            rng = np.random.default_rng([self.config.seed, zlib.crc32(ticker.upper().encode()), 1])
+            pe, ps, roe, debt = rng.uniform((5.0, 0.5, -5.0, 0.0), (60.0, 12.0, 40.0, 2.5))
+            fundamentals.append(
+                Fundamental(
+                    ticker=ticker.upper(),
+                    pe_ratio=round(float(pe), 1),
+                    ps_ratio=round(float(ps), 1),
+                    roe=round(float(roe), 1),
+                    debt_to_equity=round(float(debt), 2),
+                )
+            )
+        return fundamentals
+
+    def search_ticker(self, query: str) -> list[dict]:  # type: ignore[override]
+        needle = query.upper()
+        return [
+            {"ticker": ticker, "name": ticker, "source": "synthetic"}
+            for ticker in self.universe
+            if needle in ticker
+        ][:20]